@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Interactive-Latenz unter Bulk-Last
+Simuliert Modell-Aufrufe mit fixer Dauer und misst die Wartezeiten pro Klasse
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api.scheduler import BACKGROUND, BATCH, INTERACTIVE, InferenceScheduler
+
+# Simulierte Modell-Laufzeiten (Sekunden)
+INTERACTIVE_COST = 0.005
+BATCH_COST = 0.1
+DURATION = 5.0
+
+def bulk_client(scheduler: InferenceScheduler, priority_class: str, stop: threading.Event):
+    """Schickt ununterbrochen Bulk-Arbeit (wartet bei Überlast)"""
+    while not stop.is_set():
+        scheduler.call_blocking(priority_class, time.sleep, BATCH_COST)
+
+def run_benchmark(workers: int = 2):
+    print("📈 Admission Control Benchmark")
+    print(f"   Worker: {workers} | Dauer: {DURATION}s | Batch-Kosten: {BATCH_COST * 1000:.0f}ms")
+    print("=" * 60)
+    
+    scheduler = InferenceScheduler(workers=workers)
+    stop = threading.Event()
+    clients = [
+        threading.Thread(target=bulk_client, args=(scheduler, cls, stop), daemon=True)
+        for cls in [BATCH] * 4 + [BACKGROUND] * 2
+    ]
+    for client in clients:
+        client.start()
+    
+    latencies = []
+    deadline = time.time() + DURATION
+    while time.time() < deadline:
+        start = time.perf_counter()
+        scheduler.submit(INTERACTIVE, time.sleep, INTERACTIVE_COST).result()
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.01)
+    
+    stop.set()
+    for client in clients:
+        client.join()
+    stats = scheduler.stats()["classes"]
+    scheduler.shutdown()
+    
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"Interactive End-to-End: p50 {p50:.1f}ms | p99 {p99:.1f}ms ({len(latencies)} Requests)")
+    for name, cls in stats.items():
+        print(f"{name:>12}: completed {cls['completed']:>5} | wait p50 {cls['wait_ms']['p50']}ms "
+              f"| wait p99 {cls['wait_ms']['p99']}ms | rejected {cls['rejected']}")
+
+if __name__ == "__main__":
+    run_benchmark()
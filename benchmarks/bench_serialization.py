@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Response-Serialisierung (Pydantic-Pfad vs. Fast-Path)
+Misst Aufbau + Serialisierung einer Response für Einzel- und Batch-Requests
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from api.main import BatchPrediction, ClassificationResult, TicketPrediction
+from api.serialization import build_batch_payloads, build_metadata, dumps, orjson
+from utils.routing import get_confidence_level, get_recommendation, get_sla_target, get_team_assignment
+
+def make_predictions(n: int) -> pd.DataFrame:
+    """Erstellt synthetische Vorhersagen im Format von classifier.predict()"""
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        'category': rng.choice(['Hardware', 'Software', 'Network', 'Security'], n),
+        'priority': rng.choice(['Critical', 'High', 'Medium', 'Low'], n),
+        'category_confidence': rng.uniform(0.5, 1.0, n),
+        'priority_confidence': rng.uniform(0.5, 1.0, n),
+        'overall_confidence': rng.uniform(0.5, 1.0, n)
+    })
+
+def pydantic_response(predictions: pd.DataFrame) -> bytes:
+    """Bisheriger Pfad: verschachtelte Pydantic-Modelle + response_model Serialisierung"""
+    items = []
+    for _, pred in predictions.iterrows():
+        items.append(TicketPrediction(
+            prediction=ClassificationResult(
+                category=pred['category'],
+                priority=pred['priority'],
+                category_confidence=float(pred['category_confidence']),
+                priority_confidence=float(pred['priority_confidence']),
+                overall_confidence=float(pred['overall_confidence'])
+            ),
+            routing={
+                "suggested_team": get_team_assignment(pred['category']),
+                "sla_target": get_sla_target(pred['priority'])
+            },
+            explanation={
+                "confidence_level": get_confidence_level(pred['overall_confidence']),
+                "recommendation": get_recommendation(pred['overall_confidence']),
+                "key_factors": [
+                    "Text content analysis",
+                    "User role and department context",
+                    "System criticality assessment",
+                    "Historical pattern matching"
+                ]
+            },
+            metadata=build_metadata(1.0)
+        ))
+    if len(items) == 1:
+        content = jsonable_encoder(TicketPrediction(**jsonable_encoder(items[0])))
+    else:
+        batch = BatchPrediction(predictions=items, metadata=build_metadata(1.0))
+        content = jsonable_encoder(BatchPrediction(**jsonable_encoder(batch)))
+    return JSONResponse(content).body
+
+def fast_response(predictions: pd.DataFrame) -> bytes:
+    """Neuer Pfad: Dicts mit geteilten Sub-Objekten + dumps()"""
+    payloads = build_batch_payloads(predictions, build_metadata(1.0))
+    if len(payloads) == 1:
+        return dumps(payloads[0])
+    return dumps({"predictions": payloads, "metadata": build_metadata(1.0)})
+
+def run_benchmark():
+    """Führt den Benchmark für verschiedene Batch-Grössen aus"""
+    print("📈 Response-Serialisierung Benchmark")
+    print(f"   JSON Encoder: {'orjson' if orjson is not None else 'json (stdlib)'}")
+    print("=" * 60)
+    print(f"{'Batch':>8} {'Pydantic (ms)':>15} {'Fast (ms)':>12} {'Speedup':>10}")
+    
+    for size in [1, 10, 100, 1000]:
+        predictions = make_predictions(size)
+        number = max(5, 2000 // size)
+        slow = min(timeit.repeat(lambda: pydantic_response(predictions), number=number, repeat=3)) / number
+        fast = min(timeit.repeat(lambda: fast_response(predictions), number=number, repeat=3)) / number
+        print(f"{size:>8} {slow * 1000:>15.3f} {fast * 1000:>12.3f} {slow / fast:>9.1f}x")
+
+if __name__ == "__main__":
+    run_benchmark()
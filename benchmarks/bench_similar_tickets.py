@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Suche ähnlicher Tickets (LSH-Index vs. Brute-Force über TF-IDF)
+Misst Aufbau und Abfrage-Latenz auf synthetischen Ticket-Texten
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.similar_tickets import SimilarTicketIndex
+
+VOCABULARY = (
+    "outlook email exchange server vpn network printer laptop screen password reset account locked "
+    "wifi slow crash error update install license teams sharepoint drive backup disk memory cpu "
+    "login sap database timeout certificate firewall monitor keyboard mouse docking phone"
+).split()
+
+class BenchClassifier:
+    """Minimaler Ersatz für ITTicketClassifier (preprocess_text + text_vectorizer)"""
+
+    def __init__(self, texts):
+        self.text_vectorizer = TfidfVectorizer(ngram_range=(1, 2), max_features=5000).fit(texts)
+
+    def preprocess_text(self, text):
+        return text.lower()
+
+def make_tickets(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    texts = [" ".join(rng.choice(VOCABULARY, rng.integers(6, 20))) for _ in range(n)]
+    return pd.DataFrame({
+        'ticket_id': [f"TICK-{i:06d}" for i in range(n)],
+        'title': [t.split(" ", 3)[-1][:40] for t in texts],
+        'description': texts,
+        'category': rng.choice(['Hardware', 'Software', 'Network'], n),
+        'priority': rng.choice(['High', 'Medium', 'Low'], n),
+        'status': rng.choice(['Open', 'In Progress', 'Resolved'], n),
+        'resolution_time_hours': rng.lognormal(2, 1, n)
+    })
+
+def run_benchmark(n: int = 50000, queries: int = 200):
+    print("📈 Ähnliche Tickets Benchmark")
+    print(f"   Index: {n:,} Tickets | Abfragen: {queries}")
+    print("=" * 60)
+
+    df = make_tickets(n)
+    classifier = BenchClassifier(df['description'].tolist())
+
+    start = time.perf_counter()
+    index = SimilarTicketIndex.build(classifier, df)
+    print(f"   Aufbau: {time.perf_counter() - start:.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index.save(os.path.join(tmp_dir, "similar"))
+        start = time.perf_counter()
+        index = SimilarTicketIndex.load(os.path.join(tmp_dir, "similar"))
+        print(f"   Laden (mmap): {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        tfidf = classifier.text_vectorizer.transform(df['description'].tolist())
+        samples = df.sample(queries, random_state=1)
+
+        lsh, brute = [], []
+        for title, description in zip(samples['title'], samples['description']):
+            start = time.perf_counter()
+            index.query(classifier, title, description, k=5)
+            lsh.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            query = classifier.text_vectorizer.transform([description])
+            scores = (tfidf @ query.T).toarray().ravel()
+            np.argpartition(-scores, 5)[:5]
+            brute.append(time.perf_counter() - start)
+
+    print(f"{'Methode':>14} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for name, values in [("LSH-Index", lsh), ("Brute-Force", brute)]:
+        values = np.array(values) * 1000
+        print(f"{name:>14} {np.percentile(values, 50):>10.2f} {np.percentile(values, 99):>10.2f}")
+
+if __name__ == "__main__":
+    run_benchmark()
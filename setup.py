@@ -61,6 +61,7 @@ setup(
         "console_scripts": [
             "it-ticket-train=models.train_classifier:main",
             "it-ticket-api=api.main:main",
+            "it-ticket-batch-score=models.batch_score:main",
             "it-ticket-generate-data=data.generate_sample_data:main",
         ],
     },
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Audit-Log aller Vorhersagen für Nachvollziehbarkeit und Replay
+Ringpuffer im Speicher, ein Hintergrund-Thread schreibt in Batches
+nach rotierenden, gzip-komprimierten NDJSON-Dateien
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from api.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+AUDIT_LOG_DIR = os.environ.get("AUDIT_LOG_DIR", "data/audit")
+AUDIT_BUFFER_SIZE = int(os.environ.get("AUDIT_BUFFER_SIZE", "20000"))
+AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", "1000"))
+AUDIT_FLUSH_INTERVAL = float(os.environ.get("AUDIT_FLUSH_INTERVAL", "1.0"))
+AUDIT_MAX_FILE_BYTES = int(os.environ.get("AUDIT_MAX_FILE_BYTES", str(64 << 20)))
+AUDIT_MAX_FILES = int(os.environ.get("AUDIT_MAX_FILES", "50"))
+
+# Verhalten bei vollem Puffer: älteste Einträge verwerfen oder neue abweisen
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+AUDIT_OVERFLOW_POLICY = os.environ.get("AUDIT_OVERFLOW_POLICY", DROP_OLDEST)
+
+# Nicht-textuelle Eingabefelder, die unverändert ins Log kommen
+CONTEXT_FIELDS = (
+    'user_role', 'department', 'affected_system', 'hour_submitted', 'is_weekend', 'previous_tickets_30d'
+)
+
+def input_hash(record: Dict[str, Any]) -> str:
+    """Stabiler Hash der Eingabe (für Replay und Abgleich, ohne den Text zu speichern)"""
+    return hashlib.sha256(dumps({key: record[key] for key in sorted(record)})).hexdigest()[:32]
+
+def snapshot_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Übernimmt die Response-Felder des Audit-Eintrags zum Zeitpunkt von record().
+    Die Payload-Dicts gehören dem Aufrufer und werden danach noch verändert
+    (z.B. processing_time_ms im Endpoint); der Writer liest nur diese Kopie.
+    """
+    prediction = payload["prediction"]
+    metadata = payload["metadata"]
+    if "rule" in payload:
+        tier = "rule"
+    elif payload.get("cluster", {}).get("is_duplicate"):
+        tier = "duplicate"
+    else:
+        tier = "model"
+    return {
+        "category": prediction["category"],
+        "priority": prediction["priority"],
+        "category_confidence": prediction["category_confidence"],
+        "priority_confidence": prediction["priority_confidence"],
+        "overall_confidence": prediction["overall_confidence"],
+        "recommendation": payload["explanation"]["recommendation"],
+        "tier": tier,
+        "model_version": metadata["model_version"],
+        "latency_ms": metadata["processing_time_ms"]
+    }
+
+def build_audit_record(record: Dict[str, Any], snapshot: Dict[str, Any], source: str,
+                       received_at: float) -> Dict[str, Any]:
+    """Audit-Eintrag aus Eingabe-Dict und Response-Snapshot (siehe snapshot_payload)"""
+    return {
+        "timestamp": datetime.fromtimestamp(received_at).isoformat(),
+        "source": source,
+        "input_hash": input_hash(record),
+        "features": {
+            "title_length": len(record.get('title', '')),
+            "description_length": len(record.get('description', '')),
+            **{field: record.get(field) for field in CONTEXT_FIELDS}
+        },
+        **snapshot
+    }
+
+class AuditLog:
+    """
+    Nicht-blockierendes Audit-Log.
+
+    record() legt nur (Zeit, Quelle, Eingaben, Response-Snapshots) eines Aufrufs
+    in den Ringpuffer - ohne Hashing, Serialisierung oder Disk-I/O. Der
+    Writer-Thread baut die Einträge, schreibt sie als gzip-Member an die aktuelle Datei
+    und rotiert nach max_file_bytes. Ist der Puffer voll, greift die
+    Overflow-Policy; verworfene Einträge werden in den Metriken gezählt.
+    """
+
+    def __init__(self, directory: str = AUDIT_LOG_DIR, buffer_size: int = AUDIT_BUFFER_SIZE,
+                 batch_size: int = AUDIT_BATCH_SIZE, flush_interval: float = AUDIT_FLUSH_INTERVAL,
+                 max_file_bytes: int = AUDIT_MAX_FILE_BYTES, max_files: int = AUDIT_MAX_FILES,
+                 overflow_policy: str = AUDIT_OVERFLOW_POLICY):
+        if overflow_policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unbekannte Overflow-Policy: {overflow_policy}")
+        self.directory = directory
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.overflow_policy = overflow_policy
+
+        self._buffer: deque = deque()
+        self._buffered = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._file_path: Optional[str] = None
+
+        self.received = 0
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self.files_rotated = 0
+        self.last_flush_ms: Optional[float] = None
+
+    def record(self, records: List[Dict[str, Any]], payloads: List[Dict[str, Any]], source: str):
+        """Übernimmt die Vorhersagen eines Aufrufs in den Puffer (blockiert nie auf Disk)"""
+        count = len(payloads)
+        if not count:
+            return
+        entry = (time.time(), source, records, [snapshot_payload(payload) for payload in payloads])
+        with self._lock:
+            self.received += count
+            if count > self.buffer_size:
+                self.dropped += count
+                return
+            if self._buffered + count > self.buffer_size:
+                if self.overflow_policy == DROP_NEWEST:
+                    self.dropped += count
+                    return
+                while self._buffered + count > self.buffer_size:
+                    dropped_entry = self._buffer.popleft()
+                    self._buffered -= len(dropped_entry[3])
+                    self.dropped += len(dropped_entry[3])
+            self._buffer.append(entry)
+            self._buffered += count
+            if self._buffered >= self.batch_size:
+                self._wakeup.set()
+
+    def _take_batch(self) -> List[tuple]:
+        with self._lock:
+            batch, taken = [], 0
+            while self._buffer and taken < self.batch_size:
+                entry = self._buffer.popleft()
+                batch.append(entry)
+                taken += len(entry[3])
+            self._buffered -= taken
+            return batch
+
+    def flush(self) -> int:
+        """Schreibt alle gepufferten Einträge (vom Writer-Thread oder beim Shutdown)"""
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self) -> int:
+        written = 0
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return written
+            start_time = time.time()
+            lines = [
+                dumps(build_audit_record(record, snapshot, source, received_at))
+                for received_at, source, records, snapshots in batch
+                for record, snapshot in zip(records, snapshots)
+            ]
+            try:
+                self._write(b"\n".join(lines) + b"\n")
+            except Exception as e:
+                self.write_errors += 1
+                self.dropped += len(lines)
+                logger.error(f"❌ Audit-Log konnte nicht geschrieben werden: {e}")
+                continue
+            self.written += len(lines)
+            written += len(lines)
+            self.last_flush_ms = round((time.time() - start_time) * 1000, 2)
+
+    def _write(self, data: bytes):
+        path = self._current_file()
+        # Jeder Batch ist ein eigener gzip-Member: Abbrüche betreffen höchstens den letzten Batch
+        with gzip.open(path, 'ab') as f:
+            f.write(data)
+
+    def _current_file(self) -> str:
+        if self._file_path is None or os.path.getsize(self._file_path) >= self.max_file_bytes:
+            if self._file_path is not None:
+                self.files_rotated += 1
+            os.makedirs(self.directory, exist_ok=True)
+            name = f"predictions-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.ndjson.gz"
+            self._file_path = os.path.join(self.directory, name)
+            open(self._file_path, 'ab').close()
+            self._remove_old_files()
+        return self._file_path
+
+    def files(self) -> List[str]:
+        """Audit-Dateien, älteste zuerst"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.startswith("predictions-") and name.endswith(".ndjson.gz")
+        )
+
+    def _remove_old_files(self):
+        files = self.files()
+        for path in files[:max(len(files) - self.max_files, 0)]:
+            os.remove(path)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ Fehler im Audit-Writer: {e}")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        """Stoppt den Writer und schreibt den restlichen Puffer"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            buffered = self._buffered
+        return {
+            "received": self.received,
+            "written": self.written,
+            "dropped": self.dropped,
+            "buffered": buffered,
+            "buffer_size": self.buffer_size,
+            "overflow_policy": self.overflow_policy,
+            "write_errors": self.write_errors,
+            "files": len(self.files()),
+            "files_rotated": self.files_rotated,
+            "current_file": self._file_path,
+            "last_flush_ms": self.last_flush_ms
+        }
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Feedback-Store für Korrekturen durch Support-Agents
+Persistiert korrigierte Labels (SQLite) für das inkrementelle Online-Learning
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from api.serialization import dumps, loads
+
+FEEDBACK_STORE_PATH = os.environ.get("FEEDBACK_STORE_PATH", "data/feedback/feedback.sqlite3")
+
+# trained_version für zurückgehaltene Korrekturen (Holdout, wird nie trainiert; Versionen beginnen bei 1)
+HOLDOUT_VERSION = 0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket_id TEXT,
+    ticket TEXT NOT NULL,
+    predicted_category TEXT,
+    predicted_priority TEXT,
+    category TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    trained_version INTEGER
+);
+CREATE INDEX IF NOT EXISTS feedback_pending ON feedback (trained_version, id);
+"""
+
+class FeedbackStore:
+    """Persistenter Store für Agent-Korrekturen (thread-safe über ein Lock)"""
+
+    def __init__(self, path: str = FEEDBACK_STORE_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def add(self, ticket: Dict[str, Any], category: str, priority: str, ticket_id: Optional[str] = None,
+            predicted_category: Optional[str] = None, predicted_priority: Optional[str] = None) -> int:
+        """Speichert eine Korrektur und gibt ihre ID zurück"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO feedback (ticket_id, ticket, predicted_category, predicted_priority, "
+                "category, priority, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (ticket_id, dumps(ticket).decode("utf-8"), predicted_category, predicted_priority,
+                 category, priority, datetime.now().isoformat())
+            )
+            self._conn.commit()
+        return cursor.lastrowid
+
+    def pending(self, limit: int) -> List[Dict[str, Any]]:
+        """Noch nicht trainierte Korrekturen (älteste zuerst)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, ticket, category, priority FROM feedback "
+                "WHERE trained_version IS NULL ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()
+        return [
+            {"id": row[0], "ticket": loads(row[1]), "category": row[2], "priority": row[3]}
+            for row in rows
+        ]
+
+    def mark_trained(self, ids: List[int], version: int):
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE feedback SET trained_version = ? WHERE id = ?", ((version, i) for i in ids)
+            )
+            self._conn.commit()
+
+    def holdout(self, limit: int) -> List[Dict[str, Any]]:
+        """Die neuesten zurückgehaltenen Korrekturen (Holdout des Online-Learnings)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, ticket, category, priority FROM feedback "
+                "WHERE trained_version = ? ORDER BY id DESC LIMIT ?", (HOLDOUT_VERSION, limit)
+            ).fetchall()
+        return [
+            {"id": row[0], "ticket": loads(row[1]), "category": row[2], "priority": row[3]}
+            for row in rows
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            total, pending, holdout, corrected = self._conn.execute(
+                "SELECT COUNT(*), "
+                "COALESCE(SUM(trained_version IS NULL), 0), "
+                "COALESCE(SUM(trained_version = ?), 0), "
+                "COALESCE(SUM(predicted_category IS NOT NULL AND predicted_category != category), 0) "
+                "FROM feedback", (HOLDOUT_VERSION,)
+            ).fetchone()
+        return {"total": total, "pending": pending, "holdout": holdout, "category_corrections": corrected}
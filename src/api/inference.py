@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Gemeinsamer Inferenz-Pfad für Batch-, Stream- und Job-Verarbeitung
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import time
+from typing import Any, Dict, List
+
+from api.serialization import build_batch_payloads, build_metadata, build_prediction_payload
+
+# Spalten einer Vorhersage in der Reihenfolge von build_prediction_payload
+PREDICTION_COLUMNS = ['category', 'priority', 'category_confidence', 'priority_confidence', 'overall_confidence']
+
+def predict_frame(classifier, records: List[Dict[str, Any]], companion=None):
+    """
+    Ruft classifier.predict für eine Liste von Ticket-Dicts auf (pandas wird erst hier importiert).
+    Eine angehängte Kalibrierung (classifier.calibrator) ersetzt die rohen Confidences.
+    Ein Online-Companion (models/online_learning.py) korrigiert danach unsichere Vorhersagen.
+    """
+    import pandas as pd
+    
+    prediction = classifier.predict(pd.DataFrame(records))
+    calibrator = getattr(classifier, 'calibrator', None)
+    if calibrator is not None:
+        prediction = calibrator.apply(prediction)
+    if companion is not None:
+        prediction = companion.apply(classifier, records, prediction)
+    return prediction
+
+def predict_payloads(classifier, records: List[Dict[str, Any]], duplicate_index=None,
+                     rule_engine=None, companion=None) -> List[Dict[str, Any]]:
+    """
+    Klassifiziert eine Liste validierter Ticket-Dicts mit einem Modell-Aufruf
+    und gibt Responses im Format von TicketPrediction zurück.
+    Mit rule_engine werden eindeutige Tickets per Regel beantwortet, mit
+    duplicate_index Near-Duplicates aus der Cluster-Vorhersage.
+    """
+    if not records:
+        return []
+    
+    if duplicate_index is not None or rule_engine is not None:
+        return _predict_tiered(classifier, records, duplicate_index, rule_engine, companion)
+    
+    start_time = time.time()
+    prediction = predict_frame(classifier, records, companion)
+    processing_time = (time.time() - start_time) * 1000  # ms
+    
+    # Alle Tickets des Batches teilen sich ein Metadaten-Dict
+    metadata = build_metadata(processing_time / len(records))
+    return build_batch_payloads(prediction, metadata, records)
+
+def _cluster_info(cluster, similarity: float, is_duplicate: bool) -> Dict[str, Any]:
+    return {
+        "cluster_id": cluster.cluster_id,
+        "is_duplicate": is_duplicate,
+        "cluster_size": cluster.size,
+        "similarity": round(similarity, 3)
+    }
+
+def _predict_tiered(classifier, records: List[Dict[str, Any]], duplicate_index, rule_engine,
+                    companion=None) -> List[Dict[str, Any]]:
+    """
+    Stufenweise Klassifikation, günstigste Stufe zuerst:
+    1. Regeln (Keyword-Matcher) für eindeutige Tickets
+    2. Near-Duplicate Index (über preprocess_text) für Tickets eines aktiven Clusters
+    3. Modell für den Rest; neue Tickets eröffnen einen Cluster und
+       passende Regeln im Shadow-Modus werden mit dem Modell verglichen
+    """
+    start_time = time.time()
+    n = len(records)
+    
+    rules = [None] * n
+    answered: Dict[int, tuple] = {}
+    if rule_engine is not None:
+        for i, record in enumerate(records):
+            rule, early_exit = rule_engine.route(record)
+            rules[i] = rule
+            if early_exit:
+                # Confidences einer Regel sind gemessene Übereinstimmung mit dem Modell, nicht kalibriert
+                answered[i] = (rule.prediction, {"rule": rule.rule_id, "confidence_source": "rule"})
+    
+    pending = [i for i in range(n) if i not in answered]
+    signatures: Dict[int, Any] = {}
+    if duplicate_index is not None:
+        from preprocessing.near_duplicates import duplicate_scope
+        for i in pending:
+            record = records[i]
+            signatures[i] = duplicate_index.signature(
+                classifier.preprocess_text(f"{record['title']} {record['description']}")
+            )
+            match = duplicate_index.query(signatures[i], scope=duplicate_scope(record))
+            if match is not None:
+                cluster, similarity = match
+                answered[i] = (cluster.prediction, {"cluster": _cluster_info(cluster, similarity, True)})
+    
+    misses = [i for i in pending if i not in answered]
+    if misses:
+        prediction = predict_frame(classifier, [records[i] for i in misses], companion)
+        for i, row in zip(misses, zip(*(prediction[column].tolist() for column in PREDICTION_COLUMNS))):
+            extra = {}
+            if rules[i] is not None:
+                rule_engine.record_model(rules[i], row[0], row[1])
+            if duplicate_index is not None:
+                assigned = duplicate_index.assign(
+                    signatures[i], row, scope=duplicate_scope(records[i]), sample_title=records[i]['title']
+                )
+                if assigned is not None:
+                    cluster, similarity, is_new = assigned
+                    extra["cluster"] = _cluster_info(cluster, similarity, not is_new)
+            answered[i] = (row, extra)
+    
+    processing_time = (time.time() - start_time) * 1000  # ms
+    metadata = build_metadata(processing_time / n)
+    
+    payloads = []
+    for i in range(n):
+        row, extra = answered[i]
+        payload = build_prediction_payload(*row, metadata, records[i])
+        payload.update(extra)
+        payloads.append(payload)
+    return payloads
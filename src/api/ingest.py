@@ -0,0 +1,642 @@
+#!/usr/bin/env python3
+"""
+Ticket-Ingestion aus einem Spool-Verzeichnis (lokaler Ersatz für Mailbox oder Queue)
+Liest E-Mail- und Webhook-Dateien, klassifiziert sie in Batches mit einer
+asyncio-Pipeline im selben Prozess und schreibt die gerouteten Ergebnisse
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+
+Verzeichnisse unterhalb des Spool-Verzeichnisses:
+    incoming/    neue Dateien (.eml, .json, .ndjson, .jsonl); Produzenten schreiben unter
+                 einem temporären Namen (Endung .tmp oder Punkt am Anfang) und benennen danach um
+    processing/  per Rename beanspruchte Dateien unter ihrer Claim-ID (<Zeit ns>-<Inode>-<name>)
+    done/        verarbeitete Eingaben (<Claim-ID>)
+    failed/      unlesbare Dateien und Dateien nach max_attempts Fehlversuchen (mit .error.txt)
+    outbox/      Ergebnisse pro beanspruchter Datei (<Claim-ID>.ndjson)
+
+Beispiel:
+    python src/api/ingest.py data/spool --workers 2
+"""
+
+import argparse
+import asyncio
+import email
+import email.policy
+import logging
+import os
+import re
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from api.schemas import AFFECTED_SYSTEMS, DEPARTMENTS, USER_ROLES
+from api.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Standard-Konfiguration (per Umgebungsvariable überschreibbar)
+SPOOL_DIR = os.environ.get("INGEST_SPOOL_DIR", "data/spool")
+INGEST_BATCH_SIZE = int(os.environ.get("INGEST_BATCH_SIZE", "256"))
+INGEST_BATCH_TIMEOUT = float(os.environ.get("INGEST_BATCH_TIMEOUT", "0.5"))
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", "2"))
+INGEST_MAX_IN_FLIGHT = int(os.environ.get("INGEST_MAX_IN_FLIGHT", "64"))
+INGEST_POLL_INTERVAL = float(os.environ.get("INGEST_POLL_INTERVAL", "1.0"))
+INGEST_MAX_ATTEMPTS = int(os.environ.get("INGEST_MAX_ATTEMPTS", "3"))
+INGEST_RETRY_BACKOFF = float(os.environ.get("INGEST_RETRY_BACKOFF", "2.0"))
+
+DEFAULT_MODEL_PATH = "data/models/it_ticket_classifier_v2.1.3.pkl"
+
+# Metriken: Schreib-Intervall (s), Fenster für den aktuellen Durchsatz (s), Anzahl Batch-Latenzen
+METRICS_INTERVAL = 5.0
+THROUGHPUT_WINDOW = 60.0
+LATENCY_WINDOW = 1000
+
+INCOMING = "incoming"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+OUTBOX = "outbox"
+
+SUPPORTED_SUFFIXES = (".eml", ".json", ".ndjson", ".jsonl")
+
+# Kontextfelder einer E-Mail aus X-Ticket-* Headern; fehlende oder den Label-Encodern
+# unbekannte Werte werden durch Standardwerte aus den Trainingsdaten ersetzt
+EMAIL_HEADERS = {
+    "user_role": "X-Ticket-User-Role",
+    "department": "X-Ticket-Department",
+    "affected_system": "X-Ticket-Affected-System",
+    "previous_tickets_30d": "X-Ticket-Previous-30d"
+}
+EMAIL_DEFAULTS = {
+    "user_role": "end_user",
+    "department": "IT",
+    "affected_system": "workstation",
+    "previous_tickets_30d": 0
+}
+EMAIL_KNOWN_VALUES = {
+    "user_role": USER_ROLES,
+    "department": DEPARTMENTS,
+    "affected_system": AFFECTED_SYSTEMS
+}
+
+_HTML_TAG = re.compile(r"<[^>]+>")
+_CLAIM_ID = re.compile(r"^\d+-\d+-(.+)$")
+
+def claim_name(claim_id: str) -> str:
+    """Ursprünglicher Dateiname einer Claim-ID (auch für <Claim-ID>.error.txt)"""
+    match = _CLAIM_ID.match(claim_id)
+    return match.group(1) if match else claim_id
+
+def _move_no_clobber(source: str, directory: str, name: str, fallback: str) -> str:
+    """
+    Verschiebt source nach directory/name, ohne eine vorhandene Datei zu ersetzen
+    (os.link schlägt bei existierendem Ziel fehl). Ist name belegt, wird fallback
+    verwendet. Gibt den verwendeten Namen zurück.
+    """
+    for target in (name, fallback):
+        try:
+            os.link(source, os.path.join(directory, target))
+        except FileExistsError:
+            continue
+        os.unlink(source)
+        return target
+    raise FileExistsError(f"{name} und {fallback} existieren bereits in {directory}")
+
+def email_to_record(data: bytes, received_at: float) -> Dict[str, Any]:
+    """E-Mail → Ticket-Dict: Betreff als Titel, Text als Beschreibung, Kontext aus den X-Ticket-* Headern"""
+    message = email.message_from_bytes(data, policy=email.policy.default)
+    body = message.get_body(preferencelist=("plain", "html"))
+    description = body.get_content() if body is not None else ""
+    if body is not None and body.get_content_type() == "text/html":
+        description = _HTML_TAG.sub(" ", description)
+
+    # Zeitpunkt aus dem Date-Header, sonst Ankunft im Spool-Verzeichnis
+    submitted = getattr(message["Date"], "datetime", None) or datetime.fromtimestamp(received_at)
+    record = {
+        "title": str(message["Subject"] or "").strip(),
+        "description": " ".join(description.split()),
+        "hour_submitted": submitted.hour,
+        "is_weekend": int(submitted.weekday() >= 5)
+    }
+    for field, header in EMAIL_HEADERS.items():
+        value = message[header]
+        record[field] = str(value).strip() if value is not None else EMAIL_DEFAULTS[field]
+        if field in EMAIL_KNOWN_VALUES and record[field] not in EMAIL_KNOWN_VALUES[field]:
+            logger.warning(f"⚠️ Unbekannter Wert {header}: {record[field]!r}, verwende {EMAIL_DEFAULTS[field]!r}")
+            record[field] = EMAIL_DEFAULTS[field]
+    record["previous_tickets_30d"] = int(record["previous_tickets_30d"])
+    if message["Message-ID"] is not None:
+        record["ticket_id"] = str(message["Message-ID"]).strip()
+    return record
+
+def _entry(line: int, record: Any, validate_fn: Callable) -> Dict[str, Any]:
+    """Validiertes Ticket oder Fehler-Eintrag (Format wie beim NDJSON-Stream)"""
+    try:
+        if not isinstance(record, dict):
+            raise ValueError("Ticket ist kein JSON-Objekt")
+        return {"line": line, "ticket_id": record.get("ticket_id"), "ticket": validate_fn(record)}
+    except (ValueError, TypeError) as e:
+        return {"line": line, "error": f"Ungültiges Ticket: {e}"}
+
+def parse_payload(path: str, validate_fn: Callable = dict) -> List[Dict[str, Any]]:
+    """
+    Liest eine Spool-Datei und gibt pro Ticket einen Eintrag zurück.
+
+    .eml: eine E-Mail; .json: ein Ticket, eine Liste oder ein Webhook
+    ({"tickets": [...]} bzw. {"ticket": {...}}); .ndjson/.jsonl: ein Ticket pro Zeile.
+    Ungültige Tickets werden zu Fehler-Einträgen, eine als Ganzes unlesbare
+    Datei wirft ValueError.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    suffix = os.path.splitext(path)[1].lower()
+
+    if suffix == ".eml":
+        try:
+            record = email_to_record(data, os.path.getmtime(path))
+        except (ValueError, TypeError) as e:
+            return [{"line": 1, "error": f"Ungültige E-Mail: {e}"}]
+        return [_entry(1, record, validate_fn)]
+
+    if suffix in (".ndjson", ".jsonl"):
+        entries = []
+        for line_no, line in enumerate(data.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                record = loads(line)
+            except ValueError as e:
+                entries.append({"line": line_no, "error": f"Ungültiges JSON: {e}"})
+                continue
+            entries.append(_entry(line_no, record, validate_fn))
+        return entries
+
+    if suffix == ".json":
+        payload = loads(data)
+        if isinstance(payload, dict) and "tickets" in payload:
+            payload = payload["tickets"]
+        elif isinstance(payload, dict) and "ticket" in payload:
+            payload = [payload["ticket"]]
+        elif isinstance(payload, dict):
+            payload = [payload]
+        if not isinstance(payload, list):
+            raise ValueError('Erwartet ein Ticket, eine Liste oder {"tickets": [...]}')
+        return [_entry(i, record, validate_fn) for i, record in enumerate(payload, 1)]
+
+    raise ValueError(f"Nicht unterstütztes Format: {suffix}")
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+class _SpoolFile:
+    """Eine beanspruchte Datei mit ihren Einträgen und dem Verarbeitungsstand"""
+
+    __slots__ = ("name", "claim_id", "path", "entries", "pending", "error", "retry_reason")
+
+    def __init__(self, name: str, claim_id: str, path: str, entries: List[Dict[str, Any]],
+                 error: Optional[str] = None):
+        self.name = name
+        self.claim_id = claim_id
+        self.path = path
+        self.entries = entries
+        self.pending = 0
+        self.error = error
+        self.retry_reason: Optional[str] = None
+
+class SpoolIngestor:
+    """
+    Asyncio-Pipeline: Scanner → Batcher → Klassifikations-Worker → Abschluss.
+
+    Dateien werden per os.rename unter einer eindeutigen Claim-ID nach processing/
+    beansprucht und erst nach dem atomaren Schreiben der Ergebnisse nach done/
+    verschoben; outbox/ und done/ sind nach Claim-ID benannt, eine später
+    gleichnamig eingelieferte Datei überschreibt nichts. At-least-once: nach einem
+    Absturz werden beanspruchte Dateien erneut verarbeitet, Ergebnisse eines
+    abgebrochenen Durchgangs können doppelt in outbox/ stehen. max_in_flight begrenzt die
+    beanspruchten, noch nicht abgeschlossenen Dateien, die Batch-Queue mit einem
+    Platz pro Worker die wartenden Modell-Aufrufe. Pro Spool-Verzeichnis läuft
+    ein Ingestion-Prozess.
+    """
+
+    def __init__(self, spool_dir: str, classify_fn: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]],
+                 validate_fn: Callable = dict, batch_size: int = INGEST_BATCH_SIZE,
+                 batch_timeout: float = INGEST_BATCH_TIMEOUT, workers: int = INGEST_WORKERS,
+                 max_in_flight: int = INGEST_MAX_IN_FLIGHT, poll_interval: float = INGEST_POLL_INTERVAL,
+                 max_attempts: int = INGEST_MAX_ATTEMPTS, retry_backoff: float = INGEST_RETRY_BACKOFF,
+                 keep_processed: bool = True):
+        self.spool_dir = spool_dir
+        self.classify_fn = classify_fn
+        self.validate_fn = validate_fn
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.keep_processed = keep_processed
+        for directory in (INCOMING, PROCESSING, DONE, FAILED, OUTBOX):
+            os.makedirs(self._dir(directory), exist_ok=True)
+
+        self.metrics = {
+            "files_claimed": 0, "files_completed": 0, "files_failed": 0, "files_retried": 0,
+            "files_recovered": 0, "tickets": 0, "tickets_invalid": 0, "batches": 0
+        }
+        self._in_flight = 0
+        self._attempts: Dict[str, int] = {}
+        self._retry_at: Dict[str, float] = {}
+        self._throughput: deque = deque()
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self._started_at = time.time()
+        self._stopping: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _dir(self, name: str, filename: str = "") -> str:
+        return os.path.join(self.spool_dir, name, filename)
+
+    # Dateisystem-Operationen (laufen in Threads)
+
+    def recover(self) -> int:
+        """
+        Gibt nach einem Absturz noch beanspruchte Dateien zurück nach incoming/.
+        Liegt dort inzwischen eine neuere gleichnamige Datei, behält die
+        zurückgegebene Datei ihre Claim-ID als Namen.
+        """
+        claim_ids = os.listdir(self._dir(PROCESSING))
+        for claim_id in claim_ids:
+            _move_no_clobber(self._dir(PROCESSING, claim_id), self._dir(INCOMING), claim_name(claim_id), claim_id)
+        if claim_ids:
+            logger.info(f"🔄 {len(claim_ids)} unterbrochene Dateien werden erneut verarbeitet")
+        return len(claim_ids)
+
+    def _candidates(self, retry_at: Dict[str, float]) -> List[Tuple[str, int]]:
+        """
+        Fertig geschriebene Dateien in incoming/ als (Name, Inode), älteste zuerst
+        (ohne Dateien im Retry-Backoff). Läuft im Thread, daher mit Kopie von _retry_at.
+        """
+        now = time.time()
+        candidates = []
+        with os.scandir(self._dir(INCOMING)) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith(".") or not name.lower().endswith(SUPPORTED_SUFFIXES):
+                    continue
+                if retry_at.get(name, 0.0) > now or not entry.is_file():
+                    continue
+                candidates.append((entry.stat().st_mtime, name, entry.inode()))
+        return [(name, inode) for _, name, inode in sorted(candidates)]
+
+    def _open(self, name: str, inode: int) -> Optional[_SpoolFile]:
+        """Beansprucht eine Datei per Rename unter einer Claim-ID und parst sie; None falls schon vergeben"""
+        claim_id = f"{time.time_ns()}-{inode}-{name}"
+        path = self._dir(PROCESSING, claim_id)
+        try:
+            os.rename(self._dir(INCOMING, name), path)
+        except FileNotFoundError:
+            return None
+        try:
+            return _SpoolFile(name, claim_id, path, parse_payload(path, self.validate_fn))
+        except (OSError, ValueError) as e:
+            return _SpoolFile(name, claim_id, path, [], error=f"Datei unlesbar: {e}")
+
+    def _complete(self, item: _SpoolFile):
+        """Schreibt die Ergebnisse atomar nach outbox/ und bestätigt danach die Eingabe"""
+        lines = []
+        for entry in item.entries:
+            if "result" in entry:
+                record = {"line": entry["line"]}
+                if entry["ticket_id"] is not None:
+                    record["ticket_id"] = entry["ticket_id"]
+                record.update(entry["result"])
+            else:
+                record = {"line": entry["line"], "error": entry["error"]}
+            lines.append(dumps(record))
+
+        output_path = self._dir(OUTBOX, item.claim_id + ".ndjson")
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"\n".join(lines) + b"\n" if lines else b"")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, output_path)
+
+        if self.keep_processed:
+            os.replace(item.path, self._dir(DONE, item.claim_id))
+        else:
+            os.remove(item.path)
+
+    def _fail(self, item: _SpoolFile, reason: str):
+        os.replace(item.path, self._dir(FAILED, item.claim_id))
+        with open(self._dir(FAILED, item.claim_id + ".error.txt"), "w", encoding="utf-8") as f:
+            f.write(reason + "\n")
+
+    def _release(self, item: _SpoolFile) -> str:
+        """Gibt die Datei für einen neuen Versuch nach incoming/ zurück; liefert den verwendeten Namen"""
+        return _move_no_clobber(item.path, self._dir(INCOMING), item.name, item.claim_id)
+
+    # Pipeline-Stufen
+
+    async def _scan(self, files: asyncio.Queue, drain: bool):
+        """Beansprucht Dateien, solange Plätze frei sind; im drain-Modus bis incoming/ leer ist"""
+        try:
+            while not self._stopping.is_set():
+                names = await asyncio.to_thread(self._candidates, dict(self._retry_at))
+                for name, inode in names:
+                    await self._slots.acquire()
+                    if self._stopping.is_set():
+                        self._slots.release()
+                        break
+                    item = await asyncio.to_thread(self._open, name, inode)
+                    if item is None:
+                        self._slots.release()
+                        continue
+                    self._in_flight += 1
+                    self._retry_at.pop(name, None)
+                    self.metrics["files_claimed"] += 1
+
+                    valid = [entry for entry in item.entries if "ticket" in entry]
+                    item.pending = len(valid)
+                    if item.error is not None or not valid:
+                        await self._finish(item)
+                    else:
+                        await files.put((item, valid))
+
+                if drain and not names and self._in_flight == 0 and not self._retry_at:
+                    break
+                if not names:
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            await files.put(None)
+
+    async def _batch(self, files: asyncio.Queue):
+        """Fasst Tickets mehrerer Dateien zu Batches zusammen (voll oder nach batch_timeout)"""
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[_SpoolFile, Dict[str, Any]]] = []
+        deadline = 0.0
+        while True:
+            try:
+                timeout = max(deadline - loop.time(), 0.0) if batch else None
+                received = await asyncio.wait_for(files.get(), timeout)
+            except asyncio.TimeoutError:
+                await self._batch_queue.put(batch)
+                batch = []
+                continue
+            if received is None:
+                break
+            item, valid = received
+            for entry in valid:
+                if not batch:
+                    deadline = loop.time() + self.batch_timeout
+                batch.append((item, entry))
+                if len(batch) >= self.batch_size:
+                    await self._batch_queue.put(batch)
+                    batch = []
+
+        if batch:
+            await self._batch_queue.put(batch)
+        for _ in range(self.workers):
+            await self._batch_queue.put(None)
+
+    async def _classify(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Ein Modell-Aufruf im Thread-Pool; wirft bei Fehler oder falscher Ergebnis-Anzahl"""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        payloads = await loop.run_in_executor(
+            self._executor, self.classify_fn, [entry["ticket"] for entry in entries]
+        )
+        if len(payloads) != len(entries):
+            raise ValueError(f"{len(payloads)} Ergebnisse für {len(entries)} Tickets")
+        self._latencies.append(time.perf_counter() - start)
+        self._throughput.append((time.time(), len(entries)))
+        self.metrics["batches"] += 1
+        self.metrics["tickets"] += len(entries)
+        return payloads
+
+    async def _work(self):
+        """
+        Klassifiziert Batches im Thread-Pool und schliesst vollständige Dateien ab.
+        Schlägt ein Batch mit Tickets mehrerer Dateien fehl, wird pro Datei erneut
+        klassifiziert, damit nur die fehlerhafte Datei wiederholt oder verworfen wird.
+        """
+        while True:
+            batch = await self._batch_queue.get()
+            if batch is None:
+                return
+
+            groups: Dict[int, Tuple[_SpoolFile, List[Dict[str, Any]]]] = {}
+            for item, entry in batch:
+                groups.setdefault(id(item), (item, []))[1].append(entry)
+            try:
+                payloads = await self._classify([entry for _, entry in batch])
+                for (_, entry), payload in zip(batch, payloads):
+                    entry["result"] = payload
+            except Exception as e:
+                logger.error(f"❌ Fehler bei Spool-Klassifikation: {e}")
+                if len(groups) == 1:
+                    [(item, _)] = groups.values()
+                    item.retry_reason = f"Klassifikationsfehler: {str(e)}"
+                else:
+                    for item, entries in groups.values():
+                        try:
+                            for entry, payload in zip(entries, await self._classify(entries)):
+                                entry["result"] = payload
+                        except Exception as file_error:
+                            logger.error(f"❌ Fehler bei Spool-Klassifikation von {item.name}: {file_error}")
+                            item.retry_reason = f"Klassifikationsfehler: {str(file_error)}"
+
+            for item, entries in groups.values():
+                item.pending -= len(entries)
+                if item.pending == 0:
+                    await self._finish(item)
+
+    async def _finish(self, item: _SpoolFile):
+        """Bestätigt, wiederholt oder verwirft eine Datei und gibt ihren Platz frei"""
+        try:
+            if item.error is None and item.retry_reason is None:
+                try:
+                    await asyncio.to_thread(self._complete, item)
+                    self.metrics["files_completed"] += 1
+                    self.metrics["tickets_invalid"] += sum(1 for entry in item.entries if "error" in entry)
+                    self._attempts.pop(item.name, None)
+                    return
+                except OSError as e:
+                    logger.error(f"❌ Ergebnis für {item.name} nicht geschrieben: {e}")
+                    item.retry_reason = f"Schreibfehler: {e}"
+
+            attempts = self._attempts.get(item.name, 0) + 1
+            if item.error is not None or attempts >= self.max_attempts:
+                reason = item.error or f"{item.retry_reason} (nach {attempts} Versuchen)"
+                await asyncio.to_thread(self._fail, item, reason)
+                self._attempts.pop(item.name, None)
+                self.metrics["files_failed"] += 1
+                logger.warning(f"⚠️ {item.name} nach failed/ verschoben: {reason}")
+            else:
+                # Backoff vor dem Zurücklegen setzen, sonst beansprucht der Scanner die Datei sofort
+                retry_at = time.time() + self.retry_backoff * attempts
+                self._retry_at[item.name] = self._retry_at[item.claim_id] = retry_at
+                name = await asyncio.to_thread(self._release, item)
+                self._retry_at.pop(item.claim_id if name == item.name else item.name, None)
+                self._attempts[name] = attempts
+                self.metrics["files_retried"] += 1
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(METRICS_INTERVAL)
+            await asyncio.to_thread(self.write_metrics)
+
+    async def run(self, drain: bool = False) -> Dict[str, Any]:
+        """
+        Startet die Pipeline bis stop() (oder im drain-Modus bis incoming/ leer ist).
+        Bereits beanspruchte Dateien werden vor dem Beenden fertig verarbeitet.
+        """
+        self._stopping = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._batch_queue = asyncio.Queue(maxsize=self.workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest-worker")
+        self._started_at = time.time()
+        self.metrics["files_recovered"] += await asyncio.to_thread(self.recover)
+
+        files: asyncio.Queue = asyncio.Queue()
+        tasks = [asyncio.create_task(self._scan(files, drain)), asyncio.create_task(self._batch(files))]
+        tasks += [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        reporter = asyncio.create_task(self._report())
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            reporter.cancel()
+            self._executor.shutdown(wait=True)
+            self.write_metrics()
+        return self.stats()
+
+    def stop(self):
+        """Beansprucht keine neuen Dateien mehr (aus dem Event-Loop aufrufen, z.B. im Signal-Handler)"""
+        if self._stopping is not None:
+            self._stopping.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Zähler, Durchsatz (gesamt und über die letzten 60s) und Batch-Latenzen"""
+        now = time.time()
+        while self._throughput and self._throughput[0][0] < now - THROUGHPUT_WINDOW:
+            self._throughput.popleft()
+        elapsed = max(now - self._started_at, 1e-9)
+        recent = sum(count for _, count in self._throughput)
+        latencies = list(self._latencies)
+        p50, p95 = _percentile(latencies, 0.5), _percentile(latencies, 0.95)
+        return {
+            **self.metrics,
+            "in_flight_files": self._in_flight,
+            "queued_batches": self._batch_queue.qsize() if self._batch_queue is not None else 0,
+            "uptime_seconds": round(elapsed, 1),
+            "tickets_per_second": round(self.metrics["tickets"] / elapsed, 1),
+            "recent_tickets_per_second": round(recent / min(elapsed, THROUGHPUT_WINDOW), 1),
+            "batch_latency_ms": {
+                "p50": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95": round(p95 * 1000, 1) if p95 is not None else None
+            }
+        }
+
+    def write_metrics(self):
+        """Schreibt die Metriken atomar nach <spool>/metrics.json"""
+        path = os.path.join(self.spool_dir, "metrics.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(dumps(self.stats()))
+        os.replace(tmp_path, path)
+
+def build_classify_fn(model_path: str = DEFAULT_MODEL_PATH):
+    """
+    Lädt Modell, Kalibrierung und Regel-Stufe für die Klassifikation im selben Prozess.
+    Die Vorhersagen landen im Audit-Log (source = "spool").
+    """
+    from api.audit_log import AuditLog
+    from api.inference import predict_payloads
+    from models.calibration import attach_calibrator
+    from models.rules import load_rule_engine
+    from models.train_classifier import ITTicketClassifier
+
+    classifier = ITTicketClassifier()
+    classifier.load_model(model_path)
+    attach_calibrator(classifier, model_path=model_path)
+    rule_engine = load_rule_engine()
+    audit_log = AuditLog()
+    audit_log.start()
+
+    def classify(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        payloads = predict_payloads(classifier, records, None, rule_engine)
+        audit_log.record(records, payloads, "spool")
+        return payloads
+
+    return classify, audit_log
+
+def main(argv=None):
+    """CLI Entry Point"""
+    parser = argparse.ArgumentParser(description="Ticket-Ingestion aus einem Spool-Verzeichnis")
+    parser.add_argument('spool_dir', nargs='?', default=SPOOL_DIR, help="Spool-Verzeichnis")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help="Pfad zum trainierten Modell")
+    parser.add_argument('--batch-size', type=int, default=INGEST_BATCH_SIZE, help="Tickets pro Modell-Aufruf")
+    parser.add_argument('--workers', type=int, default=INGEST_WORKERS, help="Gleichzeitige Modell-Aufrufe")
+    parser.add_argument('--max-in-flight', type=int, default=INGEST_MAX_IN_FLIGHT,
+                        help="Maximal beanspruchte, nicht abgeschlossene Dateien")
+    parser.add_argument('--poll-interval', type=float, default=INGEST_POLL_INTERVAL, help="Sekunden zwischen Scans")
+    parser.add_argument('--drain', action='store_true', help="Vorhandene Dateien verarbeiten und beenden")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    print("📥 IT-Ticket Spool-Ingestion")
+    print("=" * 50)
+    print(f"📁 Spool: {args.spool_dir}")
+    print(f"⚙️ Batch-Grösse: {args.batch_size} | Worker: {args.workers} | In-Flight: {args.max_in_flight}")
+
+    from api.schemas import TicketInput
+
+    classify_fn, audit_log = build_classify_fn(args.model)
+    ingestor = SpoolIngestor(
+        args.spool_dir, classify_fn,
+        validate_fn=lambda record: TicketInput(**record).dict(),
+        batch_size=args.batch_size,
+        workers=args.workers,
+        max_in_flight=args.max_in_flight,
+        poll_interval=args.poll_interval
+    )
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, ingestor.stop)
+        return await ingestor.run(drain=args.drain)
+
+    try:
+        summary = asyncio.run(run())
+    finally:
+        audit_log.shutdown()
+
+    print(f"\n✅ {summary['files_completed']:,} Dateien / {summary['tickets']:,} Tickets klassifiziert "
+          f"({summary['tickets_per_second']:,} Tickets/s), {summary['files_failed']} fehlgeschlagen")
+    return summary
+
+if __name__ == "__main__":
+    main()
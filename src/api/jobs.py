@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Asynchrone Klassifikations-Jobs für die IT-Ticket Classification API
+Persistenter Job-Store (SQLite) und Hintergrund-Worker für grosse Ticket-Mengen
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from api.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Standard-Konfiguration (per Umgebungsvariable überschreibbar)
+JOB_STORE_PATH = os.environ.get("JOB_STORE_PATH", "data/jobs/jobs.sqlite3")
+JOB_DATA_DIR = os.environ.get("JOB_DATA_DIR", "data")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "1"))
+JOB_CHUNK_SIZE = 500
+MAX_QUEUED_JOBS = 100
+
+# Job Status
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+PARTIAL = "partial"      # abgeschlossen, aber einzelne Tickets mit Fehler-Eintrag
+FAILED = "failed"
+FINISHED = (COMPLETED, PARTIAL, FAILED)
+
+class _JobInterrupted(Exception):
+    """Chunk wegen shutdown() nicht klassifiziert; der Job wird beim nächsten Start fortgesetzt"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    source_type TEXT NOT NULL,
+    file_path TEXT,
+    total INTEGER,
+    processed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE TABLE IF NOT EXISTS job_inputs (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+_JOB_COLUMNS = [
+    "id", "status", "source_type", "file_path", "total", "processed",
+    "failed", "error", "created_at", "started_at", "finished_at"
+]
+
+class JobStore:
+    """Persistenter Job-Store auf Basis von SQLite (thread-safe über ein Lock)"""
+
+    def __init__(self, path: str = JOB_STORE_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def create_job(self, source_type: str, records: Optional[List[Dict[str, Any]]] = None,
+                   file_path: Optional[str] = None, total: Optional[int] = None) -> str:
+        """Legt einen Job an; Ticket-Listen werden als Job-Input mitgespeichert"""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, source_type, file_path, total, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, source_type, file_path, total, datetime.now().isoformat())
+            )
+            if records:
+                self._conn.executemany(
+                    "INSERT INTO job_inputs (job_id, idx, payload) VALUES (?, ?, ?)",
+                    ((job_id, idx, dumps(record).decode("utf-8")) for idx, record in enumerate(records))
+                )
+            self._conn.commit()
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return dict(zip(_JOB_COLUMNS, row)) if row else None
+
+    def list_jobs(self, statuses: Tuple[str, ...]) -> List[str]:
+        """IDs aller Jobs mit einem der gegebenen Status (älteste zuerst)"""
+        placeholders = ", ".join("?" for _ in statuses)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id FROM jobs WHERE status IN ({placeholders}) ORDER BY created_at", statuses
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count_jobs(self, statuses: Tuple[str, ...]) -> int:
+        placeholders = ", ".join("?" for _ in statuses)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT COUNT(*) FROM jobs WHERE status IN ({placeholders})", statuses
+            ).fetchone()
+        return row[0]
+
+    def update_job(self, job_id: str, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def iter_inputs(self, job_id: str, start: int, chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """Liefert gespeicherte Job-Inputs ab Index start chunkweise"""
+        offset = start
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT payload FROM job_inputs WHERE job_id = ? AND idx >= ? ORDER BY idx LIMIT ?",
+                    (job_id, offset, chunk_size)
+                ).fetchall()
+            if not rows:
+                return
+            yield [loads(row[0]) for row in rows]
+            offset += len(rows)
+
+    def save_results(self, job_id: str, start: int, payloads: List[bytes], failed: int):
+        """Speichert die Ergebnisse eines Chunks und den Fortschritt in einer Transaktion"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO job_results (job_id, idx, payload) VALUES (?, ?, ?)",
+                ((job_id, start + i, payload.decode("utf-8")) for i, payload in enumerate(payloads))
+            )
+            self._conn.execute(
+                "UPDATE jobs SET processed = ?, failed = failed + ? WHERE id = ?",
+                (start + len(payloads), failed, job_id)
+            )
+            self._conn.commit()
+
+    def get_results(self, job_id: str, offset: int, limit: int) -> List[str]:
+        """Ergebnisse als JSON-Strings (nicht erneut geparst)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM job_results WHERE job_id = ? AND idx >= ? ORDER BY idx LIMIT ?",
+                (job_id, offset, limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def delete_inputs(self, job_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM job_inputs WHERE job_id = ?", (job_id,))
+            self._conn.commit()
+
+class JobManager:
+    """
+    Führt Jobs auf einem begrenzten Worker-Pool im Hintergrund aus.
+
+    Die Anzahl Worker begrenzt die gleichzeitig laufenden Jobs, die Chunk-Grösse
+    begrenzt die Dauer einzelner Modell-Aufrufe. So bleibt Kapazität für den
+    Echtzeit-Pfad /api/v1/classify-ticket.
+    """
+
+    def __init__(self, store: JobStore, predict_fn: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]],
+                 workers: int = JOB_WORKERS, chunk_size: int = JOB_CHUNK_SIZE,
+                 max_queued_jobs: int = MAX_QUEUED_JOBS, data_dir: str = JOB_DATA_DIR):
+        self.store = store
+        self.predict_fn = predict_fn
+        self.chunk_size = chunk_size
+        self.max_queued_jobs = max_queued_jobs
+        self.data_dir = os.path.realpath(data_dir)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job-worker")
+        self._stopping = threading.Event()
+
+    def start(self):
+        """Setzt nach einem Neustart alle nicht abgeschlossenen Jobs fort"""
+        pending = self.store.list_jobs((QUEUED, RUNNING))
+        for job_id in pending:
+            self._executor.submit(self._run_job, job_id)
+        if pending:
+            logger.info(f"🔄 {len(pending)} offene Jobs werden fortgesetzt")
+
+    def shutdown(self):
+        """Stoppt die Worker nach dem aktuellen Chunk; laufende Jobs bleiben fortsetzbar"""
+        self._stopping.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def resolve_file_path(self, file_path: str) -> str:
+        """Erlaubt nur Dateien unterhalb des Daten-Verzeichnisses"""
+        resolved = os.path.realpath(os.path.join(self.data_dir, file_path) if not os.path.isabs(file_path) else file_path)
+        if os.path.commonpath([resolved, self.data_dir]) != self.data_dir:
+            raise ValueError(f"Datei muss unterhalb von {self.data_dir} liegen")
+        if not os.path.isfile(resolved):
+            raise ValueError(f"Datei nicht gefunden: {file_path}")
+        if not resolved.endswith((".csv", ".parquet")):
+            raise ValueError("Nur .csv und .parquet Dateien werden unterstützt")
+        return resolved
+
+    def submit(self, records: Optional[List[Dict[str, Any]]] = None, file_path: Optional[str] = None) -> str:
+        """Legt einen Job an und reiht ihn ein; wirft RuntimeError wenn die Warteschlange voll ist"""
+        if self.store.count_jobs((QUEUED,)) >= self.max_queued_jobs:
+            raise RuntimeError("Zu viele wartende Jobs")
+
+        if file_path is not None:
+            from models.batch_score import count_rows
+
+            resolved = self.resolve_file_path(file_path)
+            job_id = self.store.create_job("file", file_path=resolved, total=count_rows(resolved))
+        else:
+            job_id = self.store.create_job("tickets", records=records, total=len(records))
+
+        self._executor.submit(self._run_job, job_id)
+        return job_id
+
+    def _iter_chunks(self, job: Dict[str, Any]) -> Iterator[List[Dict[str, Any]]]:
+        """Liefert die noch nicht verarbeiteten Tickets eines Jobs chunkweise"""
+        start = job["processed"]
+        if job["source_type"] == "tickets":
+            yield from self.store.iter_inputs(job["id"], start, self.chunk_size)
+            return
+
+        from models.batch_score import INPUT_COLUMNS, read_chunks
+
+        position = 0
+        for chunk in read_chunks(job["file_path"], self.chunk_size):
+            chunk_start = position
+            position += len(chunk)
+            if position <= start:
+                continue
+            missing = [column for column in INPUT_COLUMNS if column not in chunk.columns]
+            if missing:
+                raise ValueError(f"Fehlende Spalten: {missing}")
+            if chunk_start < start:
+                chunk = chunk.iloc[start - chunk_start:]
+            records = chunk[INPUT_COLUMNS].to_dict("records")
+            if "ticket_id" in chunk.columns:
+                for record, ticket_id in zip(records, chunk["ticket_id"].tolist()):
+                    record["ticket_id"] = ticket_id
+            yield records
+
+    def _classify(self, records: List[Dict[str, Any]]) -> Tuple[List[bytes], int]:
+        """Klassifiziert einen Chunk; bei Fehlern wird pro Ticket ein Fehler-Eintrag gespeichert"""
+        ticket_ids = [record.get("ticket_id") for record in records]
+        inputs = [{key: value for key, value in record.items() if key != "ticket_id"} for record in records]
+        try:
+            payloads = self.predict_fn(inputs)
+            failed = 0
+        except Exception as e:
+            if self._stopping.is_set():
+                raise _JobInterrupted() from e
+            logger.error(f"❌ Fehler bei Job-Klassifikation: {e}")
+            payloads = [{"error": f"Klassifikationsfehler: {str(e)}"} for _ in records]
+            failed = len(records)
+
+        results = []
+        for ticket_id, payload in zip(ticket_ids, payloads):
+            if ticket_id is not None:
+                payload = {"ticket_id": ticket_id, **payload}
+            results.append(dumps(payload))
+        return results, failed
+
+    def _run_job(self, job_id: str):
+        job = self.store.get_job(job_id)
+        if job is None or job["status"] not in (QUEUED, RUNNING):
+            return
+
+        self.store.update_job(job_id, status=RUNNING, started_at=job["started_at"] or datetime.now().isoformat())
+        start_time = time.time()
+        processed = job["processed"]
+        logger.info(f"⚙️ Job {job_id} gestartet (ab Ticket {processed})")
+
+        try:
+            for records in self._iter_chunks(job):
+                if self._stopping.is_set():
+                    logger.info(f"⏸️ Job {job_id} unterbrochen bei Ticket {processed}")
+                    return
+                results, failed = self._classify(records)
+                self.store.save_results(job_id, processed, results, failed)
+                processed += len(results)
+        except _JobInterrupted:
+            logger.info(f"⏸️ Job {job_id} unterbrochen bei Ticket {processed}")
+            return
+        except Exception as e:
+            logger.error(f"❌ Job {job_id} fehlgeschlagen: {e}")
+            self.store.update_job(job_id, status=FAILED, error=str(e), finished_at=datetime.now().isoformat())
+            return
+
+        # Fehlgeschlagene Tickets zählen als verarbeitet, bestimmen aber den Endstatus
+        failed = self.store.get_job(job_id)["failed"]
+        if failed == 0:
+            status, error = COMPLETED, None
+        elif failed >= processed:
+            status, error = FAILED, f"Alle {processed} Tickets fehlgeschlagen"
+        else:
+            status, error = PARTIAL, f"{failed} von {processed} Tickets fehlgeschlagen"
+        self.store.update_job(job_id, status=status, total=processed, error=error,
+                              finished_at=datetime.now().isoformat())
+        self.store.delete_inputs(job_id)
+        if status == COMPLETED:
+            logger.info(f"✅ Job {job_id} abgeschlossen: {processed} Tickets in {time.time() - start_time:.1f}s")
+        else:
+            logger.warning(f"⚠️ Job {job_id} {status}: {error}")
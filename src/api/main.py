@@ -8,13 +8,12 @@ Autor: Benjamin Peter
 Datum: 08.06.2025
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
-import pandas as pd
-import numpy as np
+import asyncio
 import os
 import sys
 import time
@@ -24,11 +23,25 @@ from datetime import datetime
 # Add src to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-try:
-    from models.train_classifier import ITTicketClassifier
-except ImportError:
-    print("⚠️ Kann ITTicketClassifier nicht importieren. Stelle sicher, dass das Modell verfügbar ist.")
-    ITTicketClassifier = None
+from api.audit_log import AuditLog
+from api.feedback import FeedbackStore
+from api.inference import predict_frame, predict_payloads
+from api.jobs import FINISHED, JobManager, JobStore
+from api.scheduler import BACKGROUND, BATCH, INTERACTIVE, InferenceScheduler, QueueOverloaded
+from api.schemas import TicketInput
+from api.serialization import (
+    FastJSONResponse, dumps
+)
+from api.streaming import NDJSONClassificationResponse, STREAM_BATCH_SIZE
+from models.rules import load_rule_engine
+from utils.drift import load_drift_monitor
+from utils.routing import (
+    SLA_MAPPING, TEAM_MAPPING, get_confidence_thresholds, get_policy_loader, set_confidence_thresholds
+)
+# Re-Export: die Routing-Helfer waren früher hier definiert und werden von Aufrufern aus api.main importiert
+from utils.routing import (  # noqa: F401
+    get_confidence_level, get_recommendation, get_sla_target, get_team_assignment
+)
 
 # Logging Setup
 logging.basicConfig(level=logging.INFO)
@@ -52,20 +65,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global Classifier Instance
+# Global Classifier Instance (wird im Hintergrund geladen, siehe load_classifier)
 classifier = None
 
-# Pydantic Models
-class TicketInput(BaseModel):
-    title: str = Field(..., description="Ticket Titel", example="Laptop won't start - black screen")
-    description: str = Field(..., description="Ticket Beschreibung", example="My laptop shows a black screen when I press the power button. Tried restarting multiple times.")
-    user_role: str = Field(..., description="Benutzer-Rolle", example="end_user")
-    department: str = Field(..., description="Abteilung", example="Finance")
-    affected_system: str = Field(..., description="Betroffenes System", example="workstation")
-    hour_submitted: int = Field(..., description="Stunde der Einreichung (0-23)", example=14)
-    is_weekend: int = Field(..., description="Wochenende? (0=Nein, 1=Ja)", example=0)
-    previous_tickets_30d: int = Field(..., description="Anzahl Tickets der letzten 30 Tage", example=1)
+# Zustand des Modell-Ladens: "starting", "ready" oder "failed"
+model_state = "starting"
+
+MODEL_PATH = "data/models/it_ticket_classifier_v2.1.3.pkl"
+
+# Hintergrund-Jobs (wird beim Start initialisiert)
+job_manager = None
+
+# Near-Duplicate Index (wird mit dem Modell geladen, importiert NumPy)
+duplicate_index = None
+
+# Online-Learning aus Agent-Korrekturen (wird beim Start initialisiert)
+online_learner = None
+
+# Regel-Stufe vor dem Modell (config/classification_rules.json)
+rule_engine = None
+
+# Index ähnlicher historischer Tickets (offline gebaut, siehe models/similar_tickets.py)
+similar_index = None
+SIMILAR_INDEX_DIR = "data/models/similar_tickets"
 
+# Audit-Log aller Vorhersagen (wird mit dem Modell gestartet)
+audit_log = None
+
+# Drift-Monitoring gegen die Baseline der Trainingsdaten (wird mit dem Modell geladen)
+drift_monitor = None
+
+# Admission Control vor der Modell-Inferenz (interactive / batch / background)
+scheduler = InferenceScheduler()
+
+# Maximale Anzahl Tickets pro Batch-Request
+MAX_BATCH_SIZE = 1000
+
+# Pydantic Models
 class ClassificationResult(BaseModel):
     category: str = Field(..., description="Vorhergesagte Kategorie")
     priority: str = Field(..., description="Vorhergesagte Priorität")
@@ -78,6 +114,44 @@ class TicketPrediction(BaseModel):
     routing: Dict[str, Any] = Field(..., description="Routing-Empfehlungen")
     explanation: Dict[str, Any] = Field(..., description="Erklärung der Klassifikation")
     metadata: Dict[str, Any] = Field(..., description="Metadaten der Vorhersage")
+    cluster: Optional[Dict[str, Any]] = Field(None, description="Near-Duplicate Cluster (cluster_id, is_duplicate, cluster_size, similarity)")
+    rule: Optional[str] = Field(None, description="ID der Regel, falls ohne Modell klassifiziert")
+    confidence_source: Optional[str] = Field(None, description="'rule': Confidences sind die gemessene Übereinstimmung der Regel mit dem Modell (nicht kalibriert)")
+
+class TicketBatchInput(BaseModel):
+    tickets: List[TicketInput] = Field(..., description="Liste von Tickets (max. 1000)")
+
+class BatchPrediction(BaseModel):
+    predictions: List[TicketPrediction]
+    metadata: Dict[str, Any] = Field(..., description="Metadaten des Batches")
+
+class SimilarTicketsRequest(BaseModel):
+    title: str = Field(..., description="Ticket Titel", example="Outlook cannot connect to server")
+    description: str = Field("", description="Ticket Beschreibung", example="Since this morning Outlook shows disconnected.")
+
+class FeedbackInput(BaseModel):
+    ticket: TicketInput
+    ticket_id: Optional[str] = Field(None, description="Ticket-ID im Ticketsystem")
+    predicted_category: Optional[str] = Field(None, description="Ursprünglich vorhergesagte Kategorie")
+    predicted_priority: Optional[str] = Field(None, description="Ursprünglich vorhergesagte Priorität")
+    category: str = Field(..., description="Korrigierte Kategorie", example="Security")
+    priority: str = Field(..., description="Korrigierte Priorität", example="High")
+
+class JobRequest(BaseModel):
+    tickets: Optional[List[TicketInput]] = Field(None, description="Tickets für den Job")
+    file_path: Optional[str] = Field(None, description="Server-seitige CSV/Parquet Datei (relativ zu data/)", example="raw/test_data.csv")
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str = Field(..., description="queued, running, completed, partial (einzelne Tickets fehlgeschlagen) oder failed")
+    total: Optional[int] = Field(None, description="Anzahl Tickets (falls bekannt)")
+    processed: int
+    failed: int
+    progress: Optional[float] = Field(None, description="Fortschritt 0-1 (falls total bekannt)")
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
 
 class HealthResponse(BaseModel):
     status: str
@@ -85,64 +159,25 @@ class HealthResponse(BaseModel):
     model_loaded: bool
     timestamp: str
 
-# Helper Functions
-def get_team_assignment(category: str) -> str:
-    """Bestimmt Team-Zuweisung basierend auf Kategorie"""
-    team_mapping = {
-        "Hardware": "Hardware Support Team",
-        "Software": "Software Support Team", 
-        "Network": "Network Operations Team",
-        "Security": "Security Incident Response Team"
-    }
-    return team_mapping.get(category, "General IT Support")
-
-def get_sla_target(priority: str) -> str:
-    """Bestimmt SLA-Ziel basierend auf Priorität"""
-    sla_mapping = {
-        "Critical": "1 hour",
-        "High": "4 hours",
-        "Medium": "24 hours", 
-        "Low": "72 hours"
-    }
-    return sla_mapping.get(priority, "24 hours")
-
-def get_confidence_level(confidence: float) -> str:
-    """Bestimmt Confidence Level"""
-    if confidence >= 0.9:
-        return "high"
-    elif confidence >= 0.8:
-        return "medium"
-    else:
-        return "low"
-
-def get_recommendation(confidence: float) -> str:
-    """Gibt Empfehlung basierend auf Confidence"""
-    if confidence >= 0.9:
-        return "automatic_assignment"
-    elif confidence >= 0.8:
-        return "review_recommended"
-    else:
-        return "manual_classification_required"
-
-# Startup Event
-@app.on_event("startup")
-async def startup_event():
-    """Lädt das ML-Modell beim Start der API"""
-    global classifier
+def load_classifier():
+    """
+    Importiert ITTicketClassifier und lädt das ML-Modell.
+    Läuft nach dem Start in einem Hintergrund-Thread, damit scikit-learn,
+    xgboost, nltk und pandas erst hier importiert werden und /health sofort antwortet.
+    """
+    global classifier, model_state, duplicate_index, similar_index, rule_engine, drift_monitor
     
+    start_time = time.time()
     try:
-        logger.info("🚀 Starte IT-Ticket Classification API...")
-        
-        if ITTicketClassifier is None:
-            logger.error("❌ ITTicketClassifier nicht verfügbar")
-            classifier = None
+        try:
+            from models.train_classifier import ITTicketClassifier
+        except ImportError as e:
+            logger.error(f"❌ ITTicketClassifier nicht verfügbar: {e}")
+            model_state = "failed"
             return
         
-        # Lade Modell
-        model_path = "data/models/it_ticket_classifier_v2.1.3.pkl"
-        
-        if not os.path.exists(model_path):
-            logger.warning(f"⚠️ Modell nicht gefunden: {model_path}")
+        if not os.path.exists(MODEL_PATH):
+            logger.warning(f"⚠️ Modell nicht gefunden: {MODEL_PATH}")
             logger.info("🔄 Trainiere neues Modell...")
             
             # Trainiere Modell falls nicht vorhanden
@@ -151,18 +186,189 @@ async def startup_event():
                 train_main()
             except Exception as e:
                 logger.error(f"❌ Fehler beim Trainieren: {e}")
-                classifier = None
+                model_state = "failed"
                 return
         
-        classifier = ITTicketClassifier()
-        classifier.load_model(model_path)
+        model = ITTicketClassifier()
+        model.load_model(MODEL_PATH)
+        load_calibration(model)
+        warm_up(model)
+        
+        from preprocessing.near_duplicates import NearDuplicateIndex
+        duplicate_index = NearDuplicateIndex()
+        rule_engine = load_rule_engine()
+        similar_index = load_similar_index(model)
+        drift_monitor = load_drift_monitor()
+        if drift_monitor.baseline is None:
+            logger.info("ℹ️ Keine Drift-Baseline gefunden (utils/drift.py baseline), Drift-Scores deaktiviert")
         
-        logger.info("✅ Modell erfolgreich geladen!")
+        classifier = model
+        model_state = "ready"
+        logger.info(f"✅ Modell erfolgreich geladen! ({time.time() - start_time:.1f}s)")
         
     except Exception as e:
         logger.error(f"❌ Fehler beim Laden des Modells: {e}")
-        # API startet trotzdem, aber ohne Modell
-        classifier = None
+        # API läuft trotzdem weiter, aber ohne Modell
+        model_state = "failed"
+        return
+    
+    start_audit_log()
+    start_job_manager()
+    start_online_learner()
+
+def load_calibration(model):
+    """Hängt die Confidence-Kalibrierung an das Modell (optional, sonst feste Schwellen)"""
+    try:
+        from models.calibration import attach_calibrator
+        calibrator = attach_calibrator(model, model_path=MODEL_PATH)
+    except Exception as e:
+        logger.warning(f"⚠️ Kalibrierung nicht geladen, verwende Standardschwellen: {e}")
+        model.calibrator = None
+        set_confidence_thresholds(None)
+        return
+    if calibrator is None:
+        logger.info("ℹ️ Keine Kalibrierung gefunden (models/calibration.py), verwende Standardschwellen")
+    else:
+        logger.info(f"🎯 Kalibrierung geladen, Schwellen: {get_confidence_thresholds()}")
+
+def load_similar_index(model):
+    """Lädt den Index ähnlicher Tickets memory-mapped (optional, None falls nicht gebaut)"""
+    if not os.path.exists(os.path.join(SIMILAR_INDEX_DIR, "manifest.json")):
+        logger.info("ℹ️ Kein Index für ähnliche Tickets gefunden (models/similar_tickets.py build)")
+        return None
+    try:
+        from models.similar_tickets import SimilarTicketIndex
+        index = SimilarTicketIndex.load(SIMILAR_INDEX_DIR)
+        if index.num_features != len(model.text_vectorizer.vocabulary_):
+            logger.warning("⚠️ Index für ähnliche Tickets passt nicht zum Modell-Vokabular, bitte neu bauen")
+            return None
+        logger.info(f"🔎 Index für ähnliche Tickets geladen: {len(index):,} Tickets")
+        return index
+    except Exception as e:
+        logger.warning(f"⚠️ Index für ähnliche Tickets nicht geladen: {e}")
+        return None
+
+def warm_up(model):
+    """Führt eine Vorhersage aus, damit Lazy-Initialisierungen nicht den ersten Request treffen"""
+    try:
+        predict_frame(model, [{
+            "title": "Laptop won't start",
+            "description": "Black screen when pressing the power button",
+            "user_role": "end_user",
+            "department": "IT",
+            "affected_system": "workstation",
+            "hour_submitted": 10,
+            "is_weekend": 0,
+            "previous_tickets_30d": 1
+        }])
+    except Exception as e:
+        logger.warning(f"⚠️ Warm-up fehlgeschlagen: {e}")
+
+# Startup Event
+@app.on_event("startup")
+async def startup_event():
+    """Startet das Laden des ML-Modells im Hintergrund; die API ist sofort erreichbar"""
+    logger.info("🚀 Starte IT-Ticket Classification API...")
+    app.state.model_loader = asyncio.get_running_loop().run_in_executor(None, load_classifier)
+
+def require_model():
+    """Wirft 503 solange kein Modell verfügbar ist (mit Retry-After während des Ladens)"""
+    if classifier is not None and classifier.is_trained:
+        return
+    if model_state == "starting":
+        raise HTTPException(
+            status_code=503,
+            detail="ML-Modell wird geladen. Bitte später versuchen.",
+            headers={"Retry-After": "5"}
+        )
+    raise HTTPException(
+        status_code=503, 
+        detail="ML-Modell nicht verfügbar. Bitte später versuchen."
+    )
+
+def classify_records(records: List[Dict[str, Any]], deduplicate: bool = False,
+                     source: str = "api") -> List[Dict[str, Any]]:
+    """
+    Inferenz über alle Stufen: Regeln, Near-Duplicates (optional), Modell + Online-Korrekturen.
+    Die Vorhersagen landen im Audit-Log (source = Einstiegspunkt).
+    """
+    if drift_monitor is not None:
+        drift_monitor.observe(records)
+    companion = online_learner.model if online_learner is not None else None
+    payloads = predict_payloads(
+        classifier, records, duplicate_index if deduplicate else None, rule_engine, companion
+    )
+    if audit_log is not None:
+        audit_log.record(records, payloads, source)
+    return payloads
+
+def start_audit_log():
+    """Startet den Writer-Thread des Audit-Logs"""
+    global audit_log
+    
+    try:
+        audit_log = AuditLog()
+        audit_log.start()
+    except Exception as e:
+        logger.error(f"❌ Fehler beim Starten des Audit-Logs: {e}")
+        audit_log = None
+
+def start_job_manager():
+    """Startet die Hintergrund-Worker für Jobs und setzt offene Jobs fort"""
+    global job_manager
+    
+    if classifier is None:
+        return
+    
+    try:
+        job_manager = JobManager(
+            JobStore(),
+            predict_fn=lambda records: scheduler.call_blocking(BACKGROUND, classify_records, records, False, "job")
+        )
+        job_manager.start()
+    except Exception as e:
+        logger.error(f"❌ Fehler beim Starten der Job-Worker: {e}")
+        job_manager = None
+
+def start_online_learner():
+    """Startet das inkrementelle Online-Learning aus dem Feedback-Store"""
+    global online_learner
+    
+    try:
+        from models.online_learning import OnlineLearner, load_replay_sample
+        online_learner = OnlineLearner(
+            FeedbackStore(),
+            classifier_fn=lambda: classifier,
+            replay=load_replay_sample()
+        )
+        online_learner.start()
+    except Exception as e:
+        logger.error(f"❌ Fehler beim Starten des Online-Learnings: {e}")
+        online_learner = None
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stoppt die Job-Worker (laufende Jobs werden beim nächsten Start fortgesetzt) und speichert die Regel-Statistik"""
+    if job_manager is not None:
+        job_manager.shutdown()
+        job_manager.store.close()
+    if online_learner is not None:
+        online_learner.shutdown()
+        online_learner.store.close()
+    if audit_log is not None:
+        audit_log.shutdown()
+    if rule_engine is not None and rule_engine.stats_path:
+        rule_engine.save_stats()
+    scheduler.shutdown()
+
+def _overloaded(exc: QueueOverloaded) -> HTTPException:
+    """Load Shedding: 503 mit Retry-After Header"""
+    logger.warning(f"⚠️ Anfrage abgewiesen ({exc.priority_class}), Retry-After {exc.retry_after}s")
+    return HTTPException(
+        status_code=503,
+        detail=f"Server ausgelastet ({exc.priority_class}). Bitte in {exc.retry_after}s erneut versuchen.",
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
 # API Endpoints
 @app.get("/", response_model=Dict[str, str])
@@ -177,84 +383,323 @@ async def root():
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Health Check Endpoint"""
+    """Health Check Endpoint (Liveness, antwortet auch während das Modell lädt)"""
+    if classifier and classifier.is_trained:
+        status = "healthy"
+    else:
+        status = "starting" if model_state == "starting" else "degraded"
     return HealthResponse(
-        status="healthy" if classifier and classifier.is_trained else "degraded",
+        status=status,
         version="2.1.3",
         model_loaded=classifier is not None and classifier.is_trained,
         timestamp=datetime.now().isoformat()
     )
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness Check: 200 erst wenn das Modell geladen ist"""
+    require_model()
+    return {"status": "ready", "model_state": model_state}
+
 @app.post("/api/v1/classify-ticket", response_model=TicketPrediction)
 async def classify_ticket(ticket: TicketInput):
     """Klassifiziert ein einzelnes IT-Ticket"""
     
-    if not classifier or not classifier.is_trained:
+    require_model()
+    
+    try:
+        start_time = time.time()
+        
+        # Klassifikation (interactive Warteschlange); Near-Duplicates übernehmen die Cluster-Vorhersage
+        result = (await scheduler.run(INTERACTIVE, classify_records, [ticket.dict()], True, "ticket"))[0]
+        result["metadata"]["processing_time_ms"] = round((time.time() - start_time) * 1000, 2)
+        
+        pred = result["prediction"]
+        logger.info(f"🎫 Ticket klassifiziert: {pred['category']}/{pred['priority']} (Confidence: {pred['overall_confidence']:.3f})")
+        
+        return FastJSONResponse(result)
+        
+    except QueueOverloaded as e:
+        raise _overloaded(e)
+    except Exception as e:
+        logger.error(f"❌ Fehler bei Klassifikation: {e}")
+        raise HTTPException(status_code=500, detail=f"Klassifikationsfehler: {str(e)}")
+
+@app.post("/api/v1/classify-batch", response_model=BatchPrediction)
+async def classify_batch(batch: TicketBatchInput):
+    """Klassifiziert mehrere IT-Tickets in einem Modell-Aufruf"""
+    
+    require_model()
+    
+    if not batch.tickets:
+        raise HTTPException(status_code=422, detail="Batch enthält keine Tickets")
+    
+    if len(batch.tickets) > MAX_BATCH_SIZE:
         raise HTTPException(
-            status_code=503, 
-            detail="ML-Modell nicht verfügbar. Bitte später versuchen."
+            status_code=422,
+            detail=f"Batch zu gross: {len(batch.tickets)} Tickets (max. {MAX_BATCH_SIZE})"
         )
     
     try:
         start_time = time.time()
         
-        # Konvertiere Input zu DataFrame
-        ticket_df = pd.DataFrame([ticket.dict()])
-        
-        # Klassifikation
-        prediction = classifier.predict(ticket_df)
-        pred = prediction.iloc[0]
+        predictions = await scheduler.run(
+            BATCH, classify_records, [ticket.dict() for ticket in batch.tickets], True, "batch"
+        )
         
         processing_time = (time.time() - start_time) * 1000  # ms
         
-        # Erstelle Response
-        result = TicketPrediction(
-            prediction=ClassificationResult(
-                category=pred['category'],
-                priority=pred['priority'],
-                category_confidence=float(pred['category_confidence']),
-                priority_confidence=float(pred['priority_confidence']),
-                overall_confidence=float(pred['overall_confidence'])
-            ),
-            routing={
-                "suggested_team": get_team_assignment(pred['category']),
-                "sla_target": get_sla_target(pred['priority'])
-            },
-            explanation={
-                "confidence_level": get_confidence_level(pred['overall_confidence']),
-                "recommendation": get_recommendation(pred['overall_confidence']),
-                "key_factors": [
-                    "Text content analysis",
-                    "User role and department context",
-                    "System criticality assessment",
-                    "Historical pattern matching"
-                ]
-            },
-            metadata={
+        result = {
+            "predictions": predictions,
+            "metadata": {
                 "model_version": "2.1.3",
+                "batch_size": len(batch.tickets),
                 "processing_time_ms": round(processing_time, 2),
                 "timestamp": datetime.now().isoformat()
             }
-        )
+        }
         
-        logger.info(f"🎫 Ticket klassifiziert: {pred['category']}/{pred['priority']} (Confidence: {pred['overall_confidence']:.3f})")
+        logger.info(f"📦 Batch klassifiziert: {len(batch.tickets)} Tickets in {processing_time:.1f}ms")
         
-        return result
+        return FastJSONResponse(result)
         
+    except QueueOverloaded as e:
+        raise _overloaded(e)
     except Exception as e:
-        logger.error(f"❌ Fehler bei Klassifikation: {e}")
+        logger.error(f"❌ Fehler bei Batch-Klassifikation: {e}")
         raise HTTPException(status_code=500, detail=f"Klassifikationsfehler: {str(e)}")
 
+@app.post("/api/v1/classify-stream")
+async def classify_stream(
+    request: Request,
+    batch_size: int = Query(STREAM_BATCH_SIZE, ge=1, le=MAX_BATCH_SIZE, description="Tickets pro internem Batch")
+):
+    """
+    Klassifiziert Tickets aus einem NDJSON-Body (ein Ticket-Objekt pro Zeile)
+    und streamt die Ergebnisse als NDJSON zurück, sobald ein Batch fertig ist.
+    Jede Ergebniszeile enthält die Zeilennummer (line) und ggf. ticket_id.
+    """
+    
+    require_model()
+    
+    try:
+        scheduler.check_admission(BATCH)
+    except QueueOverloaded as e:
+        raise _overloaded(e)
+    
+    async def predict(records):
+        # Während des Streams: warten statt abweisen (Backpressure auf den Upload)
+        while True:
+            try:
+                return await scheduler.run(BATCH, classify_records, records, False, "stream")
+            except QueueOverloaded as e:
+                await asyncio.sleep(e.retry_after)
+    
+    return NDJSONClassificationResponse(
+        predict_fn=predict,
+        validate_fn=lambda record: TicketInput(**record).dict(),
+        batch_size=batch_size
+    )
+
+def _job_status(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Wandelt einen Job-Datensatz in eine JobStatus-Response um"""
+    total = job["total"]
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "total": total,
+        "processed": job["processed"],
+        "failed": job["failed"],
+        "progress": round(job["processed"] / total, 4) if total else None,
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"]
+    }
+
+def _get_job_or_404(job_id: str) -> Dict[str, Any]:
+    if job_manager is None:
+        raise HTTPException(status_code=503, detail="Job-System nicht verfügbar")
+    job = job_manager.store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job nicht gefunden: {job_id}")
+    return job
+
+@app.post("/api/v1/jobs", response_model=JobStatus, status_code=202)
+async def create_job(request: JobRequest):
+    """Startet einen asynchronen Klassifikations-Job für eine Ticket-Liste oder eine Datei"""
+    
+    if job_manager is None:
+        raise HTTPException(status_code=503, detail="Job-System nicht verfügbar")
+    
+    if (request.tickets is None) == (request.file_path is None):
+        raise HTTPException(status_code=422, detail="Genau eines von 'tickets' oder 'file_path' angeben")
+    
+    if request.tickets is not None and not request.tickets:
+        raise HTTPException(status_code=422, detail="Job enthält keine Tickets")
+    
+    try:
+        records = [ticket.dict() for ticket in request.tickets] if request.tickets is not None else None
+        job_id = job_manager.submit(records=records, file_path=request.file_path)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    
+    logger.info(f"📥 Job {job_id} angelegt")
+    return FastJSONResponse(_job_status(job_manager.store.get_job(job_id)), status_code=202)
+
+@app.get("/api/v1/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """Gibt Status und Fortschritt eines Jobs zurück"""
+    return FastJSONResponse(_job_status(_get_job_or_404(job_id)))
+
+@app.get("/api/v1/jobs/{job_id}/results")
+async def get_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="Index des ersten Ergebnisses"),
+    limit: int = Query(100, ge=1, le=MAX_BATCH_SIZE, description="Anzahl Ergebnisse pro Seite")
+):
+    """Gibt die bisher vorliegenden Ergebnisse eines Jobs seitenweise zurück"""
+    job = _get_job_or_404(job_id)
+    results = job_manager.store.get_results(job_id, offset, limit)
+    
+    next_offset = offset + len(results)
+    has_more = next_offset < job["processed"] or job["status"] not in FINISHED
+    
+    # Gespeicherte Ergebnisse sind bereits JSON und werden ohne erneutes Parsen eingebettet
+    header = dumps({
+        "job_id": job_id,
+        "status": job["status"],
+        "offset": offset,
+        "count": len(results),
+        "next_offset": next_offset if has_more else None
+    })
+    body = header[:-1] + b',"results":[' + ",".join(results).encode("utf-8") + b"]}"
+    return Response(content=body, media_type="application/json")
+
+@app.get("/api/v1/scheduler/stats")
+async def get_scheduler_stats():
+    """Warteschlangen-Tiefe, Wartezeiten (p50/p99) und Auslastung pro Prioritätsklasse"""
+    return FastJSONResponse(scheduler.stats())
+
+@app.post("/api/v1/similar-tickets")
+async def find_similar_tickets(
+    request: SimilarTicketsRequest,
+    k: int = Query(5, ge=1, le=50, description="Anzahl ähnlicher Tickets"),
+    resolved_only: bool = Query(True, description="Nur gelöste Tickets")
+):
+    """Ähnliche historische Tickets inkl. Status und Lösungszeit (Approximate Nearest Neighbor)"""
+    
+    require_model()
+    if similar_index is None:
+        raise HTTPException(status_code=503, detail="Index für ähnliche Tickets nicht verfügbar")
+    
+    try:
+        start_time = time.time()
+        
+        # Neu gebauten Index übernehmen (nur ein stat() falls unverändert); das Neuladen
+        # läuft in einem Thread, damit der Event-Loop andere Requests weiter bedient
+        await asyncio.to_thread(similar_index.refresh)
+        similar = await scheduler.run(
+            INTERACTIVE, similar_index.query, classifier, request.title, request.description, k, resolved_only
+        )
+        
+        return FastJSONResponse({
+            "similar_tickets": similar,
+            "metadata": {
+                "indexed_tickets": len(similar_index),
+                "processing_time_ms": round((time.time() - start_time) * 1000, 2),
+                "timestamp": datetime.now().isoformat()
+            }
+        })
+        
+    except QueueOverloaded as e:
+        raise _overloaded(e)
+    except Exception as e:
+        logger.error(f"❌ Fehler bei Suche ähnlicher Tickets: {e}")
+        raise HTTPException(status_code=500, detail=f"Suchfehler: {str(e)}")
+
+@app.post("/api/v1/feedback", status_code=202)
+async def submit_feedback(feedback: FeedbackInput):
+    """Speichert eine Agent-Korrektur; das Online-Modell lernt sie im Hintergrund"""
+    
+    require_model()
+    if online_learner is None:
+        raise HTTPException(status_code=503, detail="Online-Learning nicht verfügbar")
+    
+    if feedback.category not in TEAM_MAPPING:
+        raise HTTPException(status_code=422, detail=f"Unbekannte Kategorie: {feedback.category}")
+    if feedback.priority not in SLA_MAPPING:
+        raise HTTPException(status_code=422, detail=f"Unbekannte Priorität: {feedback.priority}")
+    
+    feedback_id = online_learner.store.add(
+        feedback.ticket.dict(), feedback.category, feedback.priority,
+        ticket_id=feedback.ticket_id,
+        predicted_category=feedback.predicted_category,
+        predicted_priority=feedback.predicted_priority
+    )
+    logger.info(f"📝 Feedback gespeichert: {feedback.predicted_category} → {feedback.category}")
+    
+    return {"feedback_id": feedback_id, "pending": online_learner.store.counts()["pending"]}
+
+@app.get("/api/v1/feedback/stats")
+async def get_feedback_stats():
+    """Anzahl Korrekturen und Version des Online-Modells"""
+    require_model()
+    if online_learner is None:
+        raise HTTPException(status_code=503, detail="Online-Learning nicht verfügbar")
+    return FastJSONResponse(online_learner.stats())
+
+@app.get("/api/v1/rules/stats")
+async def get_rule_stats():
+    """Trefferquote, Early-Exit Anteil und gemessene Precision der Regeln"""
+    require_model()
+    if rule_engine is None:
+        raise HTTPException(status_code=503, detail="Regel-Stufe nicht konfiguriert")
+    return FastJSONResponse(rule_engine.stats())
+
+@app.get("/api/v1/routing/policy")
+async def get_routing_policy_stats():
+    """Version und Reload-Status der Routing-Policy (config/routing_policy.json)"""
+    loader = get_policy_loader()
+    loader.get()
+    return FastJSONResponse(loader.stats())
+
+@app.get("/api/v1/duplicates/clusters")
+async def get_duplicate_clusters(min_size: int = Query(2, ge=1, description="Minimale Cluster-Grösse")):
+    """Aktive Near-Duplicate Cluster (Incident-Gruppierung), grösste zuerst"""
+    require_model()
+    clusters = duplicate_index.clusters(min_size=min_size)
+    return FastJSONResponse({"clusters": clusters, "total": len(clusters)})
+
+@app.get("/api/v1/duplicates/stats")
+async def get_duplicate_stats():
+    """Trefferquote und Konfiguration des Near-Duplicate Index"""
+    require_model()
+    return FastJSONResponse(duplicate_index.stats())
+
+@app.get("/api/v1/audit/stats")
+async def get_audit_stats():
+    """Metriken des Audit-Logs (geschrieben, gepuffert, verworfen)"""
+    require_model()
+    if audit_log is None:
+        raise HTTPException(status_code=503, detail="Audit-Log nicht verfügbar")
+    return FastJSONResponse(audit_log.stats())
+
+@app.get("/api/v1/drift")
+async def get_drift_report():
+    """PSI/KL des Live-Traffics gegenüber der Baseline der Trainingsdaten"""
+    require_model()
+    return FastJSONResponse(drift_monitor.report())
+
 @app.get("/api/v1/model-info")
 async def get_model_info():
     """Gibt Informationen über das geladene Modell zurück"""
     
-    if not classifier or not classifier.is_trained:
-        raise HTTPException(
-            status_code=503,
-            detail="ML-Modell nicht verfügbar"
-        )
+    require_model()
     
+    calibrator = getattr(classifier, 'calibrator', None)
     return {
         "model_version": "2.1.3",
         "model_type": "Ensemble (XGBoost + RandomForest)",
@@ -263,8 +708,10 @@ async def get_model_info():
         "features": {
             "text_processing": "TF-IDF with multilingual support",
             "metadata_features": "User context, temporal, system criticality",
-            "confidence_scoring": "Calibrated probability estimates"
+            "confidence_scoring": "Calibrated probability estimates" if calibrator is not None else "Raw model probabilities"
         },
+        "calibration": calibrator.describe() if calibrator is not None else None,
+        "confidence_thresholds": get_confidence_thresholds(),
         "performance": {
             "category_accuracy": "91.4%",
             "priority_accuracy": "87.8%",
@@ -317,7 +764,8 @@ async def http_exception_handler(request, exc):
             "error": exc.detail,
             "timestamp": datetime.now().isoformat(),
             "path": str(request.url.path)
-        }
+        },
+        headers=getattr(exc, "headers", None)
     )
 
 if __name__ == "__main__":
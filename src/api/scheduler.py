@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Priority-aware Admission Control für die Modell-Inferenz
+Getrennte Warteschlangen (interactive, batch, background) mit gewichtetem
+Fair-Dequeuing, Concurrency-Limits pro Klasse und Load Shedding
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+BACKGROUND = "background"
+
+# Reihenfolge = Wichtigkeit (niedrigste Klasse wird zuerst abgewiesen)
+PRIORITY_CLASSES = (INTERACTIVE, BATCH, BACKGROUND)
+
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", "2"))
+
+DEFAULT_WEIGHTS = {INTERACTIVE: 8, BATCH: 3, BACKGROUND: 1}
+DEFAULT_MAX_QUEUE_DEPTH = {INTERACTIVE: 256, BATCH: 64, BACKGROUND: 16}
+
+# Anteil des gesamten Rückstaus, ab dem eine Klasse abgewiesen wird
+DEFAULT_SHED_AT = {INTERACTIVE: 1.0, BATCH: 0.5, BACKGROUND: 0.25}
+
+# Anzahl Messwerte für Wartezeit-Perzentile pro Klasse
+STATS_WINDOW = 2048
+
+class QueueOverloaded(Exception):
+    """Die Warteschlange einer Klasse ist voll; Anfrage nach retry_after Sekunden wiederholen"""
+
+    def __init__(self, priority_class: str, retry_after: int):
+        super().__init__(f"Warteschlange '{priority_class}' ausgelastet")
+        self.priority_class = priority_class
+        self.retry_after = retry_after
+
+class _ClassState:
+    """Warteschlange und Statistik einer Prioritätsklasse"""
+
+    def __init__(self, name: str, weight: int, concurrency_limit: int, max_queue_depth: int, shed_at: float):
+        self.name = name
+        self.weight = weight
+        self.concurrency_limit = concurrency_limit
+        self.max_queue_depth = max_queue_depth
+        self.shed_at = shed_at
+        self.queue: Deque[Tuple[float, Future, Callable, tuple]] = deque()
+        self.running = 0
+        self.pass_value = 0.0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_times: Deque[float] = deque(maxlen=STATS_WINDOW)
+        self.service_times: Deque[float] = deque(maxlen=STATS_WINDOW)
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+class InferenceScheduler:
+    """
+    Scheduler vor der Modell-Inferenz.
+
+    Tasks werden pro Klasse eingereiht und von einem festen Worker-Pool per
+    Stride Scheduling (gewichtetes Fair-Dequeuing) abgearbeitet. Ein Worker
+    bleibt für interactive reserviert, so dass Bulk-Last den Echtzeit-Pfad nie
+    vollständig blockiert. Bei Rückstau werden zuerst background, dann batch
+    abgewiesen (QueueOverloaded → HTTP 503 mit Retry-After).
+    """
+
+    def __init__(self, workers: int = INFERENCE_WORKERS,
+                 weights: Optional[Dict[str, int]] = None,
+                 concurrency_limits: Optional[Dict[str, int]] = None,
+                 max_queue_depth: Optional[Dict[str, int]] = None,
+                 shed_at: Optional[Dict[str, float]] = None,
+                 reserved_interactive: int = 1):
+        self.workers = max(1, workers)
+        self.reserved_interactive = min(reserved_interactive, self.workers - 1) if self.workers > 1 else 0
+        shared = self.workers - self.reserved_interactive
+
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        limits = {INTERACTIVE: self.workers, BATCH: shared, BACKGROUND: max(1, shared // 2)}
+        limits.update(concurrency_limits or {})
+        depths = {**DEFAULT_MAX_QUEUE_DEPTH, **(max_queue_depth or {})}
+        shed_at = {**DEFAULT_SHED_AT, **(shed_at or {})}
+
+        self._classes = {
+            name: _ClassState(name, weights[name], limits[name], depths[name], shed_at[name])
+            for name in PRIORITY_CLASSES
+        }
+        self._max_backlog = sum(depths.values())
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+        # Zählt shutdown()-Aufrufe, damit wartende call_blocking()-Aufrufe nach einem Neustart nicht weiterlaufen
+        self._generation = 0
+
+    # Worker-Verwaltung
+
+    def _ensure_started(self):
+        """Startet die Worker (auch erneut nach shutdown(), z.B. bei einem Lifespan-Neustart)"""
+        if self._threads:
+            return
+        self._stopping = False
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"inference-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def shutdown(self):
+        """Stoppt die Worker; noch wartende Tasks werden abgebrochen"""
+        with self._cond:
+            self._stopping = True
+            self._generation += 1
+            for state in self._classes.values():
+                while state.queue:
+                    state.queue.popleft()[1].cancel()
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    # Admission Control
+
+    def _backlog(self) -> int:
+        return sum(len(state.queue) for state in self._classes.values())
+
+    def _retry_after(self, state: _ClassState) -> int:
+        """Schätzt die Wartezeit aus Rückstau und mittlerer Bearbeitungszeit"""
+        service = list(state.service_times) or [0.05]
+        mean_service = sum(service) / len(service)
+        return max(1, math.ceil(self._backlog() * mean_service / self.workers))
+
+    def _check_admission(self, state: _ClassState):
+        backlog = self._backlog()
+        if len(state.queue) >= state.max_queue_depth or backlog >= state.shed_at * self._max_backlog:
+            state.rejected += 1
+            raise QueueOverloaded(state.name, self._retry_after(state))
+
+    def check_admission(self, priority_class: str):
+        """Prüft ohne einzureihen, ob eine Klasse aktuell Arbeit annimmt"""
+        with self._cond:
+            self._check_admission(self._classes[priority_class])
+
+    def submit(self, priority_class: str, fn: Callable, *args) -> Future:
+        """Reiht fn(*args) in die Warteschlange der Klasse ein; wirft QueueOverloaded"""
+        state = self._classes[priority_class]
+        future: Future = Future()
+        with self._cond:
+            self._ensure_started()
+            if self._stopping:
+                raise RuntimeError("Scheduler wird beendet")
+            self._check_admission(state)
+            if not state.queue and state.running == 0:
+                # Keine Gutschrift für Leerlaufzeit: an aktive Klassen angleichen
+                state.pass_value = max(state.pass_value, self._min_active_pass())
+            state.queue.append((time.perf_counter(), future, fn, args))
+            state.submitted += 1
+            self._cond.notify()
+        return future
+
+    async def run(self, priority_class: str, fn: Callable, *args) -> Any:
+        """Async-Variante von submit(); wartet auf das Ergebnis ohne den Event Loop zu blockieren"""
+        return await asyncio.wrap_future(self.submit(priority_class, fn, *args))
+
+    def call_blocking(self, priority_class: str, fn: Callable, *args) -> Any:
+        """
+        Für Hintergrund-Threads: wartet bei Überlast statt abzuweisen.
+        Wirft RuntimeError, sobald shutdown() aufgerufen wurde.
+        """
+        generation = self._generation
+        while True:
+            try:
+                return self.submit(priority_class, fn, *args).result()
+            except QueueOverloaded as e:
+                with self._cond:
+                    # shutdown() und abgeschlossene Tasks wecken den Wartenden vorzeitig
+                    if not self._stopping and self._generation == generation:
+                        self._cond.wait(e.retry_after)
+                    if self._stopping or self._generation != generation:
+                        raise RuntimeError("Scheduler wird beendet") from e
+
+    # Dequeuing
+
+    def _min_active_pass(self) -> float:
+        active = [s.pass_value for s in self._classes.values() if s.queue or s.running]
+        return min(active) if active else 0.0
+
+    def _shared_running(self) -> int:
+        return sum(s.running for name, s in self._classes.items() if name != INTERACTIVE)
+
+    def _next_task(self) -> Optional[Tuple[_ClassState, Tuple[float, Future, Callable, tuple]]]:
+        """Wählt die berechtigte Klasse mit dem kleinsten Pass-Wert (Stride Scheduling)"""
+        best = None
+        shared_free = self._shared_running() < self.workers - self.reserved_interactive
+        for name, state in self._classes.items():
+            if not state.queue or state.running >= state.concurrency_limit:
+                continue
+            if name != INTERACTIVE and not shared_free:
+                continue
+            if best is None or state.pass_value < best.pass_value:
+                best = state
+        if best is None:
+            return None
+        best.pass_value += 1.0 / best.weight
+        return best, best.queue.popleft()
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                selected = self._next_task()
+                while selected is None:
+                    if self._stopping:
+                        return
+                    self._cond.wait()
+                    selected = self._next_task()
+                state, (enqueued_at, future, fn, args) = selected
+                state.running += 1
+
+            started_at = time.perf_counter()
+            executed = future.set_running_or_notify_cancel()
+            try:
+                if executed:
+                    try:
+                        future.set_result(fn(*args))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                finished_at = time.perf_counter()
+                with self._cond:
+                    state.running -= 1
+                    if executed:
+                        state.completed += 1
+                        state.wait_times.append(started_at - enqueued_at)
+                        state.service_times.append(finished_at - started_at)
+                    self._cond.notify_all()
+
+    # Monitoring
+
+    def stats(self) -> Dict[str, Any]:
+        """Warteschlangen-Tiefe, Auslastung und Wartezeiten pro Klasse"""
+        with self._cond:
+            snapshot = {
+                name: (len(s.queue), s.running, s.submitted, s.completed, s.rejected,
+                       list(s.wait_times), list(s.service_times), s)
+                for name, s in self._classes.items()
+            }
+            backlog = self._backlog()
+
+        classes = {}
+        for name, (depth, running, submitted, completed, rejected, waits, services, state) in snapshot.items():
+            classes[name] = {
+                "queue_depth": depth,
+                "max_queue_depth": state.max_queue_depth,
+                "running": running,
+                "concurrency_limit": state.concurrency_limit,
+                "weight": state.weight,
+                "submitted": submitted,
+                "completed": completed,
+                "rejected": rejected,
+                "wait_ms": {
+                    "p50": _ms(_percentile(waits, 0.5)),
+                    "p99": _ms(_percentile(waits, 0.99)),
+                    "max": _ms(max(waits) if waits else None)
+                },
+                "service_ms": {
+                    "p50": _ms(_percentile(services, 0.5)),
+                    "p99": _ms(_percentile(services, 0.99))
+                }
+            }
+        return {
+            "workers": self.workers,
+            "reserved_interactive": self.reserved_interactive,
+            "backlog": backlog,
+            "classes": classes
+        }
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 3) if seconds is not None else None
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Gemeinsame Eingabe-Schemas für API und Spool-Ingestion
+Klein gehalten, damit ingest.py die Tickets validieren kann, ohne die FastAPI-App zu laden
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+from pydantic import BaseModel, Field
+
+# Kategorische Kontextwerte der Trainingsdaten (siehe data/generate_sample_data.py);
+# andere Werte kennen die Label-Encoder des Modells nicht
+USER_ROLES = ("end_user", "admin", "developer", "manager", "intern")
+DEPARTMENTS = ("IT", "HR", "Finance", "Sales", "Marketing", "Operations", "Legal")
+AFFECTED_SYSTEMS = ("email", "erp", "crm", "network", "workstation", "server", "database", "web_app", "printer")
+
+class TicketInput(BaseModel):
+    title: str = Field(..., description="Ticket Titel", example="Laptop won't start - black screen")
+    description: str = Field(..., description="Ticket Beschreibung", example="My laptop shows a black screen when I press the power button. Tried restarting multiple times.")
+    user_role: str = Field(..., description="Benutzer-Rolle", example="end_user")
+    department: str = Field(..., description="Abteilung", example="Finance")
+    affected_system: str = Field(..., description="Betroffenes System", example="workstation")
+    hour_submitted: int = Field(..., description="Stunde der Einreichung (0-23)", example=14)
+    is_weekend: int = Field(..., description="Wochenende? (0=Nein, 1=Ja)", example=0)
+    previous_tickets_30d: int = Field(..., description="Anzahl Tickets der letzten 30 Tage", example=1)
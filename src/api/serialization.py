@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Schnelle Response-Serialisierung für die IT-Ticket Classification API
+Baut Responses direkt als Dicts und serialisiert sie mit orjson (falls installiert)
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import json
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi.responses import JSONResponse
+
+from utils.routing import Route, get_routing_policy, resolve_route, route_key
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MODEL_VERSION = "2.1.3"
+
+# Konstante Sub-Objekte: werden von allen Responses geteilt und nie verändert
+KEY_FACTORS = (
+    "Text content analysis",
+    "User role and department context",
+    "System criticality assessment",
+    "Historical pattern matching"
+)
+
+_EXPLANATIONS: Dict[tuple, Dict[str, Any]] = {}
+
+def _finite(value: Any) -> Any:
+    """Ersetzt NaN/Infinity durch None, wie orjson sie als null schreibt"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+def _json_default(obj: Any) -> Any:
+    """Fallback für Typen, die das json-Modul nicht kennt (z.B. numpy Skalare)"""
+    if getattr(obj, "ndim", 0) == 0 and hasattr(obj, "item"):
+        return _finite(obj.item())
+    if hasattr(obj, "tolist"):
+        return _finite(obj.tolist())
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Type {type(obj).__name__} is not JSON serializable")
+
+def _json_dumps(content: Any) -> bytes:
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_json_default
+    ).encode("utf-8")
+
+def dumps(content: Any) -> bytes:
+    """Serialisiert content zu kompaktem JSON (orjson falls verfügbar, NaN/Infinity als null)"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    try:
+        return _json_dumps(content)
+    except ValueError:
+        # Nur bei nicht-endlichen Floats: zweiter Durchlauf mit bereinigten Werten
+        return _json_dumps(_finite(content))
+
+def loads(data: bytes) -> Any:
+    """Parst JSON (orjson falls verfügbar)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse ohne erneute Validierung, serialisiert mit dumps()"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def get_explanation(confidence_level: str, recommendation: str) -> Dict[str, Any]:
+    """
+    Liefert das Erklärungs-Dict für (Confidence Level, Empfehlung).
+    Pro Kombination existiert genau ein geteiltes Dict - nicht verändern!
+    """
+    key = (confidence_level, recommendation)
+    explanation = _EXPLANATIONS.get(key)
+    if explanation is None:
+        explanation = {
+            "confidence_level": confidence_level,
+            "recommendation": recommendation,
+            "key_factors": KEY_FACTORS
+        }
+        _EXPLANATIONS[key] = explanation
+    return explanation
+
+def build_metadata(processing_time_ms: float, timestamp: Optional[str] = None) -> Dict[str, Any]:
+    """Erstellt das Metadaten-Dict einer Vorhersage"""
+    return {
+        "model_version": MODEL_VERSION,
+        "processing_time_ms": round(processing_time_ms, 2),
+        "timestamp": timestamp or datetime.now().isoformat()
+    }
+
+def build_prediction_payload(category: str, priority: str, category_confidence: float,
+                             priority_confidence: float, overall_confidence: float,
+                             metadata: Dict[str, Any], record: Optional[Dict[str, Any]] = None,
+                             route: Optional[Route] = None) -> Dict[str, Any]:
+    """
+    Erstellt eine Response im Format von TicketPrediction als einfaches Dict.
+    Mit record (Eingabe-Dict) greifen auch Abteilungs- und System-Regeln der Routing-Policy;
+    ein bereits aufgelöstes route (build_batch_payloads) wird direkt übernommen.
+    """
+    overall_confidence = float(overall_confidence)
+    if route is None:
+        route = resolve_route(category, priority, overall_confidence, record)
+    return {
+        "prediction": {
+            "category": category,
+            "priority": priority,
+            "category_confidence": float(category_confidence),
+            "priority_confidence": float(priority_confidence),
+            "overall_confidence": overall_confidence
+        },
+        "routing": route.routing,
+        "explanation": get_explanation(route.confidence_level, route.recommendation),
+        "metadata": metadata
+    }
+
+def build_batch_payloads(predictions, metadata: Dict[str, Any],
+                         records: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Erstellt Responses für alle Zeilen eines Prediction-DataFrames.
+    Spalten werden einmal als Listen extrahiert, alle Zeilen teilen sich metadata.
+    records sind die Eingabe-Dicts in derselben Reihenfolge (für die Routing-Policy).
+    Das Routing wird mit einem resolve_many für die eindeutigen Schlüssel des Batches aufgelöst.
+    """
+    categories = predictions["category"].tolist()
+    priorities = predictions["priority"].tolist()
+    overall = predictions["overall_confidence"].tolist()
+    records = records if records is not None else [None] * len(categories)
+    routes = get_routing_policy().resolve_many(
+        route_key(*key) for key in zip(categories, priorities, overall, records)
+    )
+    columns = zip(
+        categories, priorities,
+        predictions["category_confidence"].tolist(),
+        predictions["priority_confidence"].tolist(),
+        overall, records, routes
+    )
+    return [
+        build_prediction_payload(category, priority, cat_conf, prio_conf, confidence, metadata, record, route)
+        for category, priority, cat_conf, prio_conf, confidence, record, route in columns
+    ]
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Streaming NDJSON Bulk-Klassifikation für die IT-Ticket Classification API
+Liest Tickets zeilenweise aus dem Request-Body und streamt Ergebnisse zurück
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from starlette.requests import ClientDisconnect
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from api.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Standard-Grösse der internen Batches für classifier.predict
+STREAM_BATCH_SIZE = 256
+
+# Maximale Länge einer einzelnen NDJSON-Zeile (Bytes)
+MAX_LINE_BYTES = 1024 * 1024
+
+async def iter_body_lines(receive: Receive, max_line_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Liest den Request-Body direkt vom ASGI-Kanal und liefert (Zeilennummer, Zeile).
+    Zu lange Zeilen werden verworfen und als (Zeilennummer, None) gemeldet.
+    Wirft ClientDisconnect, wenn der Client die Verbindung trennt.
+    """
+    buffer = bytearray()
+    line_no = 0
+    overflow = False
+    more_body = True
+
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise ClientDisconnect()
+        if message["type"] != "http.request":
+            continue
+
+        more_body = message.get("more_body", False)
+        chunk = message.get("body", b"")
+        start = 0
+
+        while True:
+            newline = chunk.find(b"\n", start)
+            if newline == -1:
+                if not overflow:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line_bytes:
+                        overflow = True
+                        buffer.clear()
+                break
+
+            line_no += 1
+            if not overflow:
+                buffer += chunk[start:newline]
+                overflow = len(buffer) > max_line_bytes
+            if overflow:
+                overflow = False
+                yield line_no, None
+            else:
+                yield line_no, bytes(buffer)
+            buffer.clear()
+            start = newline + 1
+
+    if overflow:
+        yield line_no + 1, None
+    elif buffer.strip():
+        yield line_no + 1, bytes(buffer)
+
+class NDJSONClassificationResponse(Response):
+    """
+    Streaming-Response für NDJSON Bulk-Klassifikation.
+
+    Der Request-Body wird erst hier gelesen (nicht im Endpoint), damit weder
+    Input noch Output vollständig im Speicher liegen: pro Batch werden höchstens
+    batch_size Tickets gehalten, klassifiziert und sofort zurückgeschrieben.
+    predict_fn ist eine Coroutine, die den Modell-Aufruf ausserhalb des Event Loops ausführt.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def __init__(self, predict_fn: Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]],
+                 validate_fn: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 batch_size: int = STREAM_BATCH_SIZE,
+                 max_line_bytes: int = MAX_LINE_BYTES):
+        self.predict_fn = predict_fn
+        self.validate_fn = validate_fn
+        self.batch_size = batch_size
+        self.max_line_bytes = max_line_bytes
+        self.status_code = 200
+        self.background = None
+        self.init_headers({"X-Content-Type-Options": "nosniff"})
+        self.stats = {"tickets": 0, "errors": 0, "batches": 0}
+
+    def _parse_line(self, line_no: int, line: Optional[bytes]) -> Dict[str, Any]:
+        """Parst und validiert eine Zeile; gibt Ticket oder Fehler-Eintrag zurück"""
+        if line is None:
+            return {"line": line_no, "error": f"Zeile länger als {self.max_line_bytes} Bytes"}
+        try:
+            record = loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Zeile ist kein JSON-Objekt")
+            return {"line": line_no, "ticket_id": record.get("ticket_id"), "ticket": self.validate_fn(record)}
+        except (ValueError, TypeError) as e:
+            return {"line": line_no, "error": f"Ungültiges Ticket: {e}"}
+
+    async def _classify_batch(self, entries: List[Dict[str, Any]]) -> bytes:
+        """Klassifiziert die gültigen Einträge eines Batches und serialisiert alle Einträge in Eingabe-Reihenfolge"""
+        valid = [entry for entry in entries if "ticket" in entry]
+
+        if valid:
+            try:
+                payloads = await self.predict_fn([entry["ticket"] for entry in valid])
+                for entry, payload in zip(valid, payloads):
+                    entry["result"] = payload
+            except Exception as e:
+                logger.error(f"❌ Fehler bei Stream-Klassifikation: {e}")
+                for entry in valid:
+                    entry["error"] = f"Klassifikationsfehler: {str(e)}"
+
+        lines = []
+        for entry in entries:
+            if "result" in entry:
+                record = {"line": entry["line"]}
+                if entry["ticket_id"] is not None:
+                    record["ticket_id"] = entry["ticket_id"]
+                record.update(entry["result"])
+                self.stats["tickets"] += 1
+            else:
+                record = {"line": entry["line"], "error": entry["error"]}
+                self.stats["errors"] += 1
+            lines.append(dumps(record))
+
+        self.stats["batches"] += 1
+        return b"\n".join(lines) + b"\n"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        start_time = time.time()
+        entries: List[Dict[str, Any]] = []
+        n_valid = 0
+
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+            async for line_no, line in iter_body_lines(receive, self.max_line_bytes):
+                if line is not None and not line.strip():
+                    continue
+                entry = self._parse_line(line_no, line)
+                entries.append(entry)
+                if "ticket" in entry:
+                    n_valid += 1
+
+                if n_valid >= self.batch_size or len(entries) >= 2 * self.batch_size:
+                    body = await self._classify_batch(entries)
+                    await send({"type": "http.response.body", "body": body, "more_body": True})
+                    entries = []
+                    n_valid = 0
+
+            if entries:
+                body = await self._classify_batch(entries)
+                await send({"type": "http.response.body", "body": body, "more_body": True})
+
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+        except (ClientDisconnect, OSError):
+            logger.warning(
+                f"⚠️ Client hat Stream getrennt nach {self.stats['tickets']} Tickets "
+                f"({self.stats['batches']} Batches) - Verarbeitung abgebrochen"
+            )
+            return
+
+        elapsed = time.time() - start_time
+        rate = self.stats["tickets"] / elapsed if elapsed > 0 else 0.0
+        logger.info(
+            f"🌊 Stream abgeschlossen: {self.stats['tickets']} Tickets, {self.stats['errors']} Fehler "
+            f"in {elapsed:.1f}s ({rate:.0f} Tickets/s)"
+        )
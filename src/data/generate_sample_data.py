@@ -15,12 +15,22 @@ import random
 import csv
 import os
 
-def generate_realistic_tickets(n_samples=1000):
+# Datensätze: Datei -> (Anzahl Tickets, Seed, erste Ticket-Nummer)
+# Eigener Seed und eigener Nummernbereich pro Split, damit Training, Validierung und Test keine Zeilen teilen
+DATASETS = {
+    'data/raw/training_data.csv': (15000, 42, 1),
+    'data/raw/validation_data.csv': (3000, 43, 15001),
+    'data/raw/test_data.csv': (3000, 44, 18001),
+    'data/raw/demo_data.csv': (100, 45, 21001)
+}
+
+def generate_realistic_tickets(n_samples=1000, seed=42, start_id=1):
     """
     Generiert realistische IT-Ticket Beispieldaten
+    (reproduzierbar über seed, Ticket-IDs ab start_id)
     """
-    np.random.seed(42)
-    random.seed(42)
+    np.random.seed(seed)
+    random.seed(seed)
     
     # Hardware Issues - Realistische Problembeschreibungen
     hardware_issues = [
@@ -256,7 +266,7 @@ def generate_realistic_tickets(n_samples=1000):
     
     # Generiere Tickets
     tickets = []
-    ticket_counter = 1
+    ticket_counter = start_id
     
     for i in range(n_samples):
         # Wähle Kategorie
@@ -284,12 +294,14 @@ def generate_realistic_tickets(n_samples=1000):
         
         # Time-based attributes
         base_date = datetime.now() - timedelta(days=np.random.randint(0, 180))
-        hour_submitted = np.random.choice(range(24), p=[
+        hour_weights = np.array([
             0.01, 0.01, 0.01, 0.01, 0.01, 0.01,  # 0-5 Uhr
             0.02, 0.05, 0.08, 0.12, 0.15, 0.15,  # 6-11 Uhr  
             0.12, 0.15, 0.15, 0.12, 0.08, 0.05,  # 12-17 Uhr
             0.02, 0.01, 0.01, 0.01, 0.01, 0.01   # 18-23 Uhr
         ])
+        # Gewichte summieren sich nicht zu 1, numpy verlangt normierte Wahrscheinlichkeiten
+        hour_submitted = np.random.choice(range(24), p=hour_weights / hour_weights.sum())
         
         is_weekend = 1 if base_date.weekday() >= 5 else 0
         
@@ -370,15 +382,9 @@ def create_sample_files():
     os.makedirs('data/processed', exist_ok=True)
     
     # Generiere verschiedene Datensätze
-    datasets = {
-        'data/raw/training_data.csv': 15000,
-        'data/raw/test_data.csv': 3000,
-        'data/raw/demo_data.csv': 100
-    }
-    
-    for filename, size in datasets.items():
+    for filename, (size, seed, start_id) in DATASETS.items():
         print(f"📄 Erstelle {filename} mit {size:,} Tickets...")
-        df = generate_realistic_tickets(size)
+        df = generate_realistic_tickets(size, seed=seed, start_id=start_id)
         df.to_csv(filename, index=False, encoding='utf-8')
         
         # Zeige Statistiken
@@ -388,7 +394,7 @@ def create_sample_files():
         print()
     
     # Erstelle auch ein kleines Demo-Dataset als JSON
-    demo_df = generate_realistic_tickets(20)
+    demo_df = generate_realistic_tickets(20, seed=46, start_id=21101)
     demo_df.to_json('data/raw/demo_tickets.json', orient='records', indent=2)
     
     print("📋 Beispiel-Tickets (erste 5):")
@@ -404,6 +410,7 @@ def create_sample_files():
     print(f"\n✅ Beispieldaten erfolgreich erstellt!")
     print(f"📁 Dateien:")
     print(f"   - data/raw/training_data.csv (15,000 Tickets für Training)")
+    print(f"   - data/raw/validation_data.csv (3,000 Tickets für Kalibrierung)")
     print(f"   - data/raw/test_data.csv (3,000 Tickets für Testing)")  
     print(f"   - data/raw/demo_data.csv (100 Tickets für Demos)")
     print(f"   - data/raw/demo_tickets.json (20 Tickets als JSON)")
@@ -418,6 +425,7 @@ if __name__ == "__main__":
     print(f"\n📊 DATASET ÜBERSICHT:")
     print(f"=" * 30)
     print(f"✓ Training Dataset: 15,000 Tickets")
+    print(f"✓ Validation Dataset: 3,000 Tickets")
     print(f"✓ Test Dataset: 3,000 Tickets") 
     print(f"✓ Demo Dataset: 100 Tickets")
     print(f"\n🎯 Ready für Machine Learning Training!")
\ No newline at end of file
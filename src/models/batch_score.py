@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Offline Batch-Scoring für IT-Tickets (CSV / Parquet)
+Klassifiziert grosse Ticket-Dateien in Chunks mit einem Prozess-Pool
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+
+Beispiel:
+    python src/models/batch_score.py data/raw/test_data.csv data/processed/test_scored.csv --workers 4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+import pandas as pd
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.routing import get_confidence_level, get_routing_policy
+
+DEFAULT_MODEL_PATH = "data/models/it_ticket_classifier_v2.1.3.pkl"
+DEFAULT_CHUNK_SIZE = 10000
+
+# Spalten, die classifier.predict() erwartet (Schema von data/raw/test_data.csv)
+INPUT_COLUMNS = [
+    'title', 'description', 'user_role', 'department', 'affected_system',
+    'hour_submitted', 'is_weekend', 'previous_tickets_30d'
+]
+
+# Pro Worker-Prozess geladenes Modell
+_worker_classifier = None
+
+def _load_classifier(model_path: str):
+    """Lädt das trainierte Modell über ITTicketClassifier.load_model (inkl. Kalibrierung)"""
+    from models.calibration import attach_calibrator
+    from models.train_classifier import ITTicketClassifier
+
+    classifier = ITTicketClassifier()
+    classifier.load_model(model_path)
+    attach_calibrator(classifier, model_path=model_path)
+    return classifier
+
+def _init_worker(model_path: str):
+    """Initializer für Worker-Prozesse: lädt das Modell einmal pro Prozess"""
+    global _worker_classifier
+    _worker_classifier = _load_classifier(model_path)
+
+def read_chunks(path: str, chunk_size: int, columns: Optional[list] = None) -> Iterator[pd.DataFrame]:
+    """Liest eine CSV- oder Parquet-Datei chunkweise"""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=columns, encoding='utf-8')
+
+def count_rows(path: str) -> Optional[int]:
+    """Anzahl Zeilen aus den Parquet-Metadaten (für CSV unbekannt)"""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    return None
+
+def add_routing(predictions: pd.DataFrame, chunk: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Ergänzt Team, SLA, Confidence Level und Empfehlung über die Routing-Policy.
+    Aufgelöst wird nur jede eindeutige Kombination aus Kategorie, Priorität,
+    Abteilung, System und Confidence Level; das Ergebnis wird per Merge verteilt.
+    """
+    overall = predictions['overall_confidence']
+    levels = overall.map({value: get_confidence_level(value) for value in overall.unique()})
+    keys = pd.DataFrame({
+        'category': predictions['category'].to_numpy(),
+        'priority': predictions['priority'].to_numpy(),
+        'department': chunk['department'].to_numpy() if chunk is not None else None,
+        'affected_system': chunk['affected_system'].to_numpy() if chunk is not None else None,
+        'confidence_level': levels.to_numpy()
+    })
+    unique = keys.drop_duplicates().reset_index(drop=True)
+    routes = get_routing_policy().resolve_many(unique.itertuples(index=False, name=None))
+    unique['suggested_team'] = [route.routing["suggested_team"] for route in routes]
+    unique['sla_target'] = [route.routing["sla_target"] for route in routes]
+    unique['recommendation'] = [route.recommendation for route in routes]
+
+    resolved = keys.merge(unique, how='left', on=list(keys.columns), sort=False)
+    for column in ['suggested_team', 'sla_target', 'confidence_level', 'recommendation']:
+        predictions[column] = resolved[column].to_numpy()
+    return predictions
+
+def score_chunk(chunk: pd.DataFrame, classifier=None) -> pd.DataFrame:
+    """Klassifiziert einen Chunk und gibt Vorhersagen inkl. Routing zurück"""
+    classifier = classifier or _worker_classifier
+
+    predictions = classifier.predict(chunk[INPUT_COLUMNS]).reset_index(drop=True)
+    calibrator = getattr(classifier, 'calibrator', None)
+    if calibrator is not None:
+        predictions = calibrator.apply(predictions)
+    predictions = add_routing(predictions, chunk.reset_index(drop=True))
+
+    if 'ticket_id' in chunk.columns:
+        predictions.insert(0, 'ticket_id', chunk['ticket_id'].to_numpy())
+    return predictions
+
+def _score_chunk_task(chunk_id: int, chunk: pd.DataFrame) -> Tuple[int, pd.DataFrame]:
+    """Picklebare Task-Funktion für den Prozess-Pool"""
+    return chunk_id, score_chunk(chunk)
+
+class Checkpoint:
+    """
+    Resumable Checkpoint: merkt sich abgeschlossene Chunks einer Eingabedatei.
+    Jeder Chunk wird zuerst als Part-Datei geschrieben, danach im Checkpoint vermerkt.
+    """
+
+    def __init__(self, path: str, input_path: str, chunk_size: int):
+        self.path = path
+        self.fingerprint = self._fingerprint(input_path, chunk_size)
+        self.completed: Set[int] = set()
+
+    @staticmethod
+    def _fingerprint(input_path: str, chunk_size: int) -> str:
+        stat = os.stat(input_path)
+        key = f"{os.path.abspath(input_path)}|{stat.st_size}|{stat.st_mtime_ns}|{chunk_size}"
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def load(self) -> bool:
+        """Lädt einen passenden Checkpoint; False wenn keiner existiert oder Input geändert"""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('fingerprint') != self.fingerprint:
+            return False
+        self.completed = set(state.get('completed', []))
+        return True
+
+    def mark_done(self, chunk_id: int):
+        """Vermerkt einen Chunk als abgeschlossen (atomar geschrieben)"""
+        self.completed.add(chunk_id)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': self.fingerprint, 'completed': sorted(self.completed)}, f)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+class ProgressReporter:
+    """Fortschritts- und Durchsatzanzeige"""
+
+    def __init__(self, total_rows: Optional[int] = None, interval: float = 2.0):
+        self.total_rows = total_rows
+        self.interval = interval
+        self.rows = 0
+        self.start_time = time.time()
+        self.last_report = 0.0
+
+    def update(self, rows: int, force: bool = False):
+        self.rows += rows
+        now = time.time()
+        if not force and now - self.last_report < self.interval:
+            return
+        self.last_report = now
+
+        elapsed = now - self.start_time
+        rate = self.rows / elapsed if elapsed > 0 else 0.0
+        message = f"   ⏱️ {self.rows:,} Tickets | {rate:,.0f} Tickets/s | {elapsed:.1f}s"
+        if self.total_rows and rate > 0:
+            remaining = max(self.total_rows - self.rows, 0) / rate
+            message += f" | {self.rows / self.total_rows:.1%} | ETA {remaining:.0f}s"
+        print(message, flush=True)
+
+def _write_part(parts_dir: str, chunk_id: int, predictions: pd.DataFrame) -> str:
+    """Schreibt einen Chunk atomar als Parquet-Part-Datei"""
+    part_path = os.path.join(parts_dir, f"part-{chunk_id:06d}.parquet")
+    tmp_path = part_path + '.tmp'
+    predictions.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, part_path)
+    return part_path
+
+def _merge_parts(parts_dir: str, output_path: str):
+    """Fügt alle Part-Dateien in Chunk-Reihenfolge zur Ausgabedatei zusammen"""
+    part_files = sorted(f for f in os.listdir(parts_dir) if f.endswith('.parquet'))
+
+    if output_path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for part_file in part_files:
+                table = pq.read_table(os.path.join(parts_dir, part_file))
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        for i, part_file in enumerate(part_files):
+            part = pd.read_parquet(os.path.join(parts_dir, part_file))
+            part.to_csv(output_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False, encoding='utf-8')
+
+def score_file(input_path: str, output_path: str, model_path: str = DEFAULT_MODEL_PATH,
+               chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = 0,
+               restart: bool = False) -> Dict[str, Any]:
+    """
+    Klassifiziert eine CSV- oder Parquet-Datei und schreibt Vorhersagen + Routing.
+
+    workers=0 klassifiziert im aktuellen Prozess, sonst mit einem Prozess-Pool.
+    Abgeschlossene Chunks werden in einem Checkpoint vermerkt, so dass ein
+    abgebrochener Lauf beim nächsten Aufruf fortgesetzt wird (ausser restart=True).
+    """
+    parts_dir = output_path + '.parts'
+    checkpoint = Checkpoint(output_path + '.checkpoint.json', input_path, chunk_size)
+
+    if restart or not checkpoint.load():
+        checkpoint.remove()
+        shutil.rmtree(parts_dir, ignore_errors=True)
+    elif checkpoint.completed:
+        print(f"🔄 Setze fort: {len(checkpoint.completed)} Chunks bereits abgeschlossen")
+    os.makedirs(parts_dir, exist_ok=True)
+
+    progress = ProgressReporter(count_rows(input_path))
+    chunks = (
+        (chunk_id, chunk)
+        for chunk_id, chunk in enumerate(read_chunks(input_path, chunk_size))
+        if chunk_id not in checkpoint.completed
+    )
+
+    def handle_result(chunk_id: int, predictions: pd.DataFrame):
+        _write_part(parts_dir, chunk_id, predictions)
+        checkpoint.mark_done(chunk_id)
+        progress.update(len(predictions))
+
+    if workers <= 0:
+        classifier = _load_classifier(model_path)
+        for chunk_id, chunk in chunks:
+            handle_result(chunk_id, score_chunk(chunk, classifier))
+    else:
+        # Höchstens 2 Chunks pro Worker gleichzeitig im Speicher
+        max_in_flight = workers * 2
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+            pending = set()
+            for chunk_id, chunk in chunks:
+                pending.add(pool.submit(_score_chunk_task, chunk_id, chunk))
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        handle_result(*future.result())
+            for future in pending:
+                handle_result(*future.result())
+
+    progress.update(0, force=True)
+    _merge_parts(parts_dir, output_path)
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    checkpoint.remove()
+
+    elapsed = time.time() - progress.start_time
+    return {
+        'rows': progress.rows,
+        'chunks': len(checkpoint.completed),
+        'elapsed_seconds': round(elapsed, 2),
+        'tickets_per_second': round(progress.rows / elapsed, 1) if elapsed > 0 else 0.0
+    }
+
+def main(argv=None):
+    """CLI Entry Point"""
+    parser = argparse.ArgumentParser(description="Offline Batch-Scoring für IT-Tickets (CSV / Parquet)")
+    parser.add_argument('input', help="Eingabedatei (.csv oder .parquet)")
+    parser.add_argument('output', help="Ausgabedatei (.csv oder .parquet)")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help="Pfad zum trainierten Modell")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Tickets pro Chunk")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Anzahl Worker-Prozesse (0 = im aktuellen Prozess)")
+    parser.add_argument('--restart', action='store_true', help="Checkpoint ignorieren und neu beginnen")
+    args = parser.parse_args(argv)
+
+    print("🎫 IT-Ticket Batch-Scoring")
+    print("=" * 50)
+    print(f"📄 Input:  {args.input}")
+    print(f"📄 Output: {args.output}")
+    print(f"⚙️ Chunk-Grösse: {args.chunk_size:,} | Worker: {args.workers}")
+
+    summary = score_file(
+        args.input, args.output,
+        model_path=args.model,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        restart=args.restart
+    )
+
+    print(f"\n✅ {summary['rows']:,} Tickets klassifiziert in {summary['elapsed_seconds']}s "
+          f"({summary['tickets_per_second']:,} Tickets/s)")
+    return summary
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Confidence-Kalibrierung für den IT-Ticket Klassifikator
+Isotone Kalibrierung pro Kopf (Kategorie, Priorität, Gesamt) auf dem Validierungs-Split
+und daraus abgeleitete Schwellen für automatische Zuweisung und Review.
+Der Test-Split (data/raw/test_data.csv) bleibt der Evaluation vorbehalten.
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+
+Beispiel:
+    python src/models/calibration.py data/raw/validation_data.csv
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.routing import DEFAULT_CONFIDENCE_THRESHOLDS, set_confidence_thresholds
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = "data/models/it_ticket_classifier_v2.1.3.pkl"
+CALIBRATION_PATH = os.environ.get("CALIBRATION_PATH", "data/models/calibration.json")
+
+# Gelabelter Split, der weder trainiert noch zur Evaluation verwendet wird
+VALIDATION_DATA_PATH = "data/raw/validation_data.csv"
+TEST_DATA_PATH = "data/raw/test_data.csv"
+
+# Kopf -> Confidence-Spalte von classifier.predict
+HEADS = {
+    "category": "category_confidence",
+    "priority": "priority_confidence",
+    "overall": "overall_confidence",
+}
+
+# Mindest-Precision der Tickets oberhalb der jeweiligen Schwelle (Gesamt-Kopf:
+# Kategorie und Priorität korrekt). Entspricht den bisherigen festen 0.9 / 0.8.
+PRECISION_TARGETS = {
+    "automatic_assignment": 0.9,
+    "review_recommended": 0.8,
+}
+
+# Unter dieser Anzahl Tickets oberhalb einer Schwelle gilt die Precision als nicht belastbar
+MIN_SAMPLES = 30
+
+class IsotonicCurve:
+    """
+    Monotone Abbildung roh -> kalibriert, gespeichert als Stützstellen.
+    Die Anwendung ist ein einziges np.interp über alle Zeilen (entspricht
+    IsotonicRegression.predict mit out_of_bounds='clip').
+    """
+
+    def __init__(self, x, y):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+
+    @classmethod
+    def fit(cls, confidences, correct) -> "IsotonicCurve":
+        from sklearn.isotonic import IsotonicRegression
+
+        regression = IsotonicRegression(y_min=0.0, y_max=1.0, increasing=True, out_of_bounds='clip')
+        regression.fit(np.asarray(confidences, dtype=np.float64), np.asarray(correct, dtype=np.float64))
+        return cls(regression.X_thresholds_, regression.y_thresholds_)
+
+    def __call__(self, confidences) -> np.ndarray:
+        return np.interp(np.asarray(confidences, dtype=np.float64), self.x, self.y)
+
+    def to_dict(self) -> Dict[str, list]:
+        return {"x": self.x.round(6).tolist(), "y": self.y.round(6).tolist()}
+
+def select_threshold(confidences, correct, target: float, min_samples: int = MIN_SAMPLES) -> Optional[float]:
+    """
+    Kleinste Schwelle t, für die die Tickets mit Confidence >= t mindestens
+    target Precision haben (maximale Abdeckung). None, falls keine Schwelle
+    mit mindestens min_samples Tickets das Ziel erreicht.
+    """
+    order = np.argsort(-np.asarray(confidences, dtype=np.float64), kind='stable')
+    sorted_conf = np.asarray(confidences, dtype=np.float64)[order]
+    precision = np.cumsum(np.asarray(correct, dtype=np.float64)[order]) / np.arange(1, len(order) + 1)
+
+    # Nur an Grenzen gleicher Confidence schneiden, sonst zählt t mehr Tickets als k
+    boundary = np.r_[sorted_conf[:-1] != sorted_conf[1:], True]
+    valid = boundary & (precision >= target) & (np.arange(1, len(order) + 1) >= min_samples)
+    if not valid.any():
+        return None
+    return float(sorted_conf[np.flatnonzero(valid)[-1]])
+
+class ConfidenceCalibrator:
+    """
+    Kalibrierte Confidence für alle Köpfe plus datengetriebene Routing-Schwellen.
+    apply() ersetzt die Confidence-Spalten eines Prediction-DataFrames in place.
+    """
+
+    def __init__(self, curves: Dict[str, IsotonicCurve], thresholds: Dict[str, float],
+                 info: Optional[Dict[str, Any]] = None):
+        self.curves = curves
+        self.thresholds = thresholds
+        self.info = info or {}
+
+    @classmethod
+    def fit(cls, prediction, category, priority, targets: Dict[str, float] = PRECISION_TARGETS,
+            min_samples: int = MIN_SAMPLES) -> "ConfidenceCalibrator":
+        """
+        prediction: Ausgabe von classifier.predict auf dem Validierungs-Split,
+        category/priority: die echten Labels derselben Tickets
+        """
+        category_correct = prediction['category'].to_numpy() == np.asarray(category)
+        priority_correct = prediction['priority'].to_numpy() == np.asarray(priority)
+        correct = {
+            "category": category_correct,
+            "priority": priority_correct,
+            "overall": category_correct & priority_correct,
+        }
+        curves = {
+            head: IsotonicCurve.fit(prediction[column].to_numpy(), correct[head])
+            for head, column in HEADS.items()
+        }
+
+        calibrated_overall = curves["overall"](prediction['overall_confidence'].to_numpy())
+        thresholds = {}
+        for name, target in targets.items():
+            threshold = select_threshold(calibrated_overall, correct["overall"], target, min_samples)
+            if threshold is None:
+                logger.warning(f"⚠️ Precision {target:.0%} für {name} nicht erreichbar, Standardschwelle bleibt")
+                threshold = DEFAULT_CONFIDENCE_THRESHOLDS[name]
+            thresholds[name] = round(threshold, 4)
+        # Review-Schwelle darf nie über der Schwelle für automatische Zuweisung liegen
+        thresholds["review_recommended"] = min(thresholds["review_recommended"], thresholds["automatic_assignment"])
+
+        info = {
+            "method": "isotonic",
+            "samples": int(len(prediction)),
+            "precision_targets": dict(targets),
+            "heldout_accuracy": {head: round(float(values.mean()), 4) for head, values in correct.items()},
+            "fitted_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        return cls(curves, thresholds, info)
+
+    def apply(self, prediction):
+        """Kalibriert die Confidence-Spalten vektorisiert (eine np.interp pro Kopf)"""
+        if len(prediction) == 0:
+            return prediction
+        for head, column in HEADS.items():
+            prediction[column] = self.curves[head](prediction[column].to_numpy())
+        return prediction
+
+    def describe(self) -> Dict[str, Any]:
+        """Zusammenfassung für /api/v1/model-info"""
+        return {**self.info, "thresholds": dict(self.thresholds)}
+
+    def save(self, path: str = CALIBRATION_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        payload = {
+            "curves": {head: curve.to_dict() for head, curve in self.curves.items()},
+            "thresholds": self.thresholds,
+            "info": self.info,
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = CALIBRATION_PATH) -> "ConfidenceCalibrator":
+        with open(path, encoding='utf-8') as f:
+            payload = json.load(f)
+        curves = {head: IsotonicCurve(curve["x"], curve["y"]) for head, curve in payload["curves"].items()}
+        return cls(curves, payload["thresholds"], payload.get("info"))
+
+def model_fingerprint(model_path: str) -> str:
+    """Hash der Modell-Datei (.pkl); bindet eine Kalibrierung an genau dieses Modell"""
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(model_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+def attach_calibrator(classifier, path: str = CALIBRATION_PATH,
+                      model_path: Optional[str] = None) -> Optional[ConfidenceCalibrator]:
+    """
+    Lädt die Kalibrierung zum Modell (optional), hängt sie als classifier.calibrator
+    an und übernimmt ihre Schwellen für get_confidence_level / get_recommendation.
+    Mit model_path wird eine Kalibrierung verworfen, die für ein anderes Modell
+    gefittet wurde (model_fingerprint in info).
+    """
+    calibrator = getattr(classifier, 'calibrator', None)
+    if calibrator is None and os.path.exists(path):
+        calibrator = ConfidenceCalibrator.load(path)
+        if model_path is not None:
+            expected = model_fingerprint(model_path)
+            if calibrator.info.get("model_fingerprint") != expected:
+                logger.warning(
+                    f"⚠️ Kalibrierung {path} gehört nicht zum Modell {model_path} "
+                    f"(Fingerprint {calibrator.info.get('model_fingerprint')} statt {expected}), "
+                    "verwende Standardschwellen. Bitte neu kalibrieren (make calibrate)."
+                )
+                calibrator = None
+    classifier.calibrator = calibrator
+    set_confidence_thresholds(calibrator.thresholds if calibrator is not None else None)
+    return calibrator
+
+def calibrate(classifier, heldout_path: str, output_path: str = CALIBRATION_PATH,
+              targets: Dict[str, float] = PRECISION_TARGETS, min_samples: int = MIN_SAMPLES,
+              model_path: Optional[str] = None) -> ConfidenceCalibrator:
+    """
+    Fittet die Kalibrierung auf einem gelabelten Validierungs-Split (weder Trainings-
+    noch Test-Daten). Wirft ValueError für den Test-Split, da Schwellen und die
+    damit berichtete Precision sonst auf denselben Daten entstehen.
+    Mit model_path wird der Fingerprint des Modells mitgespeichert.
+    """
+    import pandas as pd
+
+    if os.path.abspath(heldout_path) == os.path.abspath(TEST_DATA_PATH):
+        raise ValueError(f"{TEST_DATA_PATH} ist der Test-Split; Kalibrierung auf {VALIDATION_DATA_PATH} fitten")
+
+    df = pd.read_csv(heldout_path, encoding='utf-8')
+    prediction = classifier.predict(df).reset_index(drop=True)
+    calibrator = ConfidenceCalibrator.fit(prediction, df['category'], df['priority'], targets, min_samples)
+    if model_path is not None:
+        calibrator.info["model_fingerprint"] = model_fingerprint(model_path)
+    calibrator.save(output_path)
+    return calibrator
+
+def main(argv=None):
+    """CLI: Kalibrierung auf dem Validierungs-Split fitten"""
+    parser = argparse.ArgumentParser(description="Confidence-Kalibrierung fitten")
+    parser.add_argument('heldout', nargs='?', default=VALIDATION_DATA_PATH, help="Gelabelter Validierungs-Split (CSV)")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help="Pfad zum trainierten Modell")
+    parser.add_argument('--output', default=CALIBRATION_PATH, help="Ziel der Kalibrierung (JSON)")
+    parser.add_argument('--min-samples', type=int, default=MIN_SAMPLES)
+    args = parser.parse_args(argv)
+
+    from models.train_classifier import ITTicketClassifier
+
+    classifier = ITTicketClassifier()
+    classifier.load_model(args.model)
+    calibrator = calibrate(classifier, args.heldout, args.output, min_samples=args.min_samples, model_path=args.model)
+
+    accuracy = calibrator.info["heldout_accuracy"]
+    print(f"✅ Kalibrierung auf {calibrator.info['samples']:,} Tickets gespeichert: {args.output}")
+    print(f"🎯 Validierungs-Accuracy: Kategorie {accuracy['category']:.1%}, Priorität {accuracy['priority']:.1%}")
+    print(f"🚦 Schwellen: automatisch >= {calibrator.thresholds['automatic_assignment']:.3f}, "
+          f"Review >= {calibrator.thresholds['review_recommended']:.3f}")
+    return calibrator
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Inkrementelles Online-Learning aus Agent-Korrekturen
+Companion-Modell (SGDClassifier.partial_fit) über den TF-IDF Features des Klassifikators
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+from api.feedback import HOLDOUT_VERSION
+from utils.routing import SLA_MAPPING, TEAM_MAPPING, get_confidence_thresholds
+
+logger = logging.getLogger(__name__)
+
+ONLINE_MODEL_DIR = os.environ.get("ONLINE_MODEL_DIR", "data/models/online")
+TRAINING_DATA_PATH = "data/raw/training_data.csv"
+
+# Korrekturen pro partial_fit Schritt
+UPDATE_BATCH_SIZE = 64
+
+# Anzahl gespeicherter Versionen (ältere werden gelöscht)
+KEEP_VERSIONS = 5
+
+# Anteil der Korrekturen, der nie trainiert wird und jede Version prüft (die neuesten eines Batches)
+HOLDOUT_FRACTION = 0.2
+
+# Maximale Grösse des Holdouts (die neuesten zurückgehaltenen Korrekturen)
+HOLDOUT_SIZE = 2000
+
+# Minimale Anzahl zurückgehaltener Korrekturen, bevor eine Version bestehen kann
+MIN_HOLDOUT = 30
+
+# Spalten der Replay-Stichprobe (Eingabe für classifier.predict + Labels)
+REPLAY_COLUMNS = [
+    'title', 'description', 'user_role', 'department', 'affected_system',
+    'hour_submitted', 'is_weekend', 'previous_tickets_30d', 'category', 'priority'
+]
+
+_fingerprints: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+def vectorizer_fingerprint(classifier) -> str:
+    """
+    Hash über das Vokabular des TF-IDF Vectorizers des Basis-Modells. Nach
+    einem Neu-Training ändern sich Spalten und Gewichte, auch wenn die Anzahl
+    Features gleich bleibt; ein Companion passt dann nicht mehr.
+    Pro Vectorizer-Objekt nur einmal berechnet.
+    """
+    vectorizer = classifier.text_vectorizer
+    fingerprint = _fingerprints.get(vectorizer)
+    if fingerprint is None:
+        digest = hashlib.sha1()
+        for term, index in sorted(vectorizer.vocabulary_.items()):
+            digest.update(f"{term}\t{index}\n".encode("utf-8"))
+        idf = getattr(vectorizer, 'idf_', None)
+        if idf is not None:
+            digest.update(np.asarray(idf, dtype=np.float64).tobytes())
+        fingerprint = digest.hexdigest()[:16]
+        _fingerprints[vectorizer] = fingerprint
+    return fingerprint
+
+class CompanionModel:
+    """
+    Linearer Companion zum Basis-Modell, der mit partial_fit nur über neue
+    Daten nachtrainiert wird. Er überschreibt nur unsichere Vorhersagen des
+    Basis-Modells (Confidence des Kopfes unter der Schwelle
+    automatic_assignment), wenn er eine andere Klasse mit mindestens
+    override_threshold Wahrscheinlichkeit vorhersagt, und erst wenn er
+    min_feedback Korrekturen gesehen und die Prüfung auf den zurückgehaltenen
+    Korrekturen bestanden hat (validate).
+
+    Der Companion gehört zu genau einem Vectorizer (vectorizer_fingerprint);
+    passt das Basis-Modell nicht mehr, bleibt er aus.
+
+    Die Wahrscheinlichkeiten von modified_huber sind nicht kalibriert. Überschriebene
+    Zeilen behalten deshalb keine hohe Gesamt-Confidence, sondern werden auf die
+    Schwelle review_recommended gesetzt und nie automatisch zugewiesen.
+    """
+
+    def __init__(self, categories: Optional[List[str]] = None, priorities: Optional[List[str]] = None,
+                 alpha: float = 1e-4, min_feedback: int = 200, override_threshold: float = 0.75,
+                 min_override_precision: float = 0.9, min_holdout: int = MIN_HOLDOUT,
+                 fingerprint: Optional[str] = None, seed: int = 42):
+        from sklearn.linear_model import SGDClassifier
+
+        self.categories = np.array(sorted(categories or TEAM_MAPPING))
+        self.priorities = np.array(sorted(priorities or SLA_MAPPING))
+        # modified_huber liefert predict_proba in allen unterstützten scikit-learn Versionen
+        self.category_model = SGDClassifier(loss="modified_huber", alpha=alpha, random_state=seed)
+        self.priority_model = SGDClassifier(loss="modified_huber", alpha=alpha, random_state=seed)
+        self.min_feedback = min_feedback
+        self.override_threshold = override_threshold
+        self.min_override_precision = min_override_precision
+        self.min_holdout = min_holdout
+        self.fingerprint = fingerprint
+        self.validated = False
+        self.holdout_report: Optional[Dict[str, Any]] = None
+        self.version = 0
+        self.samples_seen = 0
+        self.feedback_seen = 0
+        self.vocabulary_size: Optional[int] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.feedback_seen >= self.min_feedback and getattr(self, 'validated', False)
+
+    def matches(self, classifier) -> bool:
+        """True, wenn der Companion auf dem Vectorizer dieses Basis-Modells trainiert wurde"""
+        return getattr(self, 'fingerprint', None) == vectorizer_fingerprint(classifier)
+
+    @staticmethod
+    def features(classifier, records: List[Dict[str, Any]]):
+        """TF-IDF Features des Basis-Modells (gleiche Vorverarbeitung wie beim Training)"""
+        texts = [classifier.preprocess_text(f"{r['title']} {r['description']}") for r in records]
+        return classifier.text_vectorizer.transform(texts)
+
+    def partial_fit(self, features, categories: List[str], priorities: List[str], feedback: int = 0):
+        """Ein inkrementeller Schritt; Kosten proportional zur Anzahl neuer Zeilen"""
+        if self.vocabulary_size is None:
+            self.vocabulary_size = features.shape[1]
+        elif features.shape[1] != self.vocabulary_size:
+            raise ValueError("Feature-Dimension passt nicht zum Companion-Modell (Basis-Modell neu trainiert?)")
+        self.category_model.partial_fit(features, categories, classes=self.categories)
+        self.priority_model.partial_fit(features, priorities, classes=self.priorities)
+        self.samples_seen += features.shape[0]
+        self.feedback_seen += feedback
+
+    def _predict(self, model, features) -> Tuple[np.ndarray, np.ndarray]:
+        proba = model.predict_proba(features)
+        best = proba.argmax(axis=1)
+        return model.classes_[best], proba[np.arange(len(best)), best]
+
+    def _overrides(self, features, prediction):
+        """Pro Kopf: (Label-Spalte, Confidence-Spalte, Labels, Confidences, Maske der Overrides)"""
+        uncertain_below = get_confidence_thresholds()["automatic_assignment"]
+        for label_column, confidence_column, model in [
+            ('category', 'category_confidence', self.category_model),
+            ('priority', 'priority_confidence', self.priority_model),
+        ]:
+            labels, confidences = self._predict(model, features)
+            mask = (
+                (prediction[confidence_column].to_numpy() < uncertain_below)
+                & (confidences >= self.override_threshold)
+                & (labels != prediction[label_column].to_numpy())
+            )
+            yield label_column, confidence_column, labels, confidences, mask
+
+    def validate(self, classifier, holdout, base_prediction) -> Dict[str, Any]:
+        """
+        Prüft den Companion auf zurückgehaltenen Korrekturen gegen das Basis-Modell.
+        Beide haben diese Tickets nie gesehen. Bestanden, wenn mindestens
+        min_holdout Zeilen vorliegen, pro Kopf die Accuracy nicht sinkt und die
+        Overrides eine Precision von mindestens min_override_precision erreichen.
+        """
+        report: Dict[str, Any] = {"rows": len(holdout)}
+        if len(holdout) < self.min_holdout:
+            report["passed"] = False
+            self.validated = False
+            self.holdout_report = report
+            return report
+        features = self.features(classifier, holdout[['title', 'description']].to_dict('records'))
+        passed = True
+        for label_column, _, labels, _, mask in self._overrides(features, base_prediction):
+            truth = holdout[label_column].to_numpy()
+            base = base_prediction[label_column].to_numpy()
+            combined = np.where(mask, labels, base)
+            overrides = int(mask.sum())
+            precision = float((labels[mask] == truth[mask]).mean()) if overrides else None
+            report[label_column] = {
+                "base_accuracy": round(float((base == truth).mean()), 4),
+                "accuracy": round(float((combined == truth).mean()), 4),
+                "overrides": overrides,
+                "override_precision": round(precision, 4) if precision is not None else None
+            }
+            passed &= bool((combined == truth).sum() >= (base == truth).sum())
+            passed &= precision is None or precision >= self.min_override_precision
+        report["passed"] = bool(passed)
+        self.validated = bool(passed)
+        self.holdout_report = report
+        return report
+
+    def apply(self, classifier, records: List[Dict[str, Any]], prediction):
+        """
+        Überschreibt unsichere Basis-Vorhersagen (DataFrame von classifier.predict,
+        bereits kalibriert) in place. Überschriebene Zeilen erhalten als
+        Gesamt-Confidence die Schwelle review_recommended. Passt der Vectorizer
+        des Basis-Modells nicht zum Companion, wird er deaktiviert.
+        """
+        if not self.is_active or len(prediction) == 0:
+            return prediction
+        if not self.matches(classifier):
+            self.validated = False
+            logger.warning(f"⚠️ Online-Modell v{self.version} passt nicht zum Vectorizer des Basis-Modells, deaktiviert")
+            return prediction
+        features = self.features(classifier, records)
+        overridden = np.zeros(len(prediction), dtype=bool)
+        for label_column, confidence_column, labels, confidences, mask in self._overrides(features, prediction):
+            if mask.any():
+                prediction.loc[mask, label_column] = labels[mask]
+                prediction.loc[mask, confidence_column] = confidences[mask]
+                overridden |= mask
+        if overridden.any():
+            prediction.loc[overridden, 'overall_confidence'] = get_confidence_thresholds()["review_recommended"]
+        return prediction
+
+    def save_model(self, path: str):
+        tmp_path = path + ".tmp"
+        joblib.dump(self, tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load_model(path: str) -> "CompanionModel":
+        return joblib.load(path)
+
+def load_replay_sample(path: str = TRAINING_DATA_PATH, size: int = 2000, seed: int = 42):
+    """
+    Zufällige Stichprobe der ursprünglichen Trainingsdaten (Reservoir über Chunks),
+    damit der Companion neben den Korrekturen die Gesamtverteilung nicht vergisst.
+    """
+    import pandas as pd
+
+    if not os.path.exists(path):
+        return None
+    rng = np.random.RandomState(seed)
+    sample = None
+    for chunk in pd.read_csv(path, usecols=REPLAY_COLUMNS, chunksize=10000, encoding='utf-8'):
+        chunk = chunk.assign(_key=rng.random_sample(len(chunk)))
+        sample = chunk if sample is None else pd.concat([sample, chunk])
+        sample = sample.nsmallest(size, '_key')
+    return sample.drop(columns='_key').reset_index(drop=True) if sample is not None else None
+
+class OnlineLearner:
+    """
+    Trainiert den Companion im Hintergrund in kleinen Batches aus dem
+    Feedback-Store. Pro Korrektur-Batch wird eine gleich grosse Stichprobe der
+    ursprünglichen Trainingsdaten mittrainiert (replay_ratio), die Kosten
+    wachsen also mit den neuen Daten und nicht mit der gesamten Historie.
+    Jeder Schritt wird als neue Version mit CompanionModel.save_model
+    (joblib) unter model_dir gespeichert; latest.json zeigt auf die aktuelle
+    Version. Das Basis-Modell und sein load_model bleiben unverändert.
+
+    Von jedem Korrektur-Batch werden die neuesten holdout_fraction
+    zurückgehalten und nie trainiert. Jede Version wird auf den neuesten
+    zurückgehaltenen Korrekturen gegen das Basis-Modell geprüft
+    (CompanionModel.validate); das Basis-Modell hat sie nie gesehen, die
+    Trainingsdaten taugen dafür nicht. Ohne genug Holdout bleibt der Companion
+    inaktiv.
+    """
+
+    def __init__(self, store, classifier_fn: Callable[[], Any], model_dir: str = ONLINE_MODEL_DIR,
+                 batch_size: int = UPDATE_BATCH_SIZE, interval: float = 30.0, replay=None,
+                 replay_ratio: float = 1.0, holdout_fraction: float = HOLDOUT_FRACTION,
+                 keep_versions: int = KEEP_VERSIONS, seed: int = 42):
+        self.store = store
+        self.classifier_fn = classifier_fn
+        self.model_dir = model_dir
+        self.batch_size = batch_size
+        self.interval = interval
+        self.replay_ratio = replay_ratio
+        self.keep_versions = keep_versions
+        self.holdout_fraction = holdout_fraction
+        self._rng = np.random.RandomState(seed)
+        self.replay = replay
+        self._holdout_credit = 0.0
+        self._holdout_prediction: Tuple[Optional[int], Dict[int, Tuple]] = (None, {})
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._train_lock = threading.Lock()
+        self.model: Optional[CompanionModel] = None
+        self.last_update: Optional[str] = None
+        self.last_update_seconds: Optional[float] = None
+
+    def _split_holdout(self, feedback: List[Dict[str, Any]]):
+        """Hält die neuesten Korrekturen eines Batches zurück (Anteil holdout_fraction über alle Batches)"""
+        self._holdout_credit += len(feedback) * self.holdout_fraction
+        n_holdout = min(int(self._holdout_credit), len(feedback))
+        self._holdout_credit -= n_holdout
+        split = len(feedback) - n_holdout
+        return feedback[:split], feedback[split:]
+
+    def _validate(self, model: CompanionModel, classifier):
+        """Prüft eine neue Version auf dem Holdout (Basis-Vorhersagen pro Modell und Korrektur gecacht)"""
+        import pandas as pd
+        from api.inference import PREDICTION_COLUMNS, predict_frame
+
+        holdout = self.store.holdout(HOLDOUT_SIZE)
+        if self._holdout_prediction[0] != id(classifier):
+            self._holdout_prediction = (id(classifier), {})
+        cache = self._holdout_prediction[1]
+        missing = [item for item in holdout if item["id"] not in cache]
+        if missing:
+            prediction = predict_frame(classifier, [item["ticket"] for item in missing])
+            rows = zip(*(prediction[column].tolist() for column in PREDICTION_COLUMNS))
+            cache.update(zip((item["id"] for item in missing), rows))
+        # Nur Korrekturen des aktuellen Holdouts behalten
+        self._holdout_prediction = (id(classifier), {item["id"]: cache[item["id"]] for item in holdout})
+
+        frame = pd.DataFrame({
+            'title': [item["ticket"]["title"] for item in holdout],
+            'description': [item["ticket"]["description"] for item in holdout],
+            'category': [item["category"] for item in holdout],
+            'priority': [item["priority"] for item in holdout]
+        })
+        base_prediction = pd.DataFrame([cache[item["id"]] for item in holdout], columns=PREDICTION_COLUMNS)
+        report = model.validate(classifier, frame, base_prediction)
+        if not report["passed"]:
+            logger.warning(f"⚠️ Online-Modell v{model.version} besteht den Holdout nicht, keine Overrides: {report}")
+
+    # Versionen
+
+    def _latest_path(self) -> str:
+        return os.path.join(self.model_dir, "latest.json")
+
+    def load_latest(self) -> Optional[CompanionModel]:
+        """Lädt die zuletzt veröffentlichte Version, falls sie zum Vectorizer des Basis-Modells passt"""
+        try:
+            with open(self._latest_path(), "r", encoding="utf-8") as f:
+                latest = json.load(f)
+            model = CompanionModel.load_model(os.path.join(self.model_dir, latest["file"]))
+            classifier = self.classifier_fn()
+            if classifier is not None and not model.matches(classifier):
+                logger.warning(
+                    f"⚠️ Online-Modell v{model.version} wurde auf einem anderen Vectorizer trainiert, "
+                    "verwerfe es und beginne neu"
+                )
+                self.model = None
+                return None
+            self.model = model
+            logger.info(f"🔁 Online-Modell v{self.model.version} geladen ({self.model.feedback_seen} Korrekturen)")
+        except FileNotFoundError:
+            self.model = None
+        except Exception as e:
+            logger.warning(f"⚠️ Online-Modell konnte nicht geladen werden: {e}")
+            self.model = None
+        return self.model
+
+    def _publish(self, model: CompanionModel):
+        os.makedirs(self.model_dir, exist_ok=True)
+        filename = f"companion_v{model.version:06d}.joblib"
+        model.save_model(os.path.join(self.model_dir, filename))
+
+        tmp_path = self._latest_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": model.version,
+                "file": filename,
+                "samples_seen": model.samples_seen,
+                "feedback_seen": model.feedback_seen,
+                "fingerprint": model.fingerprint,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+            }, f, indent=2)
+        os.replace(tmp_path, self._latest_path())
+
+        versions = sorted(f for f in os.listdir(self.model_dir) if f.startswith("companion_v"))
+        for old in versions[:-self.keep_versions]:
+            os.remove(os.path.join(self.model_dir, old))
+
+    # Training
+
+    def _replay_batch(self, n: int):
+        if self.replay is None or len(self.replay) == 0 or n <= 0:
+            return None
+        idx = self._rng.choice(len(self.replay), size=min(n, len(self.replay)), replace=False)
+        return self.replay.iloc[idx]
+
+    def run_once(self) -> int:
+        """Trainiert alle offenen Korrekturen in Batches; gibt die Anzahl zurück"""
+        classifier = self.classifier_fn()
+        if classifier is None:
+            return 0
+
+        trained = 0
+        with self._train_lock:
+            while not self._stop.is_set():
+                pending = self.store.pending(self.batch_size)
+                if not pending:
+                    break
+                start_time = time.time()
+                feedback, held_out = self._split_holdout(pending)
+                if held_out:
+                    self.store.mark_trained([item["id"] for item in held_out], HOLDOUT_VERSION)
+                if not feedback:
+                    continue
+
+                model = self.model
+                fingerprint = vectorizer_fingerprint(classifier)
+                if model is not None and not model.matches(classifier):
+                    logger.warning(f"⚠️ Online-Modell v{model.version} passt nicht zum Basis-Modell, beginne neu")
+                    model = None
+                if model is None:
+                    model = CompanionModel(fingerprint=fingerprint)
+                else:
+                    # Kopie trainieren, damit laufende Vorhersagen eine konsistente Version sehen
+                    model = copy.deepcopy(model)
+
+                records = [item["ticket"] for item in feedback]
+                categories = [item["category"] for item in feedback]
+                priorities = [item["priority"] for item in feedback]
+                replay = self._replay_batch(int(len(feedback) * self.replay_ratio))
+                if replay is not None:
+                    records += replay[['title', 'description']].to_dict('records')
+                    categories += replay['category'].tolist()
+                    priorities += replay['priority'].tolist()
+
+                features = CompanionModel.features(classifier, records)
+                model.partial_fit(features, categories, priorities, feedback=len(feedback))
+                model.version = (self.model.version if self.model is not None else 0) + 1
+                self._validate(model, classifier)
+
+                self._publish(model)
+                self.store.mark_trained([item["id"] for item in feedback], model.version)
+                self.model = model
+                trained += len(feedback)
+
+                self.last_update = time.strftime("%Y-%m-%dT%H:%M:%S")
+                self.last_update_seconds = round(time.time() - start_time, 3)
+                logger.info(
+                    f"🔁 Online-Modell v{model.version}: {len(feedback)} Korrekturen "
+                    f"(+{len(records) - len(feedback)} Replay) in {self.last_update_seconds}s"
+                )
+        return trained
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"❌ Fehler beim Online-Update: {e}")
+
+    def start(self):
+        self.load_latest()
+        self._thread = threading.Thread(target=self._loop, name="online-learner", daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        model = self.model
+        return {
+            "feedback": self.store.counts(),
+            "model_version": model.version if model else None,
+            "active": model.is_active if model else False,
+            "holdout": getattr(model, 'holdout_report', None) if model else None,
+            "feedback_trained": model.feedback_seen if model else 0,
+            "samples_seen": model.samples_seen if model else 0,
+            "last_update": self.last_update,
+            "last_update_seconds": self.last_update_seconds
+        }
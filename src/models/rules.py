@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Regel- und Keyword-Stufe vor den ML-Modellen
+Eindeutige Tickets (z.B. Phishing → Security) werden ohne Modell-Aufruf klassifiziert
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RULES_PATH = os.environ.get("RULES_PATH", "config/classification_rules.json")
+RULE_STATS_PATH = os.environ.get("RULE_STATS_PATH", "data/rules/rule_stats.json")
+
+# Shadow-Statistik alle n Vergleiche (und bei jeder (De)Aktivierung) speichern
+SAVE_INTERVAL = 100
+
+# Zähler einer Regel, die über Neustarts erhalten bleiben
+STAT_FIELDS = ("hits", "early_exits", "compared", "agreed", "priority_agreed", "both_agreed")
+
+def is_offhours(record: Dict[str, Any]) -> bool:
+    """
+    Randzeit wie in den Trainingsdaten (generate_sample_data.py): vor 8 oder nach
+    18 Uhr werden Low/Medium Tickets hochgestuft. Wochenende zählt ebenfalls dazu.
+    """
+    hour = record.get('hour_submitted', 12)
+    return hour < 8 or hour > 18 or bool(record.get('is_weekend', 0))
+
+# Abgeleitete Felder, auf die eine Regel unter "when" zusätzlich prüfen kann
+DERIVED_FIELDS = {"offhours": is_offhours}
+
+# Zusammenfassung der Trefferquoten alle n geprüften Tickets loggen
+LOG_INTERVAL = 5000
+
+class Rule:
+    """Eine Klassifikationsregel mit Treffer- und Precision-Statistik"""
+
+    __slots__ = ("rule_id", "keywords", "exclude", "conditions", "category", "priority",
+                 "confidence", "trusted", "hits", "early_exits", "compared", "agreed",
+                 "priority_agreed", "both_agreed", "active")
+
+    def __init__(self, rule_id: str, keywords: List[str], category: str, priority: str,
+                 confidence: float = 0.95, exclude: Optional[List[str]] = None,
+                 when: Optional[Dict[str, List[Any]]] = None, trusted: bool = False):
+        if not keywords:
+            raise ValueError(f"Regel '{rule_id}' hat keine Keywords")
+        self.rule_id = rule_id
+        self.keywords = frozenset(k.lower() for k in keywords)
+        self.exclude = frozenset(k.lower() for k in exclude or [])
+        if when is not None and not isinstance(when, dict):
+            raise ValueError(f"Regel '{rule_id}': 'when' muss ein Objekt sein")
+        if any(not isinstance(values, list) for values in (when or {}).values()):
+            raise ValueError(f"Regel '{rule_id}': Bedingungen unter 'when' müssen Listen sein")
+        self.conditions = {field: frozenset(values) for field, values in (when or {}).items()}
+        self.category = category
+        self.priority = priority
+        self.confidence = float(confidence)
+        self.trusted = trusted
+        self.hits = 0
+        self.early_exits = 0
+        self.compared = 0
+        self.agreed = 0
+        self.priority_agreed = 0
+        self.both_agreed = 0
+        self.active = trusted
+
+    @property
+    def prediction(self) -> Tuple[str, str, float, float, float]:
+        """
+        Vorhersage im Format von build_prediction_payload.
+        Als Confidence dient die im Shadow-Modus gemessene Übereinstimmung mit dem
+        Modell (Kategorie, Priorität, beides); die konfigurierte confidence nur,
+        solange eine trusted Regel noch nicht verglichen wurde.
+        """
+        if not self.compared:
+            return self.category, self.priority, self.confidence, self.confidence, self.confidence
+        return (self.category, self.priority, self.precision, self.priority_precision,
+                self.both_agreed / self.compared)
+
+    @property
+    def precision(self) -> Optional[float]:
+        return self.agreed / self.compared if self.compared else None
+
+    @property
+    def priority_precision(self) -> Optional[float]:
+        return self.priority_agreed / self.compared if self.compared else None
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash der Regel-Definition; geänderte Regeln starten mit neuer Statistik"""
+        definition = [sorted(self.keywords), sorted(self.exclude), self.category, self.priority,
+                      sorted((field, sorted(map(str, values))) for field, values in self.conditions.items())]
+        return hashlib.sha1(json.dumps(definition).encode("utf-8")).hexdigest()[:16]
+
+    def applies(self, found: set, record: Dict[str, Any]) -> bool:
+        if not self.keywords & found or self.exclude & found:
+            return False
+        for field, values in self.conditions.items():
+            value = DERIVED_FIELDS[field](record) if field in DERIVED_FIELDS else record.get(field)
+            if value not in values:
+                return False
+        return True
+
+class RuleEngine:
+    """
+    Regel-Stufe mit einem kompilierten Multi-Pattern Matcher.
+
+    Alle Keywords (inkl. Ausschlüsse) werden zu einer einzigen Regex-Alternation
+    kompiliert, die einmal über Titel + Beschreibung läuft; danach gewinnt die
+    erste passende Regel in Konfigurations-Reihenfolge.
+
+    Eine Regel beantwortet Tickets erst selbst (Early Exit), wenn ihre gegen das
+    Modell gemessene Precision für Kategorie und Priorität nach min_samples
+    Vergleichen jeweils mindestens min_precision beträgt (oder sie als trusted
+    konfiguriert ist). Bis dahin
+    läuft sie im Shadow-Modus: das Modell klassifiziert, die Regel wird nur
+    verglichen. Aktive Regeln werden mit shadow_sample_rate weiter stichprobenartig
+    gegen das Modell geprüft und bei sinkender Precision wieder deaktiviert.
+
+    Weil die Priorität von user_role, System und Einreichungszeit abhängt, wird
+    eine Regel nur präzise genug, wenn sie über "when" auf diese Eingaben
+    eingeschränkt ist (z.B. "offhours": [false] für Medium-Tickets).
+
+    Mit stats_path werden die Shadow-Zähler gespeichert und beim Laden
+    übernommen, damit Regeln nach einem Neustart nicht wieder bei null anfangen.
+    """
+
+    def __init__(self, rules: List[Rule], min_precision: float = 0.95, min_samples: int = 50,
+                 shadow_sample_rate: float = 0.05, seed: Optional[int] = None,
+                 stats_path: Optional[str] = None):
+        self.rules = rules
+        self.stats_path = stats_path
+        self.min_precision = min_precision
+        self.min_samples = min_samples
+        self.shadow_sample_rate = shadow_sample_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self.evaluated = 0
+
+        keywords = sorted({k for rule in rules for k in rule.keywords | rule.exclude}, key=len, reverse=True)
+        alternation = "|".join(r"\s+".join(re.escape(part) for part in k.split()) for k in keywords)
+        # Lookahead: überlappende Keywords werden an jeder Position gefunden
+        self._pattern = re.compile(rf"(?=\b({alternation})\b)", re.IGNORECASE) if keywords else None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], seed: Optional[int] = None,
+                    stats_path: Optional[str] = None) -> "RuleEngine":
+        rules = [
+            Rule(
+                rule["id"], rule["keywords"], rule["category"], rule["priority"],
+                confidence=rule.get("confidence", 0.95), exclude=rule.get("exclude"),
+                when=rule.get("when"), trusted=rule.get("trusted", False)
+            )
+            for rule in config.get("rules", [])
+        ]
+        return cls(
+            rules,
+            min_precision=config.get("min_precision", 0.95),
+            min_samples=config.get("min_samples", 50),
+            shadow_sample_rate=config.get("shadow_sample_rate", 0.05),
+            seed=seed,
+            stats_path=stats_path
+        )
+
+    @classmethod
+    def from_file(cls, path: str = RULES_PATH, stats_path: Optional[str] = None) -> "RuleEngine":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_config(json.load(f), stats_path=stats_path)
+
+    # Matching
+
+    def find_keywords(self, text: str) -> set:
+        if self._pattern is None:
+            return set()
+        return {" ".join(match.group(1).lower().split()) for match in self._pattern.finditer(text)}
+
+    def match(self, record: Dict[str, Any]) -> Optional[Rule]:
+        """Erste passende Regel für ein Ticket-Dict (title, description, Metadaten)"""
+        found = self.find_keywords(f"{record.get('title', '')} {record.get('description', '')}")
+        if not found:
+            return None
+        for rule in self.rules:
+            if rule.applies(found, record):
+                return rule
+        return None
+
+    def route(self, record: Dict[str, Any]) -> Tuple[Optional[Rule], bool]:
+        """
+        Gibt (Regel, early_exit) zurück. early_exit=False bedeutet: Modell
+        aufrufen und das Ergebnis mit record_model() an die Regel melden.
+        """
+        rule = self.match(record)
+        with self._lock:
+            self.evaluated += 1
+            if self.evaluated % LOG_INTERVAL == 0:
+                self._log_summary()
+            if rule is None:
+                return None, False
+            rule.hits += 1
+            early_exit = rule.active and self._random.random() >= self.shadow_sample_rate
+            if early_exit:
+                rule.early_exits += 1
+            return rule, early_exit
+
+    # Precision gegen das Modell
+
+    def record_model(self, rule: Rule, category: str, priority: str):
+        """Vergleicht eine Regel mit der Modell-Vorhersage und (de)aktiviert sie"""
+        with self._lock:
+            rule.compared += 1
+            rule.agreed += category == rule.category
+            rule.priority_agreed += priority == rule.priority
+            rule.both_agreed += category == rule.category and priority == rule.priority
+            changed = self._update_active(rule)
+            save = changed or rule.compared % SAVE_INTERVAL == 0
+        if save and self.stats_path:
+            self.save_stats()
+
+    def _update_active(self, rule: Rule) -> bool:
+        """Setzt rule.active anhand der gemessenen Precision; True bei einer Änderung"""
+        if rule.compared < self.min_samples:
+            return False
+        # Die Priorität bestimmt das SLA und muss deshalb ebenso präzise sein wie die Kategorie
+        active = min(rule.precision, rule.priority_precision) >= self.min_precision
+        if active == rule.active:
+            return False
+        rule.active = active
+        precision = f"Precision {rule.precision:.3f} / Priorität {rule.priority_precision:.3f}"
+        if active:
+            logger.info(f"✅ Regel '{rule.rule_id}' aktiv ({precision} bei {rule.compared} Vergleichen)")
+        else:
+            logger.warning(f"⚠️ Regel '{rule.rule_id}' deaktiviert ({precision}, Minimum {self.min_precision})")
+        return True
+
+    # Persistenz der Shadow-Statistik
+
+    def save_stats(self):
+        """Schreibt die Zähler aller Regeln atomar nach stats_path"""
+        with self._lock:
+            snapshot = {
+                "evaluated": self.evaluated,
+                "rules": {
+                    rule.rule_id: {"fingerprint": rule.fingerprint, **{f: getattr(rule, f) for f in STAT_FIELDS}}
+                    for rule in self.rules
+                }
+            }
+        with self._save_lock:
+            directory = os.path.dirname(self.stats_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.stats_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, indent=2)
+            os.replace(tmp_path, self.stats_path)
+
+    def load_stats(self) -> int:
+        """
+        Übernimmt gespeicherte Zähler für unveränderte Regeln und setzt deren
+        Status neu. Gibt die Anzahl übernommener Regeln zurück.
+        """
+        if not self.stats_path or not os.path.exists(self.stats_path):
+            return 0
+        with open(self.stats_path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        restored = 0
+        with self._lock:
+            self.evaluated = saved.get("evaluated", 0)
+            for rule in self.rules:
+                stats = saved.get("rules", {}).get(rule.rule_id)
+                if stats is None or stats.get("fingerprint") != rule.fingerprint:
+                    continue
+                for field in STAT_FIELDS:
+                    setattr(rule, field, int(stats.get(field, 0)))
+                self._update_active(rule)
+                restored += 1
+        return restored
+
+    def _log_summary(self):
+        hits = sum(rule.hits for rule in self.rules)
+        early_exits = sum(rule.early_exits for rule in self.rules)
+        logger.info(
+            f"📏 Regel-Stufe: {hits / self.evaluated:.1%} Treffer, "
+            f"{early_exits / self.evaluated:.1%} ohne Modell ({self.evaluated} Tickets)"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            evaluated = self.evaluated
+            rules = []
+            for rule in self.rules:
+                rules.append({
+                    "rule_id": rule.rule_id,
+                    "category": rule.category,
+                    "priority": rule.priority,
+                    "active": rule.active,
+                    "hits": rule.hits,
+                    "hit_rate": round(rule.hits / evaluated, 4) if evaluated else 0.0,
+                    "early_exits": rule.early_exits,
+                    "compared": rule.compared,
+                    "precision": round(rule.precision, 4) if rule.compared else None,
+                    "priority_agreement": round(rule.priority_precision, 4) if rule.compared else None
+                })
+            early_exits = sum(rule.early_exits for rule in self.rules)
+        return {
+            "evaluated": evaluated,
+            "early_exit_rate": round(early_exits / evaluated, 4) if evaluated else 0.0,
+            "min_precision": self.min_precision,
+            "min_samples": self.min_samples,
+            "shadow_sample_rate": self.shadow_sample_rate,
+            "rules": rules
+        }
+
+def load_rule_engine(path: str = RULES_PATH, stats_path: Optional[str] = RULE_STATS_PATH) -> Optional[RuleEngine]:
+    """Lädt die Regel-Konfiguration samt gespeicherter Statistik; None falls keine vorhanden oder ungültig"""
+    if not os.path.exists(path):
+        logger.info(f"ℹ️ Keine Regel-Konfiguration gefunden: {path}")
+        return None
+    try:
+        engine = RuleEngine.from_file(path, stats_path=stats_path)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.error(f"❌ Regel-Konfiguration ungültig ({path}): {e}")
+        return None
+    try:
+        restored = engine.load_stats()
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Regel-Statistik nicht geladen ({stats_path}): {e}")
+        restored = 0
+    logger.info(f"📏 {len(engine.rules)} Klassifikationsregeln geladen ({restored} mit gespeicherter Statistik)")
+    return engine
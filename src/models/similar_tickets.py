@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Ähnliche historische Tickets (Approximate Nearest Neighbor)
+Random-Projection LSH über die TF-IDF Vektoren des Klassifikators
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+
+Beispiel:
+    python src/models/similar_tickets.py build data/raw/training_data.csv
+    python src/models/similar_tickets.py update data/raw/new_tickets.csv
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+DEFAULT_MODEL_PATH = "data/models/it_ticket_classifier_v2.1.3.pkl"
+DEFAULT_INDEX_DIR = "data/models/similar_tickets"
+
+RESOLVED_STATUS = "Resolved"
+
+# Gespeicherte Metadaten pro Ticket (Reihenfolge = Spalten in tickets.json)
+TICKET_FIELDS = ['ticket_id', 'title', 'category', 'priority', 'status', 'resolution_time_hours']
+
+# Arrays, die beim Laden memory-mapped werden
+_ARRAY_FILES = ('embeddings', 'codes', 'order', 'sorted_codes', 'resolved')
+
+def ticket_text(classifier, title: str, description: str) -> str:
+    """Vorverarbeiteter Text wie beim Training (Titel + Beschreibung)"""
+    return classifier.preprocess_text(f"{title} {description}")
+
+class SimilarTicketIndex:
+    """
+    ANN-Index über historische Tickets.
+
+    Die TF-IDF Vektoren (text_vectorizer des Klassifikators) werden per
+    Gauss'scher Zufallsprojektion auf dim Dimensionen reduziert und
+    normalisiert. Für die Kandidatensuche werden tables Hash-Tabellen mit je
+    bits Hyperebenen (SimHash) verwendet; die Buckets liegen als sortierte
+    Arrays vor (searchsorted statt Python-Dicts), so dass der ganze Index
+    memory-mapped geladen werden kann. Kandidaten werden exakt per
+    Kosinus-Ähnlichkeit auf den reduzierten Vektoren sortiert.
+
+    Neue Tickets (add) landen in einem In-Memory Delta, das bei jeder Suche
+    vollständig durchsucht und mit save() in den Index übernommen wird.
+    """
+
+    def __init__(self, num_features: int, dim: int = 128, tables: int = 8, bits: int = 10, seed: int = 42):
+        if bits > 32:
+            raise ValueError("bits darf höchstens 32 sein")
+        self.num_features = num_features
+        self.dim = dim
+        self.tables = tables
+        self.bits = bits
+        self.seed = seed
+
+        rng = np.random.RandomState(seed)
+        self._projection = (rng.standard_normal((num_features, dim)) / np.sqrt(dim)).astype(np.float32)
+        self._hyperplanes = rng.standard_normal((dim, tables * bits)).astype(np.float32)
+        self._powers = (1 << np.arange(bits, dtype=np.uint64)).astype(np.uint64)
+
+        self.embeddings = np.zeros((0, dim), dtype=np.float32)
+        self.codes = np.zeros((0, tables), dtype=np.uint32)
+        self.order = np.zeros((tables, 0), dtype=np.int64)
+        self.sorted_codes = np.zeros((tables, 0), dtype=np.uint32)
+        self.resolved = np.zeros((0,), dtype=bool)
+        self.tickets: List[list] = []
+        self._ticket_ids = set()
+
+        self._delta_embeddings: List[np.ndarray] = []
+        self._delta_resolved: List[np.ndarray] = []
+        self._delta_tickets: List[list] = []
+        self._lock = threading.Lock()
+
+        self.directory: Optional[str] = None
+        self._manifest_mtime: Optional[float] = None
+
+    # Vektorisierung
+
+    def embed(self, classifier, texts: List[str]) -> np.ndarray:
+        """TF-IDF → Zufallsprojektion → L2-normalisierte float32 Vektoren"""
+        tfidf = classifier.text_vectorizer.transform(texts)
+        if tfidf.shape[1] != self.num_features:
+            raise ValueError(
+                f"Vokabular passt nicht zum Index ({tfidf.shape[1]} statt {self.num_features} Features)"
+            )
+        reduced = np.asarray(tfidf @ self._projection, dtype=np.float32)
+        norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return reduced / norms
+
+    def hash_codes(self, embeddings: np.ndarray) -> np.ndarray:
+        """SimHash-Code pro Tabelle (n x tables, uint32)"""
+        signs = (embeddings @ self._hyperplanes > 0).reshape(len(embeddings), self.tables, self.bits)
+        return (signs.astype(np.uint64) @ self._powers).astype(np.uint32)
+
+    # Aufbau und Persistenz
+
+    @staticmethod
+    def _ticket_rows(df) -> List[list]:
+        rows = []
+        columns = {field: df[field].tolist() if field in df.columns else [None] * len(df) for field in TICKET_FIELDS}
+        for values in zip(*(columns[field] for field in TICKET_FIELDS)):
+            row = list(values)
+            # NaN (fehlende Lösungszeit) als None speichern
+            if isinstance(row[-1], float) and np.isnan(row[-1]):
+                row[-1] = None
+            rows.append(row)
+        return rows
+
+    def _vectorize_frame(self, classifier, df):
+        texts = [ticket_text(classifier, t, d) for t, d in zip(df['title'].tolist(), df['description'].tolist())]
+        resolved = (df['status'] == RESOLVED_STATUS).to_numpy() if 'status' in df.columns else np.zeros(len(df), bool)
+        return self.embed(classifier, texts), resolved, self._ticket_rows(df)
+
+    def _set_arrays(self, embeddings: np.ndarray, resolved: np.ndarray, tickets: List[list]):
+        codes = self.hash_codes(embeddings)
+        order = np.argsort(codes, axis=0, kind='stable').T.copy()
+        sorted_codes = np.take_along_axis(codes.T, order, axis=1)
+        self.embeddings, self.codes, self.resolved = embeddings, codes, resolved
+        self.order, self.sorted_codes = order, sorted_codes
+        self.tickets = tickets
+        self._ticket_ids = {row[0] for row in tickets if row[0] is not None}
+
+    @classmethod
+    def build(cls, classifier, df, **kwargs) -> "SimilarTicketIndex":
+        """Baut den Index offline aus einem DataFrame historischer Tickets"""
+        index = cls(len(classifier.text_vectorizer.vocabulary_), **kwargs)
+        embeddings, resolved, tickets = index._vectorize_frame(classifier, df)
+        index._set_arrays(embeddings, resolved, tickets)
+        return index
+
+    def add(self, classifier, df) -> int:
+        """Fügt neue Tickets inkrementell hinzu (bekannte ticket_ids werden übersprungen)"""
+        if 'ticket_id' in df.columns:
+            with self._lock:
+                known = self._ticket_ids | {row[0] for row in self._delta_tickets}
+            df = df[~df['ticket_id'].isin(known)]
+        if len(df) == 0:
+            return 0
+        embeddings, resolved, tickets = self._vectorize_frame(classifier, df)
+        with self._lock:
+            self._delta_embeddings.append(embeddings)
+            self._delta_resolved.append(resolved)
+            self._delta_tickets.extend(tickets)
+        return len(df)
+
+    def __len__(self) -> int:
+        return len(self.tickets) + len(self._delta_tickets)
+
+    def save(self, directory: str = DEFAULT_INDEX_DIR):
+        """
+        Übernimmt das Delta und schreibt den Index atomar (neues Verzeichnis,
+        danach Umbenennung), so dass laufende Leser den alten Stand behalten.
+        """
+        with self._lock:
+            embeddings = np.vstack([np.asarray(self.embeddings)] + self._delta_embeddings)
+            resolved = np.concatenate([np.asarray(self.resolved)] + self._delta_resolved)
+            tickets = self.tickets + self._delta_tickets
+            self._set_arrays(embeddings, resolved, tickets)
+            self._delta_embeddings, self._delta_resolved, self._delta_tickets = [], [], []
+
+        directory = directory.rstrip('/')
+        tmp_dir = directory + '.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for name in _ARRAY_FILES:
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(tmp_dir, 'tickets.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.tickets, f, ensure_ascii=False)
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'num_features': self.num_features,
+                'dim': self.dim,
+                'tables': self.tables,
+                'bits': self.bits,
+                'seed': self.seed,
+                'size': len(self.tickets),
+                'created_at': time.strftime("%Y-%m-%dT%H:%M:%S")
+            }, f, indent=2)
+
+        old_dir = directory + '.old'
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if os.path.exists(directory):
+            os.replace(directory, old_dir)
+        os.replace(tmp_dir, directory)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+        self.directory = directory
+        self._manifest_mtime = os.path.getmtime(os.path.join(directory, 'manifest.json'))
+
+    @classmethod
+    def load(cls, directory: str = DEFAULT_INDEX_DIR, mmap: bool = True) -> "SimilarTicketIndex":
+        """Lädt den Index; die Arrays werden memory-mapped (nur gelesene Seiten landen im RAM)"""
+        manifest_path = os.path.join(directory, 'manifest.json')
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        index = cls(manifest['num_features'], dim=manifest['dim'], tables=manifest['tables'],
+                    bits=manifest['bits'], seed=manifest['seed'])
+        for name in _ARRAY_FILES:
+            setattr(index, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r' if mmap else None))
+        with open(os.path.join(directory, 'tickets.json'), 'r', encoding='utf-8') as f:
+            index.tickets = json.load(f)
+        index._ticket_ids = {row[0] for row in index.tickets if row[0] is not None}
+
+        index.directory = directory
+        index._manifest_mtime = os.path.getmtime(manifest_path)
+        return index
+
+    def refresh(self) -> bool:
+        """Lädt den Index neu, falls er auf der Festplatte aktualisiert wurde (z.B. durch 'update')"""
+        if self.directory is None:
+            return False
+        try:
+            mtime = os.path.getmtime(os.path.join(self.directory, 'manifest.json'))
+        except OSError:
+            return False
+        if mtime == self._manifest_mtime:
+            return False
+
+        fresh = SimilarTicketIndex.load(self.directory)
+        with self._lock:
+            self.embeddings, self.codes, self.resolved = fresh.embeddings, fresh.codes, fresh.resolved
+            self.order, self.sorted_codes = fresh.order, fresh.sorted_codes
+            self.tickets, self._ticket_ids = fresh.tickets, fresh._ticket_ids
+            # Bereits gespeicherte Delta-Tickets nicht doppelt führen
+            keep = [i for i, row in enumerate(self._delta_tickets) if row[0] not in self._ticket_ids]
+            if len(keep) < len(self._delta_tickets):
+                embeddings = np.vstack(self._delta_embeddings)[keep] if keep else None
+                resolved = np.concatenate(self._delta_resolved)[keep] if keep else None
+                self._delta_embeddings = [embeddings] if keep else []
+                self._delta_resolved = [resolved] if keep else []
+                self._delta_tickets = [self._delta_tickets[i] for i in keep]
+            self._manifest_mtime = mtime
+        return True
+
+    # Suche
+
+    def _candidates(self, code: np.ndarray) -> np.ndarray:
+        found = []
+        for table in range(self.tables):
+            keys = self.sorted_codes[table]
+            lo = np.searchsorted(keys, code[table], side='left')
+            hi = np.searchsorted(keys, code[table], side='right')
+            if hi > lo:
+                found.append(np.asarray(self.order[table, lo:hi]))
+        return np.unique(np.concatenate(found)) if found else np.zeros((0,), dtype=np.int64)
+
+    def search(self, query: np.ndarray, k: int = 5, resolved_only: bool = True) -> List[Dict[str, Any]]:
+        """
+        Top-k ähnliche Tickets für einen normalisierten Vektor. Liefert das LSH
+        zu wenige Kandidaten, wird der ganze (memory-mapped) Index durchsucht.
+        """
+        with self._lock:
+            embeddings, resolved, tickets = self.embeddings, self.resolved, self.tickets
+            delta_embeddings = list(self._delta_embeddings)
+            delta_resolved = list(self._delta_resolved)
+            delta_tickets = list(self._delta_tickets)
+
+        candidates = self._candidates(self.hash_codes(query[None, :])[0]) if len(tickets) else np.zeros(0, np.int64)
+        if resolved_only and len(candidates):
+            candidates = candidates[np.asarray(resolved[candidates])]
+        if len(candidates) < k:
+            candidates = np.flatnonzero(np.asarray(resolved)) if resolved_only else np.arange(len(tickets))
+
+        scores = np.asarray(embeddings[candidates]) @ query if len(candidates) else np.zeros(0, np.float32)
+        rows = [tickets[i] for i in candidates.tolist()]
+
+        if delta_tickets:
+            delta_scores = np.vstack(delta_embeddings) @ query
+            delta_mask = np.concatenate(delta_resolved) if resolved_only else np.ones(len(delta_tickets), bool)
+            scores = np.concatenate([scores, delta_scores[delta_mask]])
+            rows += [row for row, keep in zip(delta_tickets, delta_mask.tolist()) if keep]
+
+        if not rows:
+            return []
+        top = np.argsort(-scores)[:k] if len(scores) <= k else np.argpartition(-scores, k)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for i in top.tolist():
+            result = dict(zip(TICKET_FIELDS, rows[i]))
+            result['similarity'] = round(float(scores[i]), 4)
+            results.append(result)
+        return results
+
+    def query(self, classifier, title: str, description: str, k: int = 5,
+              resolved_only: bool = True) -> List[Dict[str, Any]]:
+        """Top-k ähnliche historische Tickets für ein neues Ticket"""
+        query = self.embed(classifier, [ticket_text(classifier, title, description)])[0]
+        return self.search(query, k=k, resolved_only=resolved_only)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "indexed_tickets": len(self.tickets),
+                "pending_tickets": len(self._delta_tickets),
+                "resolved_tickets": int(np.count_nonzero(self.resolved)),
+                "dim": self.dim,
+                "tables": self.tables,
+                "bits": self.bits
+            }
+
+def _load_classifier(model_path: str):
+    """Lädt das trainierte Modell über ITTicketClassifier.load_model"""
+    from models.train_classifier import ITTicketClassifier
+
+    classifier = ITTicketClassifier()
+    classifier.load_model(model_path)
+    return classifier
+
+def main(argv=None):
+    """CLI: Index offline bauen oder inkrementell aktualisieren"""
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Index für ähnliche historische Tickets")
+    parser.add_argument('command', choices=['build', 'update'], help="build = neu aufbauen, update = neue Tickets ergänzen")
+    parser.add_argument('input', help="CSV mit historischen Tickets (inkl. status, resolution_time_hours)")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help="Pfad zum trainierten Modell")
+    parser.add_argument('--index-dir', default=DEFAULT_INDEX_DIR, help="Verzeichnis des Index")
+    parser.add_argument('--dim', type=int, default=128, help="Dimensionen nach der Zufallsprojektion")
+    parser.add_argument('--tables', type=int, default=8, help="Anzahl LSH-Tabellen")
+    parser.add_argument('--bits', type=int, default=10, help="Hyperebenen pro Tabelle")
+    args = parser.parse_args(argv)
+
+    print("🔎 Index für ähnliche Tickets")
+    print("=" * 50)
+    start_time = time.time()
+    classifier = _load_classifier(args.model)
+    df = pd.read_csv(args.input, encoding='utf-8')
+
+    if args.command == 'build':
+        index = SimilarTicketIndex.build(classifier, df, dim=args.dim, tables=args.tables, bits=args.bits)
+        added = len(index)
+    else:
+        index = SimilarTicketIndex.load(args.index_dir, mmap=False)
+        added = index.add(classifier, df)
+
+    index.save(args.index_dir)
+    print(f"✅ {added:,} Tickets hinzugefügt, {len(index):,} im Index ({time.time() - start_time:.1f}s)")
+    print(f"💾 Gespeichert: {args.index_dir}")
+    return index
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Hyperparameter-Suche mit Cross-Validation und gecachten Feature-Matrizen
+Features pro Fold werden einmal berechnet (sparse .npz) und von allen Kandidaten geteilt
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+
+Beispiel:
+    python src/models/tuning.py data/raw/training_data.csv --folds 5 --jobs -1
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy import sparse
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from preprocessing.feature_cache import (
+    FEATURE_CACHE_DIR, FeatureCache, cached_create_features, file_hash, preprocessing_fingerprint
+)
+
+FOLD_CACHE_DIR = "data/cache/folds"
+REPORT_PATH = "data/models/tuning_report.json"
+
+# Konfiguration der Feature-Erstellung (Teil des Cache-Keys)
+FEATURE_CONFIG = {
+    "tfidf_max_features": 5000,
+    "tfidf_ngram_range": [1, 2],
+    "tfidf_min_df": 2,
+    "folds": 5,
+    "seed": 42
+}
+
+# Numerische Features aus ITTicketClassifier.create_features
+NUMERIC_FEATURES = [
+    'is_admin', 'is_developer', 'is_offhours', 'is_frequent_user', 'is_new_user',
+    'is_critical_system', 'text_length', 'word_count', 'has_urgent_keywords',
+    'hour_submitted', 'is_weekend', 'previous_tickets_30d'
+]
+CATEGORICAL_FEATURES = ['user_role', 'department', 'affected_system']
+
+# Modell → Zielvariable (wie im Training: XGBoost für Kategorie, Random Forest für Priorität)
+MODEL_TARGETS = {"xgboost": "category", "random_forest": "priority"}
+
+PARAM_GRIDS = {
+    "xgboost": {
+        "max_depth": [4, 6, 8],
+        "learning_rate": [0.05, 0.1, 0.2],
+        "subsample": [0.8, 1.0],
+        "n_estimators": [500]
+    },
+    "random_forest": {
+        "max_depth": [None, 20, 40],
+        "min_samples_leaf": [1, 2, 4],
+        "max_features": ["sqrt", "log2"],
+        "n_estimators": [400]
+    }
+}
+
+# Early Stopping (auf einem inneren Split des Trainings-Folds, nie auf dem Validierungs-Fold)
+XGB_EARLY_STOPPING_ROUNDS = 20
+RF_STEP = 50
+RF_PATIENCE = 2
+EARLY_STOPPING_FRACTION = 0.15
+
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+class FoldCache:
+    """
+    Feature-Matrizen pro Fold auf der Festplatte (scipy sparse .npz), abgelegt
+    unter einem Schlüssel aus Daten-Hash, Vorverarbeitung und FEATURE_CONFIG.
+    """
+
+    def __init__(self, cache_dir: str, key: str):
+        self.key = key
+        self.directory = os.path.join(cache_dir, key)
+
+    @staticmethod
+    def make_key(data_hash: str, preprocessing: str, config: Dict[str, Any]) -> str:
+        payload = json.dumps({"data": data_hash, "preprocessing": preprocessing, "config": config}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]
+
+    def fold_path(self, fold: int) -> str:
+        return os.path.join(self.directory, f"fold{fold}")
+
+    def exists(self, folds: int) -> bool:
+        return os.path.exists(os.path.join(self.directory, "manifest.json")) and all(
+            os.path.exists(self.fold_path(fold) + "_labels.npz") for fold in range(folds)
+        )
+
+    def save_fold(self, fold: int, X_train, X_valid, labels: Dict[str, np.ndarray]):
+        os.makedirs(self.directory, exist_ok=True)
+        base = self.fold_path(fold)
+        sparse.save_npz(base + "_train.npz", X_train)
+        sparse.save_npz(base + "_valid.npz", X_valid)
+        # Labels zuletzt: ihr Vorhandensein markiert einen vollständigen Fold
+        tmp_path = base + "_labels.tmp.npz"
+        np.savez(tmp_path, **labels)
+        os.replace(tmp_path, base + "_labels.npz")
+
+    def save_manifest(self, manifest: Dict[str, Any]):
+        with open(os.path.join(self.directory, "manifest.json"), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+    def load_manifest(self) -> Dict[str, Any]:
+        with open(os.path.join(self.directory, "manifest.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+def load_fold(fold_base: str) -> Tuple[Any, Any, Dict[str, np.ndarray]]:
+    with np.load(fold_base + "_labels.npz") as labels:
+        labels = {name: labels[name] for name in labels.files}
+    return sparse.load_npz(fold_base + "_train.npz"), sparse.load_npz(fold_base + "_valid.npz"), labels
+
+def build_fold_matrices(classifier, df: pd.DataFrame, cache: FoldCache,
+                        config: Dict[str, Any] = FEATURE_CONFIG,
+                        features_df: Optional[pd.DataFrame] = None) -> float:
+    """
+    Berechnet create_features (falls nicht übergeben) und setup_encoders einmal
+    für alle Daten und pro Fold die TF-IDF Matrix (nur auf dem Trainings-Teil
+    gefittet). Gibt die benötigte Zeit in Sekunden zurück.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.model_selection import StratifiedKFold
+    from sklearn.preprocessing import LabelEncoder
+
+    start_time = time.time()
+    if features_df is None:
+        features_df = classifier.create_features(df)
+    classifier.setup_encoders(df)
+
+    encoded = np.column_stack([
+        classifier.label_encoders[column].transform(df[column].astype(str)) for column in CATEGORICAL_FEATURES
+    ])
+    numeric = np.column_stack([
+        (features_df[column] if column in features_df.columns else df[column]).to_numpy(dtype=np.float32)
+        for column in NUMERIC_FEATURES
+    ])
+    dense = sparse.csr_matrix(np.hstack([numeric, encoded]).astype(np.float32))
+    targets = {
+        target: LabelEncoder().fit_transform(df[target]) for target in set(MODEL_TARGETS.values())
+    }
+    texts = features_df['processed_text'].fillna('').to_numpy()
+
+    splitter = StratifiedKFold(n_splits=config["folds"], shuffle=True, random_state=config["seed"])
+    for fold, (train_idx, valid_idx) in enumerate(splitter.split(texts, df['category'])):
+        vectorizer = TfidfVectorizer(
+            max_features=config["tfidf_max_features"],
+            ngram_range=tuple(config["tfidf_ngram_range"]),
+            min_df=config["tfidf_min_df"]
+        )
+        tfidf_train = vectorizer.fit_transform(texts[train_idx])
+        tfidf_valid = vectorizer.transform(texts[valid_idx])
+        X_train = sparse.hstack([tfidf_train, dense[train_idx]], format='csr', dtype=np.float32)
+        X_valid = sparse.hstack([tfidf_valid, dense[valid_idx]], format='csr', dtype=np.float32)
+        labels = {}
+        for target, y in targets.items():
+            labels[f"{target}_train"] = y[train_idx]
+            labels[f"{target}_valid"] = y[valid_idx]
+        cache.save_fold(fold, X_train, X_valid, labels)
+
+    elapsed = time.time() - start_time
+    cache.save_manifest({
+        "config": config,
+        "rows": len(df),
+        "featurize_seconds": round(elapsed, 3),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+    })
+    return elapsed
+
+def _early_stopping_split(X_train, y_train):
+    """
+    Teilt den Trainings-Fold in Fit- und Early-Stopping-Teil. Der Validierungs-Fold
+    bleibt so unberührt und liefert einen unverzerrten CV-Score.
+    """
+    from sklearn.model_selection import train_test_split
+
+    _, counts = np.unique(y_train, return_counts=True)
+    stratify = y_train if counts.min() >= 2 else None
+    return train_test_split(X_train, y_train, test_size=EARLY_STOPPING_FRACTION, random_state=42, stratify=stratify)
+
+def _fit_xgboost(params: Dict[str, Any], X_train, y_train):
+    from xgboost import XGBClassifier
+
+    X_fit, X_stop, y_fit, y_stop = _early_stopping_split(X_train, y_train)
+    model = XGBClassifier(
+        **params,
+        tree_method="hist",
+        n_jobs=1,
+        early_stopping_rounds=XGB_EARLY_STOPPING_ROUNDS,
+        eval_metric="mlogloss"
+    )
+    model.fit(X_fit, y_fit, eval_set=[(X_stop, y_stop)], verbose=False)
+    return model, {"best_iteration": int(model.best_iteration)}
+
+def _fit_random_forest(params: Dict[str, Any], X_train, y_train):
+    """
+    Random Forest hat kein natives Early Stopping: Bäume werden per warm_start
+    in Schritten von RF_STEP ergänzt, bis sich der Score auf dem Early-Stopping-Teil
+    RF_PATIENCE Schritte lang nicht mehr verbessert.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+
+    params = dict(params)
+    max_estimators = params.pop("n_estimators")
+    X_fit, X_stop, y_fit, y_stop = _early_stopping_split(X_train, y_train)
+    model = RandomForestClassifier(**params, n_estimators=0, warm_start=True, n_jobs=1, random_state=42)
+    best_score, best_trees, stale = -1.0, 0, 0
+    while model.n_estimators < max_estimators and stale < RF_PATIENCE:
+        model.n_estimators += RF_STEP
+        model.fit(X_fit, y_fit)
+        score = model.score(X_stop, y_stop)
+        if score > best_score + 1e-3:
+            best_score, best_trees, stale = score, model.n_estimators, 0
+        else:
+            stale += 1
+    return model, {"best_iteration": best_trees}
+
+_FITTERS = {"xgboost": _fit_xgboost, "random_forest": _fit_random_forest}
+
+def evaluate_candidate(model_name: str, params: Dict[str, Any], fold_base: str) -> Dict[str, Any]:
+    """Trainiert einen Kandidaten auf einem gecachten Fold (läuft in einem Worker-Prozess)"""
+    from sklearn.metrics import accuracy_score, f1_score
+
+    start_time = time.time()
+    X_train, X_valid, labels = load_fold(fold_base)
+    target = MODEL_TARGETS[model_name]
+    y_train, y_valid = labels[f"{target}_train"], labels[f"{target}_valid"]
+
+    model, info = _FITTERS[model_name](params, X_train, y_train)
+    predicted = model.predict(X_valid)
+    return {
+        "accuracy": float(accuracy_score(y_valid, predicted)),
+        "f1_macro": float(f1_score(y_valid, predicted, average="macro")),
+        "seconds": time.time() - start_time,
+        **info
+    }
+
+def tune(data_path: str, model_names: Optional[List[str]] = None, grids: Optional[Dict[str, Dict]] = None,
+         config: Dict[str, Any] = FEATURE_CONFIG, cache_dir: str = FOLD_CACHE_DIR, n_jobs: int = -1,
+         classifier=None, feature_cache_dir: str = FEATURE_CACHE_DIR) -> Dict[str, Any]:
+    """
+    Hyperparameter-Suche über alle Kandidaten × Folds parallel. Die Feature-
+    Matrizen werden einmal pro (Daten, Vorverarbeitung, Konfiguration) berechnet.
+    """
+    if classifier is None:
+        from models.train_classifier import ITTicketClassifier
+        classifier = ITTicketClassifier()
+    model_names = model_names or list(MODEL_TARGETS)
+    grids = grids or PARAM_GRIDS
+
+    total_start = time.time()
+    key = FoldCache.make_key(file_hash(data_path), preprocessing_fingerprint(classifier), config)
+    cache = FoldCache(cache_dir, key)
+
+    cache_hit = cache.exists(config["folds"])
+    if cache_hit:
+        featurize_seconds = cache.load_manifest()["featurize_seconds"]
+        print(f"♻️ Feature-Cache Treffer ({key})")
+    else:
+        print(f"⚙️ Berechne Feature-Matrizen für {config['folds']} Folds...")
+        featurize_start = time.time()
+        df = pd.read_csv(data_path, encoding='utf-8')
+        # Vorverarbeitung aus dem persistenten Feature-Cache (preprocessing/feature_cache.py)
+        features_df = cached_create_features(classifier, df, data_path, FeatureCache(feature_cache_dir))
+        build_fold_matrices(classifier, df, cache, config, features_df)
+        featurize_seconds = time.time() - featurize_start
+        print(f"   {featurize_seconds:.1f}s → {cache.directory}")
+
+    candidates = [(name, params) for name in model_names for params in expand_grid(grids[name])]
+    tasks = [(name, params, fold) for name, params in candidates for fold in range(config["folds"])]
+    print(f"🔍 {len(candidates)} Kandidaten × {config['folds']} Folds = {len(tasks)} Trainings")
+
+    search_start = time.time()
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(evaluate_candidate)(name, params, cache.fold_path(fold)) for name, params, fold in tasks
+    )
+    search_seconds = time.time() - search_start
+
+    results: Dict[str, List[Dict[str, Any]]] = {name: [] for name in model_names}
+    for i, (name, params) in enumerate(candidates):
+        fold_scores = scores[i * config["folds"]:(i + 1) * config["folds"]]
+        results[name].append({
+            "params": params,
+            "accuracy": round(float(np.mean([s["accuracy"] for s in fold_scores])), 4),
+            "accuracy_std": round(float(np.std([s["accuracy"] for s in fold_scores])), 4),
+            "f1_macro": round(float(np.mean([s["f1_macro"] for s in fold_scores])), 4),
+            "best_iteration": int(np.median([s["best_iteration"] for s in fold_scores]))
+        })
+
+    # Geschätzt, nicht gemessen: naiver Ablauf berechnet die Features (create_features,
+    # setup_encoders, TF-IDF) pro Kandidat neu und trainiert sequentiell
+    naive_seconds = featurize_seconds * len(candidates) + sum(s["seconds"] for s in scores)
+    total_seconds = time.time() - total_start
+
+    report = {
+        "data": data_path,
+        "cache_key": key,
+        "cache_hit": cache_hit,
+        "folds": config["folds"],
+        "candidates": len(candidates),
+        "featurize_seconds": round(featurize_seconds, 2),
+        "search_seconds": round(search_seconds, 2),
+        "total_seconds": round(total_seconds, 2),
+        "naive_seconds_estimate": round(naive_seconds, 2),
+        "seconds_saved_estimate": round(naive_seconds - total_seconds, 2),
+        "best": {
+            name: {"target": MODEL_TARGETS[name], **max(entries, key=lambda e: e["f1_macro"])}
+            for name, entries in results.items()
+        },
+        "results": {
+            name: sorted(entries, key=lambda e: e["f1_macro"], reverse=True) for name, entries in results.items()
+        }
+    }
+    return report
+
+def main(argv=None):
+    """CLI Entry Point"""
+    parser = argparse.ArgumentParser(description="Hyperparameter-Suche mit gecachten Feature-Matrizen")
+    parser.add_argument('data', nargs='?', default="data/raw/training_data.csv", help="Trainingsdaten (CSV)")
+    parser.add_argument('--models', nargs='+', choices=list(MODEL_TARGETS), help="Zu optimierende Modelle")
+    parser.add_argument('--folds', type=int, default=FEATURE_CONFIG["folds"], help="Anzahl CV-Folds")
+    parser.add_argument('--jobs', type=int, default=-1, help="Parallele Worker (-1 = alle Kerne)")
+    parser.add_argument('--cache-dir', default=FOLD_CACHE_DIR, help="Verzeichnis des Feature-Caches")
+    parser.add_argument('--report', default=REPORT_PATH, help="Pfad des JSON-Reports")
+    args = parser.parse_args(argv)
+
+    print("🎛️ IT-Ticket Hyperparameter-Suche")
+    print("=" * 50)
+    report = tune(
+        args.data,
+        model_names=args.models,
+        config={**FEATURE_CONFIG, "folds": args.folds},
+        cache_dir=args.cache_dir,
+        n_jobs=args.jobs
+    )
+
+    for name, best in report["best"].items():
+        print(f"🏆 {name} ({best['target']}): F1 {best['f1_macro']:.4f} | Accuracy {best['accuracy']:.4f} | {best['params']}")
+    print(f"\n⏱️ Gesamt: {report['total_seconds']}s (naiv geschätzt: {report['naive_seconds_estimate']}s, "
+          f"geschätzt gespart: {report['seconds_saved_estimate']}s)")
+
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Report: {args.report}")
+    return report
+
+if __name__ == "__main__":
+    main()
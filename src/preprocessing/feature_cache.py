@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Persistenter Feature-Cache für das Training (content-addressed)
+Speichert processed_text und die numerischen Features von create_features als Parquet
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+
+Beispiel:
+    python src/preprocessing/feature_cache.py warm data/raw/training_data.csv
+    python src/preprocessing/feature_cache.py stats
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+from importlib import metadata
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+FEATURE_CACHE_DIR = os.environ.get("FEATURE_CACHE_DIR", "data/cache/features")
+MAX_CACHE_BYTES = int(os.environ.get("FEATURE_CACHE_MAX_BYTES", str(1 << 30)))
+
+# Erhöhen, wenn sich das Format der Cache-Einträge ändert
+CACHE_FORMAT_VERSION = 2
+
+# Bibliotheken, deren Version die Ausgabe von create_features beeinflusst (Tokenizer, Stopwörter, dtypes)
+FINGERPRINT_LIBRARIES = ['scikit-learn', 'nltk', 'pandas', 'numpy']
+
+# Quellcode unterhalb dieses Verzeichnisses gehört zur Vorverarbeitung (Projektcode, keine Bibliotheken)
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def file_hash(path: str) -> str:
+    """SHA-256 des Dateiinhalts (chunkweise gelesen)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _stable(value: Any) -> Any:
+    """Sets und Dicts in eine reproduzierbare JSON-Form bringen"""
+    if isinstance(value, (set, frozenset)):
+        return sorted(str(v) for v in value)
+    if isinstance(value, dict):
+        return {str(k): _stable(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    return value
+
+def library_versions() -> Dict[str, str]:
+    """Installierte Versionen von FINGERPRINT_LIBRARIES ('missing' falls nicht installiert)"""
+    versions = {}
+    for name in FINGERPRINT_LIBRARIES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = "missing"
+    return versions
+
+def source_files(classifier) -> List[str]:
+    """
+    Quelldateien der Vorverarbeitung: die Module der Klassen-Hierarchie des
+    Klassifikators und alle Projekt-Module (unterhalb von src/), die diese
+    Module importieren, z.B. Text-Helfer aus preprocessing/
+    """
+    modules = {sys.modules.get(cls.__module__) for cls in type(classifier).__mro__}
+    for module in list(modules):
+        for value in vars(module).values() if module is not None else ():
+            if inspect.ismodule(value):
+                modules.add(value)
+            elif getattr(value, '__module__', None) in sys.modules:
+                modules.add(sys.modules[value.__module__])
+
+    files = set()
+    for module in modules:
+        path = getattr(module, '__file__', None)
+        if path and os.path.abspath(path).startswith(SRC_DIR + os.sep) and path.endswith('.py'):
+            files.add(os.path.abspath(path))
+    return sorted(files)
+
+def preprocessing_fingerprint(classifier) -> str:
+    """
+    Fingerprint der Vorverarbeitung: Stopwörter und Term-Mappings (alle Set-
+    und Dict-Attribute des Klassifikators ausser den gefitteten Encodern),
+    der Quellcode der Vorverarbeitungs-Module (source_files) und die Versionen
+    der Bibliotheken, auf denen create_features aufsetzt
+    """
+    config = {
+        name: _stable(value)
+        for name, value in sorted(vars(classifier).items())
+        if isinstance(value, (set, frozenset, dict)) and name != 'label_encoders'
+    }
+    digest = hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode('utf-8'))
+    digest.update(json.dumps(library_versions(), sort_keys=True).encode('utf-8'))
+    files = source_files(classifier)
+    for path in files:
+        # Relativer Pfad, damit der Schlüssel nicht vom Checkout-Verzeichnis abhängt
+        digest.update(os.path.relpath(path, SRC_DIR).encode('utf-8'))
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    if not files:
+        digest.update(type(classifier).__qualname__.encode('utf-8'))
+    return digest.hexdigest()
+
+class FeatureCache:
+    """
+    Content-addressed Cache für die Ausgabe von create_features.
+
+    Der Schlüssel setzt sich aus dem Hash der Rohdaten, dem Fingerprint der
+    Vorverarbeitung und CACHE_FORMAT_VERSION zusammen; ein Eintrag ist damit
+    nie veraltet, sondern wird höchstens nicht mehr getroffen. Gespeichert
+    werden nur die von create_features erzeugten Spalten (Parquet, spaltenweise).
+    Überschreitet der Cache max_bytes, werden die am längsten nicht genutzten
+    Einträge gelöscht (LRU über die mtime, die bei jedem Treffer erneuert wird).
+    """
+
+    def __init__(self, directory: str = FEATURE_CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(data_hash: str, fingerprint: str) -> str:
+        payload = f"{data_hash}|{fingerprint}|{CACHE_FORMAT_VERSION}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.parquet")
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        path = self._path(key)
+        try:
+            features = pd.read_parquet(path)
+        except (FileNotFoundError, OSError):
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return features
+
+    def put(self, key: str, features: pd.DataFrame):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path + '.tmp'
+        features.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        self.evict(keep=key)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Cache-Einträge, zuletzt genutzte zuerst"""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.parquet'):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append({"key": name[:-len('.parquet')], "bytes": stat.st_size, "last_used": stat.st_mtime})
+        return sorted(entries, key=lambda e: e["last_used"], reverse=True)
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Löscht die ältesten Einträge bis der Cache unter max_bytes liegt"""
+        entries = self.entries()
+        total = sum(e["bytes"] for e in entries)
+        removed = 0
+        for entry in reversed(entries):
+            if total <= self.max_bytes:
+                break
+            if entry["key"] == keep:
+                continue
+            os.remove(self._path(entry["key"]))
+            total -= entry["bytes"]
+            removed += 1
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self.entries()
+        return {
+            "directory": self.directory,
+            "entries": len(entries),
+            "bytes": sum(e["bytes"] for e in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+def cached_create_features(classifier, df: pd.DataFrame, data_path: str,
+                           cache: Optional[FeatureCache] = None) -> pd.DataFrame:
+    """
+    Wie classifier.create_features(df) für die Rohdaten in data_path, aber bei
+    einem Cache-Treffer ohne jede Vorverarbeitung. df muss der unveränderte
+    Inhalt von data_path sein (gleiche Zeilen, gleiche Reihenfolge).
+    """
+    cache = cache or FeatureCache()
+    key = FeatureCache.make_key(file_hash(data_path), preprocessing_fingerprint(classifier))
+
+    derived = cache.get(key)
+    if derived is not None and len(derived) == len(df):
+        derived.index = df.index
+        return pd.concat([df, derived], axis=1)
+
+    features = classifier.create_features(df)
+    derived_columns = [column for column in features.columns if column not in df.columns]
+    cache.put(key, features[derived_columns].reset_index(drop=True))
+    return features
+
+def main(argv=None):
+    """CLI: Cache vorwärmen, Statistik anzeigen oder leeren"""
+    parser = argparse.ArgumentParser(description="Feature-Cache für das Training")
+    parser.add_argument('command', choices=['warm', 'stats', 'clear'])
+    parser.add_argument('data', nargs='?', default="data/raw/training_data.csv", help="Trainingsdaten (CSV)")
+    parser.add_argument('--cache-dir', default=FEATURE_CACHE_DIR, help="Verzeichnis des Caches")
+    args = parser.parse_args(argv)
+
+    cache = FeatureCache(args.cache_dir)
+    if args.command == 'warm':
+        from models.train_classifier import ITTicketClassifier
+
+        start_time = time.time()
+        df = pd.read_csv(args.data, encoding='utf-8')
+        cached_create_features(ITTicketClassifier(), df, args.data, cache)
+        status = "Treffer" if cache.hits else "neu berechnet"
+        print(f"✅ Features für {len(df):,} Tickets {status} ({time.time() - start_time:.1f}s)")
+    elif args.command == 'clear':
+        for entry in cache.entries():
+            os.remove(os.path.join(cache.directory, f"{entry['key']}.parquet"))
+        print("🧹 Feature-Cache geleert")
+
+    stats = cache.stats()
+    print(f"📦 {stats['entries']} Einträge, {stats['bytes'] / 1e6:.1f} MB (max. {stats['max_bytes'] / 1e6:.0f} MB)")
+    return stats
+
+if __name__ == "__main__":
+    main()
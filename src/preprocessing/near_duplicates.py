@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Erkennung für IT-Tickets (MinHash + LSH Banding)
+Gruppiert fast identische Tickets eines Zeitfensters zu Clustern
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import itertools
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Mersenne-Primzahl für die universellen Hash-Funktionen
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+def duplicate_scope(record: Dict[str, Any]) -> str:
+    """
+    Scope eines Tickets für die Cluster-Suche. Neben dem Text hängt die
+    Priorität von user_role und der Einreichungszeit ab; nur Tickets mit
+    gleichem System, gleicher Rolle und gleichem Zeit-Bucket (Bürozeit oder
+    ausserhalb, wie is_offhours im Modell) teilen sich eine Vorhersage.
+    """
+    hour = record.get('hour_submitted', 12)
+    offhours = hour < 7 or hour > 19 or bool(record.get('is_weekend', 0))
+    return f"{record['affected_system']}|{record['user_role']}|{'offhours' if offhours else 'office'}"
+
+class MinHasher:
+    """Berechnet MinHash-Signaturen über Wort-Shingles eines (vorverarbeiteten) Textes"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 2, seed: int = 42):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        # a, b < 2^32 und x < 2^32: a * x + b passt ohne Überlauf in uint64
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """Wort-k-Shingles als stabile 32-bit Hashes (crc32, prozessübergreifend gleich)"""
+        tokens = text.split()
+        k = self.shingle_size if len(tokens) >= self.shingle_size else 1
+        grams = {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+        return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash-Signatur (num_perm Werte); None für leeren Text"""
+        shingles = self.shingles(text)
+        if shingles.size == 0:
+            return None
+        hashed = (np.outer(shingles, self._a) + self._b) % _MERSENNE_PRIME
+        return hashed.min(axis=0)
+
+class DuplicateCluster:
+    """Ein Cluster fast identischer Tickets mit wiederverwendbarer Vorhersage"""
+
+    __slots__ = ("cluster_id", "scope", "signature", "band_keys", "prediction",
+                 "size", "first_seen", "last_seen", "sample_title")
+
+    def __init__(self, cluster_id: str, scope: str, signature: np.ndarray, band_keys: List[Tuple],
+                 prediction: Tuple, sample_title: str, now: float):
+        self.cluster_id = cluster_id
+        self.scope = scope
+        self.signature = signature
+        self.band_keys = band_keys
+        self.prediction = prediction
+        self.size = 1
+        self.first_seen = now
+        self.last_seen = now
+        self.sample_title = sample_title
+
+    def to_dict(self) -> Dict[str, Any]:
+        category, priority = self.prediction[:2]
+        return {
+            "cluster_id": self.cluster_id,
+            "scope": self.scope,
+            "size": self.size,
+            "category": category,
+            "priority": priority,
+            "sample_title": self.sample_title,
+            "first_seen": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.first_seen)),
+            "last_seen": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.last_seen))
+        }
+
+class NearDuplicateIndex:
+    """
+    LSH-Index über MinHash-Signaturen mit gleitendem Zeitfenster.
+
+    Die Signatur wird in bands Bänder à rows Werte geteilt; Tickets, die in
+    mindestens einem Band übereinstimmen, sind Kandidaten. Kandidaten werden
+    über die geschätzte Jaccard-Ähnlichkeit (Anteil gleicher MinHash-Werte)
+    gegen threshold geprüft. Cluster ohne neues Ticket innerhalb von
+    window_seconds fallen aus dem Index. Gesucht wird nur innerhalb desselben
+    scope (siehe duplicate_scope).
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, threshold: float = 0.8,
+                 window_seconds: float = 600.0, max_clusters: int = 10000, seed: int = 42):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm muss durch bands teilbar sein")
+        self.hasher = MinHasher(num_perm=num_perm, seed=seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self.max_clusters = max_clusters
+
+        self._buckets: Dict[Tuple, set] = {}
+        self._clusters: "OrderedDict[str, DuplicateCluster]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        return self.hasher.signature(text)
+
+    def _band_keys(self, scope: str, signature: np.ndarray) -> List[Tuple]:
+        rows = self.rows
+        return [(scope, band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+
+    def _expire(self, now: float):
+        """Entfernt Cluster ausserhalb des Zeitfensters (älteste zuerst, O(1) amortisiert)"""
+        while self._clusters:
+            cluster = next(iter(self._clusters.values()))
+            if now - cluster.last_seen <= self.window_seconds and len(self._clusters) <= self.max_clusters:
+                break
+            self._remove(cluster)
+
+    def _remove(self, cluster: DuplicateCluster):
+        del self._clusters[cluster.cluster_id]
+        for key in cluster.band_keys:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(cluster.cluster_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _find(self, signature: np.ndarray, band_keys: List[Tuple]) -> Tuple[Optional[DuplicateCluster], float]:
+        candidates = set()
+        for key in band_keys:
+            candidates.update(self._buckets.get(key, ()))
+
+        best, best_similarity = None, 0.0
+        for cluster_id in candidates:
+            cluster = self._clusters[cluster_id]
+            similarity = float(np.mean(cluster.signature == signature))
+            if similarity >= self.threshold and similarity > best_similarity:
+                best, best_similarity = cluster, similarity
+        return best, best_similarity
+
+    def _touch(self, cluster: DuplicateCluster, now: float):
+        cluster.size += 1
+        cluster.last_seen = now
+        self._clusters.move_to_end(cluster.cluster_id)
+
+    def query(self, signature: Optional[np.ndarray], scope: str = "") -> Optional[Tuple[DuplicateCluster, float]]:
+        """
+        Sucht einen aktiven Cluster für die Signatur. Bei einem Treffer wird das
+        Ticket dem Cluster zugeordnet und (Cluster, Ähnlichkeit) zurückgegeben.
+        """
+        if signature is None:
+            return None
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            cluster, similarity = self._find(signature, self._band_keys(scope, signature))
+            if cluster is None:
+                self.misses += 1
+                return None
+            self._touch(cluster, now)
+            self.hits += 1
+            return cluster, similarity
+
+    def assign(self, signature: Optional[np.ndarray], prediction: Tuple, scope: str = "",
+               sample_title: str = "") -> Optional[Tuple[DuplicateCluster, float, bool]]:
+        """
+        Ordnet ein frisch klassifiziertes Ticket einem Cluster zu (neuer Cluster,
+        falls seit query() kein passender entstanden ist). Gibt (Cluster, Ähnlichkeit, neu) zurück.
+        """
+        if signature is None:
+            return None
+        now = time.time()
+        band_keys = self._band_keys(scope, signature)
+        with self._lock:
+            cluster, similarity = self._find(signature, band_keys)
+            if cluster is not None:
+                self._touch(cluster, now)
+                return cluster, similarity, False
+
+            cluster = DuplicateCluster(
+                f"dup-{next(self._ids):06d}", scope, signature, band_keys, prediction, sample_title[:120], now
+            )
+            self._clusters[cluster.cluster_id] = cluster
+            for key in band_keys:
+                self._buckets.setdefault(key, set()).add(cluster.cluster_id)
+            self._expire(now)
+            return cluster, 1.0, True
+
+    def clusters(self, min_size: int = 2) -> List[Dict[str, Any]]:
+        """Aktive Cluster (grösste zuerst) für Incident-Gruppierung"""
+        with self._lock:
+            self._expire(time.time())
+            active = [c.to_dict() for c in self._clusters.values() if c.size >= min_size]
+        return sorted(active, key=lambda c: c["size"], reverse=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "active_clusters": len(self._clusters),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "threshold": self.threshold,
+                "window_seconds": self.window_seconds,
+                "bands": self.bands,
+                "rows_per_band": self.rows
+            }
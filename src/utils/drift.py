@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Drift-Monitoring für IT-Ticket Classification System
+Streaming-Sketches über den Live-Traffic (konstanter Speicher, O(1) pro Ticket)
+und PSI/KL-Vergleich gegen einen beim Training gespeicherten Baseline-Snapshot
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+
+Beispiel:
+    python src/utils/drift.py baseline data/raw/training_data.csv
+"""
+
+import argparse
+import csv
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DRIFT_BASELINE_PATH = os.environ.get("DRIFT_BASELINE_PATH", "data/models/drift_baseline.json")
+BASELINE_VERSION = 1
+
+# Feste Bin-Grenzen, damit Baseline und Live-Traffic identisch gebinnt werden
+HISTOGRAM_EDGES = {
+    "hour_submitted": [float(hour) for hour in range(1, 24)],
+    "previous_tickets_30d": [1, 2, 3, 5, 8, 13, 21],
+    "text_length": [25, 50, 100, 200, 400, 800, 1600],
+}
+CATEGORICAL_FEATURES = ["user_role", "department", "affected_system"]
+
+MAX_CATEGORIES = 50          # weitere Werte landen in OTHER
+BASELINE_TERMS = 200         # häufigste Terme im Baseline-Snapshot
+TOP_K = 100                  # Heavy Hitter pro Live-Fenster
+SKETCH_WIDTH = 4096
+SKETCH_DEPTH = 4
+WINDOW_SIZE = 5000           # Tickets pro Live-Fenster
+MIN_SAMPLES = 200            # darunter werden keine Scores berechnet
+
+# PSI-Grenzen (übliche Faustregel)
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+OTHER = "__other__"
+EPSILON = 1e-4
+
+TOKEN_PATTERN = re.compile(r"[a-zäöüß]{3,}")
+
+def tokenize(text: str) -> List[str]:
+    """Günstige Tokenisierung für das Monitoring (ohne NLTK und Modell)"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+class CountMinSketch:
+    """Count-Min Sketch: überschätzt Häufigkeiten nie nach unten, Speicher width x depth"""
+
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.rows = [array('L', [0]) * width for _ in range(depth)]
+
+    def _indexes(self, token: str):
+        h = hash(token)
+        step = (h >> 17) | 1
+        return [(h + row * step) % self.width for row in range(self.depth)]
+
+    def add(self, token: str, count: int = 1) -> int:
+        """Zählt token und gibt die neue Schätzung zurück"""
+        estimate = None
+        for row, index in zip(self.rows, self._indexes(token)):
+            row[index] += count
+            estimate = row[index] if estimate is None else min(estimate, row[index])
+        return estimate
+
+    def estimate(self, token: str) -> int:
+        return min(row[index] for row, index in zip(self.rows, self._indexes(token)))
+
+class TermSketch:
+    """
+    Vokabular-Sketch: Count-Min für alle Terme plus Top-K Heavy Hitter.
+    Ein Term kommt nur in die Top-K, wenn seine Schätzung das gemerkte Minimum
+    übertrifft; der O(k) Scan nach dem Minimum passiert nur dann. Das gemerkte
+    Minimum kann veralten (zu klein), was nur einen zusätzlichen Scan kostet.
+    """
+
+    def __init__(self, capacity: int = TOP_K):
+        self.capacity = capacity
+        self.sketch = CountMinSketch()
+        self.top: Dict[str, int] = {}
+        self.total = 0
+        self._min = 0
+
+    def add(self, token: str):
+        self.total += 1
+        estimate = self.sketch.add(token)
+        if token in self.top:
+            self.top[token] = estimate
+        elif len(self.top) < self.capacity:
+            self.top[token] = estimate
+            if len(self.top) == self.capacity:
+                self._min = min(self.top.values())
+        elif estimate > self._min:
+            victim = min(self.top, key=self.top.get)
+            if self.top[victim] < estimate:
+                del self.top[victim]
+                self.top[token] = estimate
+                victim = min(self.top, key=self.top.get)
+            self._min = self.top[victim]
+
+class Histogram:
+    """Histogramm mit festen Bin-Grenzen (len(edges) + 1 Bins)"""
+
+    def __init__(self, edges: List[float]):
+        self.edges = list(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+
+    def add(self, value: float):
+        self.counts[bisect_right(self.edges, value)] += 1
+
+class CategoricalCounter:
+    """Häufigkeiten kategorialer Werte, höchstens max_categories eigene Einträge"""
+
+    def __init__(self, max_categories: int = MAX_CATEGORIES):
+        self.max_categories = max_categories
+        self.counts: Dict[str, int] = {}
+
+    def add(self, value: Any):
+        key = str(value)
+        if key in self.counts or len(self.counts) < self.max_categories:
+            self.counts[key] = self.counts.get(key, 0) + 1
+        else:
+            self.counts[OTHER] = self.counts.get(OTHER, 0) + 1
+
+class TrafficProfile:
+    """Alle Sketches eines Live-Fensters"""
+
+    def __init__(self):
+        self.samples = 0
+        self.terms = TermSketch()
+        self.histograms = {name: Histogram(edges) for name, edges in HISTOGRAM_EDGES.items()}
+        self.categoricals = {name: CategoricalCounter() for name in CATEGORICAL_FEATURES}
+
+    def observe(self, record: Dict[str, Any]):
+        text = f"{record.get('title', '')} {record.get('description', '')}"
+        for token in tokenize(text):
+            self.terms.add(token)
+        self.histograms["hour_submitted"].add(float(record.get('hour_submitted', 0)))
+        self.histograms["previous_tickets_30d"].add(float(record.get('previous_tickets_30d', 0)))
+        self.histograms["text_length"].add(len(text))
+        for name in CATEGORICAL_FEATURES:
+            self.categoricals[name].add(record.get(name, ""))
+        self.samples += 1
+
+def build_baseline(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Baseline-Snapshot aus den Trainingsdaten (Terme exakt gezählt)"""
+    profile = TrafficProfile()
+    terms = Counter()
+    for record in records:
+        profile.observe(record)
+        terms.update(tokenize(f"{record.get('title', '')} {record.get('description', '')}"))
+    return {
+        "version": BASELINE_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "samples": profile.samples,
+        "histograms": {
+            name: {"edges": histogram.edges, "counts": histogram.counts}
+            for name, histogram in profile.histograms.items()
+        },
+        "categoricals": {name: counter.counts for name, counter in profile.categoricals.items()},
+        "terms": {"total": sum(terms.values()), "top": dict(terms.most_common(BASELINE_TERMS))},
+    }
+
+def save_baseline(baseline: Dict[str, Any], path: str = DRIFT_BASELINE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def load_baseline(path: str = DRIFT_BASELINE_PATH) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get("version") != BASELINE_VERSION:
+        return None
+    return baseline
+
+def _proportions(counts: List[float]) -> List[float]:
+    total = sum(counts)
+    return [max(count / total, EPSILON) if total else EPSILON for count in counts]
+
+def psi(expected: List[float], actual: List[float]) -> float:
+    """Population Stability Index zweier Häufigkeitsvektoren"""
+    e, a = _proportions(expected), _proportions(actual)
+    return sum((ai - ei) * math.log(ai / ei) for ei, ai in zip(e, a))
+
+def kl_divergence(expected: List[float], actual: List[float]) -> float:
+    """KL(actual || expected)"""
+    e, a = _proportions(expected), _proportions(actual)
+    return sum(ai * math.log(ai / ei) for ei, ai in zip(e, a))
+
+def drift_status(score: float) -> str:
+    if score < PSI_MODERATE:
+        return "stable"
+    if score < PSI_SIGNIFICANT:
+        return "moderate"
+    return "significant"
+
+class DriftMonitor:
+    """
+    Vergleicht den Live-Traffic mit dem Baseline-Snapshot.
+    Es werden zwei Fenster gehalten (abgeschlossen + aktuell); ist das aktuelle
+    voll, ersetzt es das abgeschlossene. Speicher ist damit unabhängig vom Traffic.
+    """
+
+    def __init__(self, baseline: Optional[Dict[str, Any]] = None, window_size: int = WINDOW_SIZE,
+                 min_samples: int = MIN_SAMPLES):
+        self.baseline = baseline
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self.current = TrafficProfile()
+        self.previous: Optional[TrafficProfile] = None
+        self.observed_total = 0
+        self._lock = threading.Lock()
+
+    def observe(self, records: List[Dict[str, Any]]):
+        with self._lock:
+            for record in records:
+                self.current.observe(record)
+                if self.current.samples >= self.window_size:
+                    self.previous = self.current
+                    self.current = TrafficProfile()
+            self.observed_total += len(records)
+
+    def _windows(self) -> List[TrafficProfile]:
+        return [profile for profile in (self.previous, self.current) if profile is not None]
+
+    def _compare(self, windows: List[TrafficProfile]) -> Dict[str, Dict[str, Any]]:
+        features = {}
+        for name, reference in self.baseline["histograms"].items():
+            actual = [sum(values) for values in zip(*(w.histograms[name].counts for w in windows))]
+            features[name] = self._score(reference["counts"], actual)
+
+        for name, reference in self.baseline["categoricals"].items():
+            keys = [key for key in reference if key != OTHER]
+            live = Counter()
+            for window in windows:
+                live.update(window.categoricals[name].counts)
+            known = [live.get(key, 0) for key in keys]
+            features[name] = self._score(
+                [reference[key] for key in keys] + [reference.get(OTHER, 0)],
+                known + [sum(live.values()) - sum(known)]
+            )
+
+        top_terms = self.baseline["terms"]["top"]
+        total = sum(window.terms.total for window in windows)
+        known = [min(sum(w.terms.sketch.estimate(term) for w in windows), total) for term in top_terms]
+        features["vocabulary"] = self._score(
+            list(top_terms.values()) + [self.baseline["terms"]["total"] - sum(top_terms.values())],
+            known + [max(total - sum(known), 0)]
+        )
+        return features
+
+    @staticmethod
+    def _score(expected: List[float], actual: List[float]) -> Dict[str, Any]:
+        score = psi(expected, actual)
+        return {"psi": round(score, 4), "kl": round(kl_divergence(expected, actual), 4), "status": drift_status(score)}
+
+    def emerging_terms(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Häufige Live-Terme, die in der Baseline nicht zu den häufigsten gehören"""
+        known = self.baseline["terms"]["top"] if self.baseline else {}
+        counts = Counter()
+        for window in self._windows():
+            counts.update(window.terms.top)
+        return [
+            {"term": term, "count": count}
+            for term, count in counts.most_common() if term not in known
+        ][:limit]
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            windows = self._windows()
+            samples = sum(window.samples for window in windows)
+            report = {
+                "baseline_loaded": self.baseline is not None,
+                "baseline_created_at": self.baseline.get("created_at") if self.baseline else None,
+                "window_samples": samples,
+                "observed_total": self.observed_total,
+                "status": "no_baseline",
+                "features": {},
+                "emerging_terms": [],
+            }
+            if self.baseline is None:
+                return report
+            if samples < self.min_samples:
+                report["status"] = "insufficient_data"
+                return report
+            features = self._compare(windows)
+            report["features"] = features
+            report["max_psi"] = max(feature["psi"] for feature in features.values())
+            report["status"] = drift_status(report["max_psi"])
+            report["emerging_terms"] = self.emerging_terms()
+            return report
+
+def load_drift_monitor(path: str = DRIFT_BASELINE_PATH) -> DriftMonitor:
+    """DriftMonitor mit dem gespeicherten Baseline-Snapshot (ohne Snapshot nur Sammeln)"""
+    try:
+        baseline = load_baseline(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Drift-Baseline nicht lesbar: {e}")
+        baseline = None
+    return DriftMonitor(baseline)
+
+def main(argv=None):
+    """CLI: Baseline-Snapshot aus den Trainingsdaten erstellen"""
+    parser = argparse.ArgumentParser(description="Drift-Monitoring")
+    parser.add_argument('command', choices=['baseline'])
+    parser.add_argument('data', nargs='?', default="data/raw/training_data.csv", help="Trainingsdaten (CSV)")
+    parser.add_argument('--output', default=DRIFT_BASELINE_PATH, help="Ziel des Baseline-Snapshots")
+    args = parser.parse_args(argv)
+
+    with open(args.data, newline='', encoding='utf-8') as f:
+        baseline = build_baseline(csv.DictReader(f))
+    save_baseline(baseline, args.output)
+    print(f"✅ Drift-Baseline aus {baseline['samples']:,} Tickets gespeichert: {args.output}")
+    return baseline
+
+if __name__ == "__main__":
+    main()
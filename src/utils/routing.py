@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Routing-Hilfsfunktionen für IT-Ticket Classification System
+Team-Zuweisung, SLA-Ziele und Confidence-Einstufung über eine
+konfigurierbare Routing-Policy (config/routing_policy.json)
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TEAM_MAPPING = {
+    "Hardware": "Hardware Support Team",
+    "Software": "Software Support Team",
+    "Network": "Network Operations Team",
+    "Security": "Security Incident Response Team"
+}
+
+SLA_MAPPING = {
+    "Critical": "1 hour",
+    "High": "4 hours",
+    "Medium": "24 hours",
+    "Low": "72 hours"
+}
+
+RECOMMENDATIONS = {
+    "high": "automatic_assignment",
+    "medium": "review_recommended",
+    "low": "manual_classification_required"
+}
+
+DEFAULT_TEAM = "General IT Support"
+DEFAULT_SLA = "24 hours"
+
+ROUTING_POLICY_PATH = os.environ.get("ROUTING_POLICY_PATH", "config/routing_policy.json")
+
+# Höchstens alle n Sekunden wird die mtime der Policy-Datei geprüft
+RELOAD_CHECK_INTERVAL = float(os.environ.get("ROUTING_POLICY_CHECK_INTERVAL", "2.0"))
+
+# Schlüssel einer Policy-Regel, in Reihenfolge des Lookup-Tupels
+POLICY_FIELDS = ("category", "priority", "department", "affected_system", "confidence_band")
+POLICY_OUTPUTS = ("suggested_team", "sla_target", "recommendation")
+WILDCARD = "*"
+
+# Memo-Tabelle der aufgelösten Schlüssel; wird beim Überlauf geleert
+MAX_CACHED_ROUTES = 100000
+
+# Standard-Schwellen der Confidence; mit einer Kalibrierung (models/calibration.py)
+# werden sie aus dem Validierungs-Split bestimmt und über set_confidence_thresholds gesetzt
+DEFAULT_CONFIDENCE_THRESHOLDS = {
+    "automatic_assignment": 0.9,
+    "review_recommended": 0.8
+}
+
+_confidence_thresholds = dict(DEFAULT_CONFIDENCE_THRESHOLDS)
+
+def set_confidence_thresholds(thresholds: Optional[Dict[str, float]] = None):
+    """Setzt die Schwellen für Confidence Level und Empfehlung (None = Standard)"""
+    _confidence_thresholds.clear()
+    _confidence_thresholds.update(DEFAULT_CONFIDENCE_THRESHOLDS)
+    _confidence_thresholds.update(thresholds or {})
+
+def get_confidence_thresholds() -> Dict[str, float]:
+    """Aktuell gültige Schwellen"""
+    return dict(_confidence_thresholds)
+
+def get_confidence_level(confidence: float) -> str:
+    """Bestimmt Confidence Level"""
+    if confidence >= _confidence_thresholds["automatic_assignment"]:
+        return "high"
+    elif confidence >= _confidence_thresholds["review_recommended"]:
+        return "medium"
+    else:
+        return "low"
+
+class Route(NamedTuple):
+    """Aufgelöstes Routing eines Tickets; routing ist ein geteiltes Dict - nicht verändern!"""
+    routing: Dict[str, str]
+    recommendation: str
+    confidence_level: Optional[str]
+
+class RoutingPolicy:
+    """
+    Kompilierte Routing-Policy.
+
+    Jede Regel setzt eines oder mehrere Outputs (suggested_team, sla_target,
+    recommendation) für eine Bedingung auf POLICY_FIELDS; fehlende Felder sind
+    Wildcards. Pro Output wird jedes Output einzeln aufgelöst: es gewinnt die
+    spezifischste Regel (meiste gesetzte Felder), bei gleicher Spezifität die
+    frühere. TEAM_MAPPING, SLA_MAPPING und RECOMMENDATIONS bilden die
+    Basisschicht, die Regeln der Konfiguration überschreiben sie.
+
+    Kompiliert wird in Hash-Indizes pro Feld-Kombination, ein Lookup prüft also
+    höchstens so viele Dicts wie es Kombinationen in der Policy gibt - unabhängig
+    von der Zahl der Regeln. Aufgelöste Schlüssel werden zusätzlich memoisiert.
+    """
+
+    def __init__(self, rules: Iterable[Dict[str, Any]] = (), defaults: Optional[Dict[str, str]] = None,
+                 version: Optional[str] = None):
+        self.version = version
+        self.defaults = {"suggested_team": DEFAULT_TEAM, "sla_target": DEFAULT_SLA, **(defaults or {})}
+
+        base = (
+            [{"id": f"team:{c}", "when": {"category": c}, "suggested_team": t} for c, t in TEAM_MAPPING.items()]
+            + [{"id": f"sla:{p}", "when": {"priority": p}, "sla_target": s} for p, s in SLA_MAPPING.items()]
+            + [{"id": f"band:{b}", "when": {"confidence_band": b}, "recommendation": r} for b, r in RECOMMENDATIONS.items()]
+        )
+        self.rules = list(rules)
+        # output -> Liste von Ebenen (spezifischste zuerst) mit [(positions, {key: (rank, value)})]
+        self._levels: Dict[str, List[List[Tuple[Tuple[int, ...], Dict[tuple, Tuple[int, str]]]]]] = {}
+        indexes: Dict[str, Dict[Tuple[int, ...], Dict[tuple, Tuple[int, str]]]] = {o: {} for o in POLICY_OUTPUTS}
+
+        # Regeln der Konfiguration vor der Basisschicht (kleinerer Rang gewinnt)
+        for rank, rule in enumerate(self.rules + base):
+            when = rule.get("when", {})
+            if not isinstance(when, dict):
+                raise ValueError(f"Regel '{rule.get('id', rank)}': 'when' muss ein Objekt sein")
+            unknown = set(when) - set(POLICY_FIELDS)
+            if unknown:
+                raise ValueError(f"Regel '{rule.get('id', rank)}': unbekannte Felder {sorted(unknown)}")
+            if not any(output in rule for output in POLICY_OUTPUTS):
+                raise ValueError(f"Regel '{rule.get('id', rank)}' setzt keines von {POLICY_OUTPUTS}")
+            if rule.get("recommendation", RECOMMENDATIONS["low"]) not in RECOMMENDATIONS.values():
+                raise ValueError(f"Regel '{rule.get('id', rank)}': unbekannte Empfehlung {rule['recommendation']}")
+            bands = when.get("confidence_band", WILDCARD)
+            invalid = [b for b in (bands if isinstance(bands, list) else [bands]) if b not in RECOMMENDATIONS]
+            if bands != WILDCARD and invalid:
+                raise ValueError(
+                    f"Regel '{rule.get('id', rank)}': unbekanntes confidence_band {invalid} "
+                    f"(erlaubt: {sorted(RECOMMENDATIONS)})"
+                )
+            concrete = {field: value for field, value in when.items() if value != WILDCARD}
+            positions = tuple(i for i, field in enumerate(POLICY_FIELDS) if field in concrete)
+            values = [concrete[POLICY_FIELDS[i]] for i in positions]
+            # Listen in "when" sind eine Kurzform für mehrere Regeln
+            keys = [()]
+            for value in values:
+                keys = [key + (v,) for key in keys for v in (value if isinstance(value, list) else [value])]
+            for output in POLICY_OUTPUTS:
+                if output in rule:
+                    index = indexes[output].setdefault(positions, {})
+                    for key in keys:
+                        index.setdefault(key, (rank, rule[output]))
+
+        for output, by_positions in indexes.items():
+            levels: Dict[int, list] = {}
+            for positions, index in by_positions.items():
+                levels.setdefault(len(positions), []).append((positions, index))
+            self._levels[output] = [levels[size] for size in sorted(levels, reverse=True)]
+
+        self._routing_dicts: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._cache: Dict[tuple, Route] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RoutingPolicy":
+        return cls(config.get("rules", []), config.get("defaults"), config.get("version"))
+
+    @classmethod
+    def from_file(cls, path: str) -> "RoutingPolicy":
+        with open(path, encoding='utf-8') as f:
+            return cls.from_config(json.load(f))
+
+    def _lookup(self, output: str, key: tuple) -> Optional[str]:
+        for level in self._levels[output]:
+            best = None
+            for positions, index in level:
+                hit = index.get(tuple(key[i] for i in positions))
+                if hit is not None and (best is None or hit[0] < best[0]):
+                    best = hit
+            if best is not None:
+                return best[1]
+        return None
+
+    def resolve(self, category: Optional[str], priority: Optional[str], department: Optional[str] = None,
+                affected_system: Optional[str] = None, confidence_band: Optional[str] = None) -> Route:
+        """Routing für einen Schlüssel (None = unbekannt, nur Wildcard-Regeln greifen)"""
+        key = (category, priority, department, affected_system, confidence_band)
+        route = self._cache.get(key)
+        if route is not None:
+            return route
+
+        team = self._lookup("suggested_team", key) or self.defaults["suggested_team"]
+        sla = self._lookup("sla_target", key) or self.defaults["sla_target"]
+        recommendation = self._lookup("recommendation", key) or RECOMMENDATIONS["low"]
+        routing = self._routing_dicts.setdefault((team, sla), {"suggested_team": team, "sla_target": sla})
+        route = Route(routing, recommendation, confidence_band)
+
+        if len(self._cache) >= MAX_CACHED_ROUTES:
+            self._cache.clear()
+        self._cache[key] = route
+        return route
+
+    def resolve_many(self, keys: Iterable[tuple]) -> List[Route]:
+        """Batch-Variante: jeder eindeutige Schlüssel wird nur einmal aufgelöst"""
+        keys = list(keys)
+        unique = {key: self.resolve(*key) for key in dict.fromkeys(keys)}
+        return [unique[key] for key in keys]
+
+class PolicyLoader:
+    """
+    Hält die aktuelle RoutingPolicy und lädt sie bei geänderter mtime neu
+    (Hot Reload ohne Neustart, auch in Worker-Prozessen). Die kompilierte
+    Policy wird als Ganzes ausgetauscht; eine fehlerhafte Datei behält die alte.
+    """
+
+    def __init__(self, path: str = ROUTING_POLICY_PATH, check_interval: float = RELOAD_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self.policy = RoutingPolicy()
+        self.loaded_mtime: Optional[float] = None
+        self.reloads = 0
+        self.errors = 0
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> RoutingPolicy:
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            self.reload()
+        return self.policy
+
+    def reload(self, force: bool = False) -> bool:
+        """Lädt die Policy neu, falls sich die Datei geändert hat"""
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                mtime = None
+            if mtime == self.loaded_mtime and not force:
+                return False
+            try:
+                policy = RoutingPolicy.from_file(self.path) if mtime is not None else RoutingPolicy()
+            except (OSError, ValueError, TypeError) as e:
+                self.errors += 1
+                logger.error(f"❌ Routing-Policy {self.path} ungültig, behalte bisherige: {e}")
+                self.loaded_mtime = mtime
+                return False
+            self.policy = policy
+            self.loaded_mtime = mtime
+            self.reloads += 1
+            if mtime is not None:
+                logger.info(f"🔀 Routing-Policy geladen: {len(policy.rules)} Regeln (Version {policy.version})")
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "version": self.policy.version,
+            "rules": len(self.policy.rules),
+            "reloads": self.reloads,
+            "errors": self.errors,
+            "cached_routes": len(self.policy._cache)
+        }
+
+_loader = PolicyLoader()
+
+def get_routing_policy() -> RoutingPolicy:
+    """Aktuelle Routing-Policy (prüft gedrosselt auf Änderungen der Datei)"""
+    return _loader.get()
+
+def get_policy_loader() -> PolicyLoader:
+    return _loader
+
+def route_key(category: str, priority: str, confidence: float,
+              record: Optional[Dict[str, Any]] = None) -> tuple:
+    """Lookup-Schlüssel (POLICY_FIELDS) eines Tickets aus Vorhersage, Confidence und Eingabe-Dict"""
+    record = record or {}
+    return (category, priority, record.get('department'), record.get('affected_system'),
+            get_confidence_level(confidence))
+
+def resolve_route(category: str, priority: str, confidence: float,
+                  record: Optional[Dict[str, Any]] = None) -> Route:
+    """Routing eines Tickets aus Vorhersage, Confidence und (optional) Eingabe-Dict"""
+    return get_routing_policy().resolve(*route_key(category, priority, confidence, record))
+
+def get_team_assignment(category: str) -> str:
+    """Bestimmt Team-Zuweisung basierend auf Kategorie"""
+    return get_routing_policy().resolve(category, None).routing["suggested_team"]
+
+def get_sla_target(priority: str) -> str:
+    """Bestimmt SLA-Ziel basierend auf Priorität"""
+    return get_routing_policy().resolve(None, priority).routing["sla_target"]
+
+def get_recommendation(confidence: float) -> str:
+    """Gibt Empfehlung basierend auf Confidence"""
+    return get_routing_policy().resolve(None, None, confidence_band=get_confidence_level(confidence)).recommendation
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Gemeinsame Test-Fixtures
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import pytest
+
+# Flags aus ITTicketClassifier.create_features (im Fake ausser is_offhours immer 0)
+FLAG_FEATURES = [
+    'is_admin', 'is_developer', 'is_offhours', 'is_frequent_user', 'is_new_user',
+    'is_critical_system', 'has_urgent_keywords'
+]
+
+class FakeClassifier:
+    """
+    Ersetzt ITTicketClassifier in den Tests.
+
+    preprocess_text ist lower(); mit texts wird ein TfidfVectorizer darauf
+    gefittet. predict liefert für jede Zeile prediction (category, priority,
+    category_confidence, priority_confidence, overall_confidence) und zählt
+    Aufrufe (calls) und Zeilen (rows), create_features zählt feature_calls.
+    """
+
+    is_trained = True
+
+    def __init__(self, texts=None, prediction=("Software", "Medium", 0.6, 0.6, 0.6),
+                 stopwords=("please", "help"), mappings=None):
+        self.prediction = tuple(prediction)
+        self.it_stopwords = set(stopwords)
+        self.term_mappings = mappings or {"pc": "computer"}
+        self.label_encoders = {}
+        self.calls = 0
+        self.rows = 0
+        self.feature_calls = 0
+        if texts is not None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self.text_vectorizer = TfidfVectorizer().fit([self.preprocess_text(text) for text in texts])
+
+    def preprocess_text(self, text):
+        return text.lower()
+
+    def predict(self, df):
+        import pandas as pd
+
+        self.calls += 1
+        self.rows += len(df)
+        columns = ['category', 'priority', 'category_confidence', 'priority_confidence', 'overall_confidence']
+        return pd.DataFrame({column: [value] * len(df) for column, value in zip(columns, self.prediction)})
+
+    def create_features(self, df):
+        self.feature_calls += 1
+        features = df.copy()
+        text = df['title'] + " " + df['description'] if 'description' in df.columns else df['title']
+        features['processed_text'] = text.map(self.preprocess_text)
+        for column in FLAG_FEATURES:
+            features[column] = 0
+        if 'hour_submitted' in df.columns:
+            features['is_offhours'] = ((df['hour_submitted'] < 7) | (df['hour_submitted'] > 19)).astype(int)
+        features['text_length'] = features['processed_text'].str.len()
+        features['word_count'] = features['processed_text'].str.split().str.len()
+        return features
+
+    def setup_encoders(self, df):
+        from sklearn.preprocessing import LabelEncoder
+
+        for column in ['user_role', 'department', 'affected_system']:
+            self.label_encoders[column] = LabelEncoder().fit(df[column].astype(str))
+
+@pytest.fixture
+def make_classifier():
+    """Fabrik für FakeClassifier; Argumente wie FakeClassifier(...)"""
+    return FakeClassifier
@@ -10,22 +10,67 @@ Datum: 08.06.2025
 import pytest
 import sys
 import os
+import json
+import time
 from fastapi.testclient import TestClient
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 try:
-    from api.main import app
+    import api.main as main
+    from api.jobs import JobStore
 except ImportError:
     pytest.skip("API module not available", allow_module_level=True)
 
-client = TestClient(app)
+PREDICTION = ("Hardware", "High", 0.95, 0.9, 0.925)
+
+TICKET = {
+    "title": "Test laptop issue",
+    "description": "Laptop won't start properly",
+    "user_role": "end_user",
+    "department": "Finance",
+    "affected_system": "workstation",
+    "hour_submitted": 14,
+    "is_weekend": 0,
+    "previous_tickets_30d": 1
+}
+
+@pytest.fixture
+def client(monkeypatch, tmp_path, make_classifier):
+    """TestClient mit Startup/Shutdown; statt des Modells wird ein FakeClassifier geladen"""
+    for name in ("classifier", "job_manager", "duplicate_index", "rule_engine", "online_learner",
+                 "audit_log", "drift_monitor", "similar_index"):
+        monkeypatch.setattr(main, name, None)
+    monkeypatch.setattr(main, "model_state", "starting")
+    monkeypatch.setattr(main, "JobStore", lambda: JobStore(str(tmp_path / "jobs.sqlite3")))
+    
+    def load_fake_classifier():
+        main.classifier = make_classifier(prediction=PREDICTION)
+        main.model_state = "ready"
+        main.start_job_manager()
+    
+    monkeypatch.setattr(main, "load_classifier", load_fake_classifier)
+    with TestClient(main.app) as client:
+        deadline = time.time() + 5
+        while main.job_manager is None and time.time() < deadline:
+            time.sleep(0.01)
+        yield client
+
+def wait_for_job(client, job_id, timeout=5.0):
+    """Pollt den Job-Status bis der Job abgeschlossen ist"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/api/v1/jobs/{job_id}").json()
+        if job["status"] in ("completed", "partial", "failed"):
+            return job
+        time.sleep(0.02)
+    raise TimeoutError(job_id)
 
 class TestAPI:
     """Test Suite für FastAPI Endpoints"""
     
-    def test_root_endpoint(self):
+    def test_root_endpoint(self, client):
         """Test Root Endpoint"""
         response = client.get("/")
         assert response.status_code == 200
@@ -34,7 +79,7 @@ class TestAPI:
         assert "version" in data
         assert data["version"] == "2.1.3"
     
-    def test_health_endpoint(self):
+    def test_health_endpoint(self, client):
         """Test Health Check Endpoint"""
         response = client.get("/health")
         assert response.status_code == 200
@@ -44,19 +89,16 @@ class TestAPI:
         assert "model_loaded" in data
         assert "timestamp" in data
     
-    def test_model_info_endpoint(self):
+    def test_model_info_endpoint(self, client):
         """Test Model Info Endpoint"""
         response = client.get("/api/v1/model-info")
-        # Kann 503 sein wenn Modell nicht geladen
-        assert response.status_code in [200, 503]
-        
-        if response.status_code == 200:
-            data = response.json()
-            assert "model_version" in data
-            assert "supported_categories" in data
-            assert "supported_priorities" in data
+        assert response.status_code == 200
+        data = response.json()
+        assert "model_version" in data
+        assert "supported_categories" in data
+        assert "supported_priorities" in data
     
-    def test_statistics_endpoint(self):
+    def test_statistics_endpoint(self, client):
         """Test Statistics Endpoint"""
         response = client.get("/api/v1/statistics")
         assert response.status_code == 200
@@ -65,41 +107,28 @@ class TestAPI:
         assert "category_breakdown" in data
         assert "priority_breakdown" in data
     
-    def test_classify_ticket_endpoint_structure(self):
+    def test_classify_ticket_endpoint_structure(self, client):
         """Test Classify Ticket Endpoint Struktur"""
-        # Test mit gültigem Ticket
-        ticket_data = {
-            "title": "Test laptop issue",
-            "description": "Laptop won't start properly",
-            "user_role": "end_user",
-            "department": "Finance",
-            "affected_system": "workstation",
-            "hour_submitted": 14,
-            "is_weekend": 0,
-            "previous_tickets_30d": 1
-        }
-        
-        response = client.post("/api/v1/classify-ticket", json=ticket_data)
+        response = client.post("/api/v1/classify-ticket", json=TICKET)
+        assert response.status_code == 200
         
-        # Kann 503 sein wenn Modell nicht geladen, 200 wenn erfolgreich
-        assert response.status_code in [200, 503]
+        data = response.json()
+        assert "prediction" in data
+        assert "routing" in data
+        assert "explanation" in data
+        assert "metadata" in data
         
-        if response.status_code == 200:
-            data = response.json()
-            assert "prediction" in data
-            assert "routing" in data
-            assert "explanation" in data
-            assert "metadata" in data
-            
-            # Prüfe Prediction Struktur
-            prediction = data["prediction"]
-            assert "category" in prediction
-            assert "priority" in prediction
-            assert "category_confidence" in prediction
-            assert "priority_confidence" in prediction
-            assert "overall_confidence" in prediction
+        # Prüfe Prediction Struktur
+        prediction = data["prediction"]
+        assert prediction["category"] == "Hardware"
+        assert prediction["priority"] == "High"
+        assert prediction["category_confidence"] == 0.95
+        assert prediction["priority_confidence"] == 0.9
+        assert prediction["overall_confidence"] == 0.925
+        assert data["routing"]["suggested_team"] == "Hardware Support Team"
+        assert data["metadata"]["processing_time_ms"] >= 0
     
-    def test_classify_ticket_invalid_data(self):
+    def test_classify_ticket_invalid_data(self, client):
         """Test Classify Ticket mit ungültigen Daten"""
         # Test mit fehlendem Feld
         invalid_ticket = {
@@ -111,7 +140,7 @@ class TestAPI:
         response = client.post("/api/v1/classify-ticket", json=invalid_ticket)
         assert response.status_code == 422  # Validation Error
     
-    def test_openapi_docs(self):
+    def test_openapi_docs(self, client):
         """Test ob OpenAPI Dokumentation verfügbar ist"""
         response = client.get("/docs")
         assert response.status_code == 200
@@ -122,4 +151,87 @@ class TestAPI:
         openapi_data = response.json()
         assert "openapi" in openapi_data
         assert "info" in openapi_data
-        assert openapi_data["info"]["title"] == "IT-Ticket Classification API"
\ No newline at end of file
+        assert openapi_data["info"]["title"] == "IT-Ticket Classification API"
+    
+    def test_routing_helpers_importable_from_main(self):
+        """Test Routing-Helfer sind weiterhin aus api.main importierbar"""
+        from api.main import get_confidence_level, get_recommendation, get_sla_target, get_team_assignment
+        assert get_team_assignment("Hardware") == "Hardware Support Team"
+        assert get_sla_target("Critical") == "1 hour"
+        assert get_confidence_level(0.95) == "high"
+        assert get_recommendation(0.95) == "automatic_assignment"
+    
+    def test_classify_batch_endpoint(self, client):
+        """Test Classify Batch liefert eine Vorhersage pro Ticket"""
+        response = client.post("/api/v1/classify-batch", json={"tickets": [TICKET, dict(TICKET, title="Drucker")]})
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data["metadata"]["batch_size"] == 2
+        assert [p["prediction"]["category"] for p in data["predictions"]] == ["Hardware", "Hardware"]
+        assert data["predictions"][1]["routing"]["sla_target"] == "4 hours"
+    
+    def test_classify_batch_invalid_data(self, client):
+        """Test Classify Batch mit ungültigen Daten"""
+        response = client.post("/api/v1/classify-batch", json={"tickets": [{"title": "Test"}]})
+        assert response.status_code == 422  # Validation Error
+        
+        response = client.post("/api/v1/classify-batch", json={})
+        assert response.status_code == 422
+        
+        response = client.post("/api/v1/classify-batch", json={"tickets": []})
+        assert response.status_code == 422
+    
+    def test_classify_stream_endpoint(self, client):
+        """Test Classify Stream liefert pro Eingabezeile eine NDJSON-Zeile"""
+        body = b"\n".join([
+            json.dumps(dict(TICKET, ticket_id="T-1")).encode(),
+            b'{"title": "Test"}',
+            json.dumps(TICKET).encode()
+        ]) + b"\n"
+        response = client.post(
+            "/api/v1/classify-stream?batch_size=2",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(line["line"] for line in lines) == [1, 2, 3]
+        by_line = {line["line"]: line for line in lines}
+        assert by_line[1]["ticket_id"] == "T-1"
+        assert by_line[1]["prediction"]["category"] == "Hardware"
+        assert "error" in by_line[2]
+        assert by_line[3]["routing"]["suggested_team"] == "Hardware Support Team"
+    
+    def test_jobs_endpoint(self, client):
+        """Test Job anlegen, Status abfragen und Ergebnisse seitenweise lesen"""
+        response = client.post("/api/v1/jobs", json={"tickets": [TICKET] * 3})
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        
+        job = wait_for_job(client, job_id)
+        assert job["status"] == "completed"
+        assert job["processed"] == 3 and job["failed"] == 0
+        
+        response = client.get(f"/api/v1/jobs/{job_id}/results?offset=1&limit=10")
+        assert response.status_code == 200
+        page = response.json()
+        assert page["count"] == 2 and page["next_offset"] is None
+        assert page["results"][0]["prediction"]["category"] == "Hardware"
+        
+        response = client.post("/api/v1/jobs", json={"tickets": [TICKET], "file_path": "raw/test_data.csv"})
+        assert response.status_code == 422
+        
+        response = client.get("/api/v1/jobs/does-not-exist")
+        assert response.status_code == 404
+    
+    def test_feedback_endpoint(self, client):
+        """Test Feedback Endpoint"""
+        response = client.post("/api/v1/feedback", json={"category": "Security", "priority": "High"})
+        assert response.status_code == 422  # Ticket fehlt
+        
+        # Online-Learning wird mit dem Fake-Modell nicht gestartet
+        response = client.get("/api/v1/feedback/stats")
+        assert response.status_code == 503
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests für das Audit-Log der Vorhersagen
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import sys
+import os
+import gzip
+import json
+import time
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api.audit_log import DROP_NEWEST, AuditLog, input_hash
+from api.serialization import build_metadata, build_prediction_payload
+
+def make_call(n, title="Laptop startet nicht"):
+    records = [
+        {
+            "title": f"{title} {i}", "description": "Schwarzer Bildschirm", "user_role": "end_user",
+            "department": "IT", "affected_system": "workstation", "hour_submitted": 10,
+            "is_weekend": 0, "previous_tickets_30d": 1
+        }
+        for i in range(n)
+    ]
+    metadata = build_metadata(12.5)
+    payloads = [build_prediction_payload("Hardware", "High", 0.95, 0.9, 0.925, metadata) for _ in range(n)]
+    return records, payloads
+
+def read_entries(audit):
+    entries = []
+    for path in audit.files():
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            entries.extend(json.loads(line) for line in f)
+    return entries
+
+class TestAuditLog:
+    """Tests für Puffer, Batch-Schreiben, Rotation und Overflow"""
+
+    def test_flush_writes_structured_records(self, tmp_path):
+        audit = AuditLog(str(tmp_path), batch_size=2)
+        records, payloads = make_call(3)
+        audit.record(records, payloads, "batch")
+        assert audit.files() == []
+
+        assert audit.flush() == 3
+        entries = read_entries(audit)
+        assert len(entries) == 3
+        entry = entries[0]
+        assert entry["input_hash"] == input_hash(records[0])
+        assert entry["source"] == "batch"
+        assert entry["category"] == "Hardware"
+        assert entry["overall_confidence"] == 0.925
+        assert entry["tier"] == "model"
+        assert entry["latency_ms"] == 12.5
+        assert entry["features"]["title_length"] == len(records[0]["title"])
+        assert "Laptop" not in json.dumps(entry)
+
+    def test_snapshot_at_record_time(self, tmp_path):
+        audit = AuditLog(str(tmp_path))
+        records, payloads = make_call(1)
+        audit.record(records, payloads, "ticket")
+        payloads[0]["metadata"]["processing_time_ms"] = 99.0
+        payloads[0]["prediction"]["category"] = "Software"
+
+        audit.flush()
+        [entry] = read_entries(audit)
+        assert entry["latency_ms"] == 12.5
+        assert entry["category"] == "Hardware"
+
+    def test_background_writer_and_shutdown(self, tmp_path):
+        audit = AuditLog(str(tmp_path), batch_size=5, flush_interval=0.05)
+        audit.start()
+        audit.record(*make_call(10), "stream")
+        deadline = time.time() + 5
+        while audit.written < 10 and time.time() < deadline:
+            time.sleep(0.02)
+        audit.record(*make_call(1), "ticket")
+        audit.shutdown()
+        assert audit.stats()["written"] == 11
+        assert audit.stats()["buffered"] == 0
+
+    def test_drop_oldest_on_overflow(self, tmp_path):
+        audit = AuditLog(str(tmp_path), buffer_size=5)
+        audit.record(*make_call(3, "alt"), "batch")
+        audit.record(*make_call(3, "neu"), "batch")
+        stats = audit.stats()
+        assert stats["dropped"] == 3
+        assert stats["buffered"] == 3
+        audit.flush()
+        assert all(entry["features"]["title_length"] == len("neu 0") for entry in read_entries(audit))
+
+    def test_drop_newest_on_overflow(self, tmp_path):
+        audit = AuditLog(str(tmp_path), buffer_size=5, overflow_policy=DROP_NEWEST)
+        audit.record(*make_call(3, "alt"), "batch")
+        audit.record(*make_call(3, "neu"), "batch")
+        assert audit.stats()["dropped"] == 3
+        audit.flush()
+        assert all(entry["features"]["title_length"] == len("alt 0") for entry in read_entries(audit))
+
+    def test_rotation_keeps_max_files(self, tmp_path):
+        audit = AuditLog(str(tmp_path), batch_size=10, max_file_bytes=1, max_files=2)
+        for _ in range(4):
+            audit.record(*make_call(10), "batch")
+            audit.flush()
+        stats = audit.stats()
+        assert stats["files"] == 2
+        assert stats["files_rotated"] == 3
+        assert len(read_entries(audit)) == 20
+
+    def test_invalid_policy(self, tmp_path):
+        with pytest.raises(ValueError):
+            AuditLog(str(tmp_path), overflow_policy="block")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests für das Offline Batch-Scoring
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from models import batch_score
+
+class StubClassifier:
+    """Minimaler Ersatz für ITTicketClassifier"""
+    is_trained = True
+    
+    def predict(self, df):
+        security = df['title'].str.contains('phishing', case=False)
+        return pd.DataFrame({
+            'category': ['Security' if s else 'Hardware' for s in security],
+            'priority': ['Critical' if s else 'Low' for s in security],
+            'category_confidence': [0.95] * len(df),
+            'priority_confidence': [0.85] * len(df),
+            'overall_confidence': [0.9] * len(df)
+        })
+
+@pytest.fixture
+def tickets_csv(tmp_path):
+    """Ticket-Datei im Schema von data/raw/test_data.csv"""
+    rows = []
+    for i in range(25):
+        rows.append({
+            'ticket_id': f'TICK-2025-{i:05d}',
+            'title': 'Phishing mail' if i % 5 == 0 else 'Printer jam',
+            'description': 'Details',
+            'user_role': 'end_user',
+            'department': 'Finance',
+            'affected_system': 'email',
+            'hour_submitted': 10,
+            'is_weekend': 0,
+            'previous_tickets_30d': 1
+        })
+    path = tmp_path / "tickets.csv"
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+@pytest.fixture(autouse=True)
+def stub_model(monkeypatch):
+    monkeypatch.setattr(batch_score, "_load_classifier", lambda model_path: StubClassifier())
+
+class TestBatchScore:
+    """Test Suite für models.batch_score"""
+    
+    def test_score_csv(self, tickets_csv, tmp_path):
+        """Test Scoring mit Routing-Spalten und ticket_id"""
+        output = str(tmp_path / "scored.csv")
+        summary = batch_score.score_file(tickets_csv, output, chunk_size=10, workers=0)
+        
+        assert summary['rows'] == 25
+        assert summary['chunks'] == 3
+        
+        scored = pd.read_csv(output)
+        assert len(scored) == 25
+        assert scored['ticket_id'].tolist()[:2] == ['TICK-2025-00000', 'TICK-2025-00001']
+        assert scored.loc[0, 'suggested_team'] == 'Security Incident Response Team'
+        assert scored.loc[0, 'sla_target'] == '1 hour'
+        assert scored.loc[1, 'suggested_team'] == 'Hardware Support Team'
+        assert scored.loc[1, 'recommendation'] == 'automatic_assignment'
+        
+        # Checkpoint und Part-Dateien werden nach Erfolg entfernt
+        assert not os.path.exists(output + '.checkpoint.json')
+        assert not os.path.exists(output + '.parts')
+    
+    def test_resume_from_checkpoint(self, tickets_csv, tmp_path):
+        """Test abgeschlossene Chunks werden beim Fortsetzen übersprungen"""
+        output = str(tmp_path / "scored.parquet")
+        parts_dir = output + '.parts'
+        os.makedirs(parts_dir)
+        
+        first_chunk = next(batch_score.read_chunks(tickets_csv, 10))
+        batch_score._write_part(parts_dir, 0, batch_score.score_chunk(first_chunk, StubClassifier()))
+        checkpoint = batch_score.Checkpoint(output + '.checkpoint.json', tickets_csv, 10)
+        checkpoint.mark_done(0)
+        
+        summary = batch_score.score_file(tickets_csv, output, chunk_size=10, workers=0)
+        
+        assert summary['rows'] == 15  # nur die fehlenden Chunks
+        scored = pd.read_parquet(output)
+        assert len(scored) == 25
+        assert scored['ticket_id'].is_unique
+    
+    def test_checkpoint_invalid_for_other_chunk_size(self, tickets_csv, tmp_path):
+        """Test Checkpoint passt nur zu identischem Input und Chunk-Grösse"""
+        path = str(tmp_path / "cp.json")
+        batch_score.Checkpoint(path, tickets_csv, 10).mark_done(0)
+        
+        assert batch_score.Checkpoint(path, tickets_csv, 10).load() is True
+        assert batch_score.Checkpoint(path, tickets_csv, 20).load() is False
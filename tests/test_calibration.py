@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests für die Confidence-Kalibrierung und die datengetriebenen Schwellen
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+
+from api.inference import predict_frame
+from models.calibration import (
+    TEST_DATA_PATH, ConfidenceCalibrator, IsotonicCurve, attach_calibrator, calibrate, model_fingerprint,
+    select_threshold
+)
+from utils.routing import (
+    DEFAULT_CONFIDENCE_THRESHOLDS, get_confidence_level, get_confidence_thresholds,
+    get_recommendation, set_confidence_thresholds
+)
+
+@pytest.fixture(autouse=True)
+def reset_thresholds():
+    yield
+    set_confidence_thresholds(None)
+
+def overconfident_heldout(n=2000, seed=0):
+    """Modell meldet 0.7-1.0, liegt aber nur mit Wahrscheinlichkeit (conf - 0.3) / 0.7 richtig"""
+    rng = np.random.RandomState(seed)
+    confidence = rng.uniform(0.7, 1.0, n)
+    correct = rng.uniform(size=n) < (confidence - 0.3) / 0.7
+    truth = np.array(["Hardware"] * n, dtype=object)
+    prediction = pd.DataFrame({
+        'category': np.where(correct, "Hardware", "Software"),
+        'priority': ["Medium"] * n,
+        'category_confidence': confidence,
+        'priority_confidence': np.full(n, 0.9),
+        'overall_confidence': confidence,
+    })
+    return prediction, truth, np.array(["Medium"] * n)
+
+class TestCalibration:
+    """Tests für isotone Kurven, Schwellenwahl und Anwendung"""
+
+    def test_curve_matches_empirical_accuracy(self):
+        prediction, category, priority = overconfident_heldout()
+        calibrator = ConfidenceCalibrator.fit(prediction, category, priority)
+
+        calibrated = calibrator.curves["category"](np.array([0.72, 0.85, 0.99]))
+        assert np.all(np.diff(calibrated) >= 0)
+        np.testing.assert_allclose(calibrated, [(0.72 - 0.3) / 0.7, (0.85 - 0.3) / 0.7, (0.99 - 0.3) / 0.7], atol=0.1)
+
+    def test_thresholds_meet_precision_targets(self):
+        prediction, category, priority = overconfident_heldout()
+        calibrator = ConfidenceCalibrator.fit(prediction, category, priority)
+        calibrated = calibrator.curves["overall"](prediction['overall_confidence'].to_numpy())
+        correct = prediction['category'].to_numpy() == category
+
+        for name, target in [("automatic_assignment", 0.9), ("review_recommended", 0.8)]:
+            selected = calibrated >= calibrator.thresholds[name]
+            assert correct[selected].mean() >= target
+        assert calibrator.thresholds["review_recommended"] < calibrator.thresholds["automatic_assignment"]
+
+    def test_select_threshold_respects_ties_and_min_samples(self):
+        confidences = np.array([0.9, 0.9, 0.8, 0.8, 0.5])
+        correct = np.array([1, 0, 1, 1, 0])
+        assert select_threshold(confidences, correct, 0.75, min_samples=1) == 0.8
+        assert select_threshold(confidences, correct, 0.75, min_samples=5) is None
+
+    def test_apply_is_vectorized_in_place(self):
+        calibrator = ConfidenceCalibrator(
+            {head: IsotonicCurve([0.5, 1.0], [0.0, 0.5]) for head in ["category", "priority", "overall"]},
+            dict(DEFAULT_CONFIDENCE_THRESHOLDS)
+        )
+        prediction = pd.DataFrame({
+            'category': ["Hardware", "Network"], 'priority': ["Low", "High"],
+            'category_confidence': [1.0, 0.75], 'priority_confidence': [0.5, 0.2], 'overall_confidence': [0.75, 1.0]
+        })
+        calibrator.apply(prediction)
+        assert prediction['category_confidence'].tolist() == [0.5, 0.25]
+        assert prediction['priority_confidence'].tolist() == [0.0, 0.0]
+        assert prediction['overall_confidence'].tolist() == [0.25, 0.5]
+
+    def test_save_load_and_attach(self, tmp_path, make_classifier):
+        prediction, category, priority = overconfident_heldout()
+        calibrator = ConfidenceCalibrator.fit(prediction, category, priority)
+        path = str(tmp_path / "calibration.json")
+        calibrator.save(path)
+
+        classifier = make_classifier(prediction=("Hardware", "Medium", 0.95, 0.9, 0.95))
+        loaded = attach_calibrator(classifier, path)
+        assert loaded.thresholds == calibrator.thresholds
+        assert get_confidence_thresholds() == calibrator.thresholds
+
+        result = predict_frame(classifier, [{"title": "x"}])
+        expected = calibrator.curves["overall"](np.array([0.95]))[0]
+        assert result.loc[0, 'overall_confidence'] == pytest.approx(expected, abs=1e-6)
+
+    def test_refuses_calibration_of_other_model(self, tmp_path, make_classifier):
+        model_path, other_model_path = tmp_path / "model.pkl", tmp_path / "retrained.pkl"
+        model_path.write_bytes(b"model v1")
+        other_model_path.write_bytes(b"model v2")
+        heldout_path = str(tmp_path / "validation.csv")
+        prediction, category, priority = overconfident_heldout()
+        pd.DataFrame({"title": ["x"] * len(category), "category": category, "priority": priority}).to_csv(heldout_path)
+
+        class HeldoutClassifier:
+            def predict(self, df):
+                return prediction.copy()
+
+        path = str(tmp_path / "calibration.json")
+        calibrator = calibrate(HeldoutClassifier(), heldout_path, path, model_path=str(model_path))
+        assert calibrator.info["model_fingerprint"] == model_fingerprint(str(model_path))
+
+        assert attach_calibrator(make_classifier(), path, model_path=str(model_path)) is not None
+        assert attach_calibrator(make_classifier(), path, model_path=str(other_model_path)) is None
+        assert get_confidence_thresholds() == DEFAULT_CONFIDENCE_THRESHOLDS
+
+        # Kalibrierung ohne Fingerprint (vor dieser Änderung gespeichert) passt zu keinem Modell
+        ConfidenceCalibrator.fit(prediction, category, priority).save(path)
+        assert attach_calibrator(make_classifier(), path, model_path=str(model_path)) is None
+
+    def test_routing_uses_configured_thresholds(self):
+        assert get_recommendation(0.85) == "review_recommended"
+        set_confidence_thresholds({"automatic_assignment": 0.8, "review_recommended": 0.6})
+        assert get_confidence_level(0.85) == "high"
+        assert get_recommendation(0.7) == "review_recommended"
+        set_confidence_thresholds(None)
+        assert get_confidence_thresholds() == DEFAULT_CONFIDENCE_THRESHOLDS
+
+    def test_refuses_test_split(self, tmp_path):
+        with pytest.raises(ValueError):
+            calibrate(object(), TEST_DATA_PATH, str(tmp_path / "calibration.json"))
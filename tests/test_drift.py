@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests für das Drift-Monitoring (Sketches, PSI/KL, Baseline)
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import sys
+import os
+import random
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.drift import (
+    CategoricalCounter, CountMinSketch, DriftMonitor, OTHER, TermSketch,
+    build_baseline, load_baseline, psi, save_baseline
+)
+
+WORDS = ["laptop", "printer", "vpn", "password", "excel", "outlook", "wifi", "monitor"]
+
+def make_tickets(n, seed=0, hours=range(8, 18), words=WORDS, role="end_user"):
+    rng = random.Random(seed)
+    return [
+        {
+            "title": f"{rng.choice(words)} problem",
+            "description": " ".join(rng.choice(words) for _ in range(6)),
+            "user_role": role,
+            "department": rng.choice(["IT", "Finance", "Sales"]),
+            "affected_system": rng.choice(["email", "network", "workstation"]),
+            "hour_submitted": rng.choice(list(hours)),
+            "is_weekend": 0,
+            "previous_tickets_30d": rng.randint(0, 4)
+        }
+        for _ in range(n)
+    ]
+
+class TestSketches:
+    """Tests für Count-Min, Top-K und kategoriale Zähler"""
+
+    def test_count_min_never_underestimates(self):
+        sketch = CountMinSketch(width=64, depth=4)
+        counts = {f"term{i}": i + 1 for i in range(200)}
+        for term, count in counts.items():
+            sketch.add(term, count)
+        assert all(sketch.estimate(term) >= count for term, count in counts.items())
+
+    def test_top_k_keeps_heavy_hitters_in_bounded_memory(self):
+        terms = TermSketch(capacity=5)
+        rng = random.Random(1)
+        for i in range(5000):
+            terms.add(rng.choice(["vpn", "printer", "laptop"]) if i % 2 else f"rare{i}")
+        assert len(terms.top) == 5
+        assert {"vpn", "printer", "laptop"} <= set(terms.top)
+
+    def test_categorical_counter_overflows_into_other(self):
+        counter = CategoricalCounter(max_categories=2)
+        for value in ["a", "b", "c", "a", "d"]:
+            counter.add(value)
+        assert counter.counts == {"a": 2, "b": 1, OTHER: 2}
+
+class TestDriftMonitor:
+    """Tests für PSI/KL gegen den Baseline-Snapshot"""
+
+    def test_psi_is_zero_for_identical_distributions(self):
+        assert psi([10, 20, 30], [1, 2, 3]) == 0.0
+
+    def test_stable_traffic(self):
+        monitor = DriftMonitor(build_baseline(make_tickets(3000)), min_samples=100)
+        monitor.observe(make_tickets(1000, seed=2))
+        report = monitor.report()
+        assert report["status"] == "stable"
+        assert set(report["features"]) >= {"hour_submitted", "user_role", "vocabulary", "text_length"}
+
+    def test_shifted_traffic_is_flagged(self):
+        monitor = DriftMonitor(build_baseline(make_tickets(3000)), min_samples=100)
+        monitor.observe(make_tickets(1000, seed=2, hours=range(0, 6), words=["teams", "sharepoint"], role="admin"))
+        report = monitor.report()
+        assert report["features"]["hour_submitted"]["status"] == "significant"
+        assert report["features"]["user_role"]["status"] == "significant"
+        assert report["features"]["vocabulary"]["status"] == "significant"
+        assert report["features"]["department"]["status"] == "stable"
+        assert report["features"]["hour_submitted"]["kl"] > 0
+        assert {"teams", "sharepoint"} <= {entry["term"] for entry in report["emerging_terms"]}
+
+    def test_windows_rotate(self):
+        monitor = DriftMonitor(build_baseline(make_tickets(500)), window_size=100, min_samples=50)
+        monitor.observe(make_tickets(1000, seed=3))
+        report = monitor.report()
+        assert report["observed_total"] == 1000
+        assert report["window_samples"] <= 200
+
+    def test_without_baseline_and_insufficient_data(self):
+        assert DriftMonitor().report()["status"] == "no_baseline"
+        monitor = DriftMonitor(build_baseline(make_tickets(100)))
+        monitor.observe(make_tickets(10))
+        assert monitor.report()["status"] == "insufficient_data"
+
+    def test_baseline_round_trip(self, tmp_path):
+        path = str(tmp_path / "drift_baseline.json")
+        baseline = build_baseline(make_tickets(200))
+        save_baseline(baseline, path)
+        assert load_baseline(path) == baseline
+        assert load_baseline(str(tmp_path / "missing.json")) is None
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests für den persistenten Feature-Cache
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import sys
+import os
+import time
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+import preprocessing.feature_cache as feature_cache
+from preprocessing.feature_cache import FeatureCache, cached_create_features, preprocessing_fingerprint
+
+def write_csv(path, titles):
+    df = pd.DataFrame({'title': titles, 'hour_submitted': [3, 12][:len(titles)] + [9] * (len(titles) - 2)})
+    df.to_csv(path, index=False)
+    return pd.read_csv(path)
+
+class TestFeatureCache:
+    """Tests für Treffer, Invalidierung und Eviction"""
+
+    def test_hit_skips_preprocessing(self, tmp_path, make_classifier):
+        data_path = str(tmp_path / "train.csv")
+        df = write_csv(data_path, ["PC broken", "Printer jam"])
+        cache = FeatureCache(str(tmp_path / "cache"))
+        classifier = make_classifier()
+
+        first = cached_create_features(classifier, df, data_path, cache)
+        second = cached_create_features(classifier, df, data_path, cache)
+
+        assert classifier.feature_calls == 1
+        assert cache.hits == 1
+        pd.testing.assert_frame_equal(first, second, check_dtype=False)
+        assert second['is_offhours'].tolist() == [1, 0]
+
+    def test_key_depends_on_data_and_config(self, tmp_path, make_classifier):
+        data_path = str(tmp_path / "train.csv")
+        df = write_csv(data_path, ["PC broken", "Printer jam"])
+        cache = FeatureCache(str(tmp_path / "cache"))
+
+        cached_create_features(make_classifier(), df, data_path, cache)
+        cached_create_features(make_classifier(stopwords=("please", "help", "urgent")), df, data_path, cache)
+        cached_create_features(make_classifier(mappings={"pc": "laptop"}), df, data_path, cache)
+        df = write_csv(data_path, ["PC broken", "VPN down"])
+        cached_create_features(make_classifier(), df, data_path, cache)
+
+        assert cache.hits == 0
+        assert cache.stats()["entries"] == 4
+
+    def test_fingerprint_ignores_fitted_encoders(self, make_classifier):
+        classifier = make_classifier()
+        before = preprocessing_fingerprint(classifier)
+        classifier.label_encoders['user_role'] = object()
+        assert preprocessing_fingerprint(classifier) == before
+
+    def test_fingerprint_covers_helper_modules_and_libraries(self, tmp_path, monkeypatch):
+        (tmp_path / "fc_text_helpers.py").write_text("def clean(text):\n    return text.lower()\n")
+        (tmp_path / "fc_classifier.py").write_text(
+            "from fc_text_helpers import clean\n\nclass Classifier:\n    pass\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        monkeypatch.setattr(feature_cache, "SRC_DIR", str(tmp_path))
+        from fc_classifier import Classifier
+
+        classifier = Classifier()
+        assert [os.path.basename(p) for p in feature_cache.source_files(classifier)] == [
+            "fc_classifier.py", "fc_text_helpers.py"
+        ]
+        before = preprocessing_fingerprint(classifier)
+
+        (tmp_path / "fc_text_helpers.py").write_text("def clean(text):\n    return text.casefold()\n")
+        changed_helper = preprocessing_fingerprint(classifier)
+        assert changed_helper != before
+
+        versions = dict(feature_cache.library_versions(), nltk="0.0")
+        monkeypatch.setattr(feature_cache, "library_versions", lambda: versions)
+        assert preprocessing_fingerprint(classifier) != changed_helper
+
+    def test_size_bounded_eviction(self, tmp_path):
+        cache = FeatureCache(str(tmp_path / "cache"))
+        frame = pd.DataFrame({'processed_text': ["x" * 1000] * 50})
+        for key in ["a", "b", "c"]:
+            cache.put(key, frame)
+            time.sleep(0.01)
+        size = cache.entries()[0]["bytes"]
+
+        cache.get("a")
+        cache.max_bytes = size * 2
+        cache.put("d", frame)
+        assert {e["key"] for e in cache.entries()} == {"a", "d"}
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Tests für die Ticket-Ingestion aus dem Spool-Verzeichnis
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import asyncio
+import json
+import sys
+import os
+import threading
+import time
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api.ingest import DONE, FAILED, INCOMING, OUTBOX, PROCESSING, SpoolIngestor, claim_name, parse_payload
+
+TICKET = {
+    "title": "Drucker druckt nicht",
+    "description": "Der Drucker im 2. Stock zeigt einen Papierstau",
+    "user_role": "end_user",
+    "department": "Finance",
+    "affected_system": "printer",
+    "hour_submitted": 9,
+    "is_weekend": 0,
+    "previous_tickets_30d": 1
+}
+
+EMAIL = b"""From: anna@example.com
+To: support@example.com
+Subject: VPN bricht ab
+Date: Sat, 07 Jun 2025 14:30:00 +0200
+Message-ID: <abc123@example.com>
+X-Ticket-Department: Sales
+X-Ticket-Affected-System: network
+Content-Type: text/plain; charset=utf-8
+
+Die VPN Verbindung bricht
+alle paar Minuten ab.
+"""
+
+def fake_classify(records):
+    """Ersetzt predict_payloads"""
+    return [{"prediction": {"category": "Hardware", "title": record["title"]}} for record in records]
+
+def validate(record):
+    """Ersetzt TicketInput: alle Pflichtfelder müssen vorhanden sein"""
+    missing = [field for field in TICKET if field not in record]
+    if missing:
+        raise ValueError(f"fehlende Felder {missing}")
+    return {field: record[field] for field in TICKET}
+
+def drop(spool, name, content):
+    """Schreibt eine Datei wie ein Produzent: temporärer Name, danach Rename"""
+    path = os.path.join(spool, INCOMING, name)
+    with open(path + ".tmp", "wb") as f:
+        f.write(content if isinstance(content, bytes) else json.dumps(content).encode("utf-8"))
+    os.replace(path + ".tmp", path)
+
+def listing(spool, directory):
+    """Dateinamen eines Verzeichnisses ohne Claim-Präfix"""
+    return sorted(claim_name(name) for name in os.listdir(os.path.join(spool, directory)))
+
+def read_results(spool, name):
+    [output] = [entry for entry in os.listdir(os.path.join(spool, OUTBOX)) if claim_name(entry) == name + ".ndjson"]
+    with open(os.path.join(spool, OUTBOX, output), "rb") as f:
+        return [json.loads(line) for line in f.read().splitlines()]
+
+def make_ingestor(spool, classify_fn, **kwargs):
+    kwargs.setdefault("batch_timeout", 0.01)
+    return SpoolIngestor(spool, classify_fn, validate_fn=validate, poll_interval=0.01, **kwargs)
+
+def run(ingestor):
+    return asyncio.run(ingestor.run(drain=True))
+
+@pytest.fixture
+def spool(tmp_path):
+    return str(tmp_path / "spool")
+
+class TestParsePayload:
+    """Tests für die unterstützten Formate"""
+
+    def test_email(self, tmp_path):
+        path = tmp_path / "mail.eml"
+        path.write_bytes(EMAIL)
+        [entry] = parse_payload(str(path))
+        ticket = entry["ticket"]
+        assert entry["ticket_id"] == "<abc123@example.com>"
+        assert ticket["title"] == "VPN bricht ab"
+        assert ticket["description"] == "Die VPN Verbindung bricht alle paar Minuten ab."
+        assert ticket["department"] == "Sales" and ticket["user_role"] == "end_user"
+        assert ticket["hour_submitted"] == 14 and ticket["is_weekend"] == 1
+
+    def test_webhook_envelope_and_ndjson(self, tmp_path):
+        webhook = tmp_path / "hook.json"
+        webhook.write_text(json.dumps({"tickets": [TICKET, "kein Ticket"]}))
+        entries = parse_payload(str(webhook))
+        assert entries[0]["ticket"]["title"] == TICKET["title"]
+        assert "error" in entries[1]
+
+        lines = tmp_path / "tickets.ndjson"
+        lines.write_text(json.dumps(TICKET) + "\n\n{ kaputt\n")
+        entries = parse_payload(str(lines))
+        assert [entry["line"] for entry in entries] == [1, 3]
+        assert "error" in entries[1]
+
+    def test_email_without_known_context_classifies(self, tmp_path, make_classifier):
+        import pandas as pd
+        from api.inference import predict_payloads
+        from api.schemas import AFFECTED_SYSTEMS, DEPARTMENTS, TicketInput, USER_ROLES
+
+        path = tmp_path / "mail.eml"
+        path.write_bytes(EMAIL.replace(b"X-Ticket-Department: Sales\n", b"")
+                         .replace(b"X-Ticket-Affected-System: network", b"X-Ticket-Affected-System: vpn"))
+        [entry] = parse_payload(str(path), lambda record: TicketInput(**record).dict())
+        ticket = entry["ticket"]
+        assert ticket["department"] == "IT" and ticket["affected_system"] == "workstation"
+
+        classifier = make_classifier(prediction=("Network", "High", 0.9, 0.9, 0.9))
+        classifier.setup_encoders(pd.DataFrame({
+            "user_role": USER_ROLES[:1] * len(AFFECTED_SYSTEMS), "department": (DEPARTMENTS * 2)[:len(AFFECTED_SYSTEMS)],
+            "affected_system": AFFECTED_SYSTEMS
+        }))
+        for column, encoder in classifier.label_encoders.items():
+            encoder.transform([ticket[column]])
+        [payload] = predict_payloads(classifier, [ticket])
+        assert payload["prediction"]["category"] == "Network"
+
+    def test_unreadable_json(self, tmp_path):
+        path = tmp_path / "broken.json"
+        path.write_text("{ kaputt")
+        with pytest.raises(ValueError):
+            parse_payload(str(path))
+
+class TestSpoolIngestor:
+    """Tests für die Pipeline"""
+
+    def test_processes_files(self, spool):
+        ingestor = make_ingestor(spool, fake_classify, batch_size=4, workers=2)
+        drop(spool, "mail.eml", EMAIL)
+        drop(spool, "hook.json", {"tickets": [dict(TICKET, ticket_id="T-1"), {"title": "ohne Rest"}]})
+        drop(spool, "bulk.ndjson", b"\n".join(json.dumps(dict(TICKET, title=f"T{i}")).encode() for i in range(10)))
+        drop(spool, "ignored.json.tmp", b"{}")
+
+        stats = run(ingestor)
+        assert stats["files_completed"] == 3
+        assert stats["tickets"] == 12 and stats["tickets_invalid"] == 1
+        assert stats["batches"] >= 3
+        assert listing(spool, DONE) == ["bulk.ndjson", "hook.json", "mail.eml"]
+        assert os.listdir(os.path.join(spool, INCOMING)) == ["ignored.json.tmp"]
+        assert os.listdir(os.path.join(spool, PROCESSING)) == []
+
+        results = read_results(spool, "hook.json")
+        assert results[0]["ticket_id"] == "T-1"
+        assert results[0]["prediction"]["category"] == "Hardware"
+        assert results[1]["line"] == 2 and results[1]["error"].startswith("Ungültiges Ticket")
+        assert [row["prediction"]["title"] for row in read_results(spool, "bulk.ndjson")] == [f"T{i}" for i in range(10)]
+        assert json.load(open(os.path.join(spool, "metrics.json")))["files_completed"] == 3
+
+    def test_recovers_claimed_files(self, spool):
+        ingestor = make_ingestor(spool, fake_classify)
+        with open(os.path.join(spool, PROCESSING, "crashed.json"), "w") as f:
+            json.dump(TICKET, f)
+
+        stats = run(ingestor)
+        assert stats["files_recovered"] == 1
+        assert stats["files_completed"] == 1
+        assert read_results(spool, "crashed.json")[0]["prediction"]["category"] == "Hardware"
+
+    def test_recovery_does_not_clobber_newer_file(self, spool):
+        ingestor = make_ingestor(spool, fake_classify)
+        with open(os.path.join(spool, PROCESSING, "1749382200000000000-42-a.json"), "w") as f:
+            json.dump(dict(TICKET, title="alt"), f)
+        drop(spool, "a.json", dict(TICKET, title="neu"))
+
+        stats = run(ingestor)
+        assert stats["files_recovered"] == 1 and stats["files_completed"] == 2
+        titles = []
+        for name in os.listdir(os.path.join(spool, OUTBOX)):
+            with open(os.path.join(spool, OUTBOX, name), "rb") as f:
+                titles.append(json.loads(f.read())["prediction"]["title"])
+        assert sorted(titles) == ["alt", "neu"]
+
+    def test_same_name_keeps_separate_results(self, spool):
+        for title in ("erste", "zweite"):
+            ingestor = make_ingestor(spool, fake_classify)
+            drop(spool, "a.json", dict(TICKET, title=title))
+            run(ingestor)
+        assert listing(spool, DONE) == ["a.json", "a.json"]
+        assert len(os.listdir(os.path.join(spool, OUTBOX))) == 2
+
+    def test_retries_then_fails(self, spool):
+        calls = []
+
+        def flaky(records):
+            calls.append(len(records))
+            if len(calls) == 1:
+                raise RuntimeError("Modell nicht bereit")
+            return fake_classify(records)
+
+        ingestor = make_ingestor(spool, flaky, retry_backoff=0)
+        drop(spool, "a.json", TICKET)
+        stats = run(ingestor)
+        assert stats["files_retried"] == 1 and stats["files_completed"] == 1
+
+        def broken(records):
+            raise RuntimeError("Modell defekt")
+
+        ingestor = make_ingestor(spool, broken, retry_backoff=0, max_attempts=2)
+        drop(spool, "b.json", TICKET)
+        drop(spool, "c.json", b"{ kaputt")
+        stats = run(ingestor)
+        assert stats["files_failed"] == 2
+        assert listing(spool, FAILED) == [
+            "b.json", "b.json.error.txt", "c.json", "c.json.error.txt"
+        ]
+
+    def test_failing_file_does_not_fail_batch(self, spool):
+        def picky(records):
+            if any(record["title"] == "kaputt" for record in records):
+                raise RuntimeError("Modell verweigert Ticket")
+            return fake_classify(records)
+
+        ingestor = make_ingestor(spool, picky, batch_size=10, batch_timeout=0.5, retry_backoff=0, max_attempts=2)
+        drop(spool, "a.json", TICKET)
+        drop(spool, "b.json", dict(TICKET, title="kaputt"))
+        stats = run(ingestor)
+        assert stats["files_completed"] == 1 and stats["files_failed"] == 1
+        assert listing(spool, DONE) == ["a.json"]
+        assert listing(spool, FAILED) == ["b.json", "b.json.error.txt"]
+
+    def test_result_count_mismatch_is_retried(self, spool):
+        def short(records):
+            return fake_classify(records)[:-1]
+
+        ingestor = make_ingestor(spool, short, retry_backoff=0, max_attempts=2)
+        drop(spool, "a.json", TICKET)
+        stats = run(ingestor)
+        assert stats["files_retried"] == 1 and stats["files_failed"] == 1
+        [error] = [name for name in os.listdir(os.path.join(spool, FAILED)) if name.endswith(".error.txt")]
+        with open(os.path.join(spool, FAILED, error), encoding="utf-8") as f:
+            assert "0 Ergebnisse für 1 Tickets" in f.read()
+
+    def test_bounded_in_flight(self, spool):
+        lock = threading.Lock()
+        active = {"now": 0, "max": 0}
+        ingestor = None
+
+        def slow(records):
+            with lock:
+                active["now"] += 1
+                active["max"] = max(active["max"], active["now"])
+            assert ingestor._in_flight <= 3
+            time.sleep(0.01)
+            with lock:
+                active["now"] -= 1
+            return fake_classify(records)
+
+        ingestor = make_ingestor(spool, slow, batch_size=2, workers=2, max_in_flight=3)
+        for i in range(12):
+            drop(spool, f"t{i:02d}.json", TICKET)
+
+        stats = run(ingestor)
+        assert stats["files_completed"] == 12
+        assert active["max"] <= 2
+        assert stats["in_flight_files"] == 0
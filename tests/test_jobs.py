@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests für asynchrone Klassifikations-Jobs
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import json
+import sys
+import os
+import time
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pytest.importorskip("fastapi")
+
+from api.jobs import COMPLETED, FAILED, FINISHED, PARTIAL, QUEUED, JobManager, JobStore
+
+def fake_predict(records):
+    """Ersetzt classifier.predict + Serialisierung"""
+    return [{"prediction": {"category": "Hardware", "title": record["title"]}} for record in records]
+
+def wait_for(store, job_id, timeout=5.0):
+    """Wartet bis ein Job abgeschlossen oder fehlgeschlagen ist"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = store.get_job(job_id)
+        if job["status"] in FINISHED:
+            return job
+        time.sleep(0.01)
+    raise TimeoutError(job_id)
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    yield store
+    store.close()
+
+class TestJobs:
+    """Test Suite für api.jobs"""
+    
+    def test_ticket_job_roundtrip(self, store, tmp_path):
+        """Test Job mit Ticket-Liste läuft durch und Ergebnisse sind paginiert abrufbar"""
+        manager = JobManager(store, fake_predict, chunk_size=2, data_dir=str(tmp_path))
+        records = [{"title": f"ticket {i}"} for i in range(5)]
+        
+        job = wait_for(store, manager.submit(records=records))
+        manager.shutdown()
+        
+        assert job["status"] == COMPLETED
+        assert job["processed"] == 5
+        page = [json.loads(r) for r in store.get_results(job["id"], offset=3, limit=10)]
+        assert [r["prediction"]["title"] for r in page] == ["ticket 3", "ticket 4"]
+    
+    def test_failing_predict_marks_tickets(self, store, tmp_path):
+        """Test Klassifikationsfehler werden pro Ticket gespeichert und der Job als failed markiert"""
+        def broken_predict(records):
+            raise RuntimeError("boom")
+        
+        manager = JobManager(store, broken_predict, data_dir=str(tmp_path))
+        job = wait_for(store, manager.submit(records=[{"title": "x"}]))
+        manager.shutdown()
+        
+        assert job["status"] == FAILED
+        assert job["failed"] == 1 and job["processed"] == 1
+        assert "boom" in json.loads(store.get_results(job["id"], 0, 1)[0])["error"]
+    
+    def test_partially_failed_job(self, store, tmp_path):
+        """Test ein fehlgeschlagener Chunk macht den Job partial, die Eingaben bleiben unverändert"""
+        seen = []
+        def flaky_predict(records):
+            seen.append(records)
+            if records[0]["title"] == "t2":
+                raise RuntimeError("boom")
+            return fake_predict(records)
+        
+        manager = JobManager(store, flaky_predict, chunk_size=2, data_dir=str(tmp_path))
+        records = [{"title": f"t{i}", "ticket_id": f"T-{i}"} for i in range(4)]
+        job = wait_for(store, manager.submit(records=records))
+        manager.shutdown()
+        
+        assert job["status"] == PARTIAL
+        assert job["failed"] == 2 and job["processed"] == 4
+        assert "2 von 4" in job["error"]
+        assert all("ticket_id" not in record for chunk in seen for record in chunk)
+        assert records[0]["ticket_id"] == "T-0"
+        assert json.loads(store.get_results(job["id"], 1, 1)[0])["ticket_id"] == "T-1"
+    
+    def test_resume_after_restart(self, store, tmp_path):
+        """Test nicht abgeschlossene Jobs werden ab dem letzten Chunk fortgesetzt"""
+        job_id = store.create_job("tickets", records=[{"title": f"t{i}"} for i in range(4)], total=4)
+        store.save_results(job_id, 0, [b'{"done": true}', b'{"done": true}'], failed=0)
+        
+        calls = []
+        def counting_predict(records):
+            calls.append(len(records))
+            return fake_predict(records)
+        
+        manager = JobManager(store, counting_predict, data_dir=str(tmp_path))
+        manager.start()
+        job = wait_for(store, job_id)
+        manager.shutdown()
+        
+        assert calls == [2]
+        assert job["processed"] == 4
+        assert json.loads(store.get_results(job_id, 3, 1)[0])["prediction"]["title"] == "t3"
+    
+    def test_file_path_must_stay_in_data_dir(self, store, tmp_path):
+        """Test Dateien ausserhalb des Daten-Verzeichnisses werden abgelehnt"""
+        manager = JobManager(store, fake_predict, data_dir=str(tmp_path / "data"))
+        with pytest.raises(ValueError):
+            manager.submit(file_path="../jobs.sqlite3")
+        manager.shutdown()
+    
+    def test_queue_limit(self, store, tmp_path):
+        """Test volle Warteschlange wird abgelehnt"""
+        store.create_job("tickets", records=[{"title": "x"}], total=1)
+        manager = JobManager(store, fake_predict, max_queued_jobs=1, data_dir=str(tmp_path))
+        with pytest.raises(RuntimeError):
+            manager.submit(records=[{"title": "y"}])
+        manager.shutdown()
+        assert store.count_jobs((QUEUED,)) == 1
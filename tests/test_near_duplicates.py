@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests für die Near-Duplicate Erkennung (MinHash + LSH)
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import sys
+import os
+import time
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pd = pytest.importorskip("pandas")
+
+from api.inference import predict_payloads
+from preprocessing.near_duplicates import MinHasher, NearDuplicateIndex, duplicate_scope
+
+EMAIL_DOWN = "email server down cannot send receive mail outlook error since this morning whole team affected"
+EMAIL_DOWN_VARIANT = "email server down cannot send receive mail outlook error since this morning whole office affected"
+PRINTER = "printer third floor paper jam print queue stuck cannot print invoices"
+
+PREDICTION = ("Email", "High", 0.9, 0.8, 0.85)
+
+def make_ticket(text, system="email", **overrides):
+    return {**{
+        "title": text[:30],
+        "description": text,
+        "user_role": "end_user",
+        "department": "IT",
+        "affected_system": system,
+        "hour_submitted": 9,
+        "is_weekend": 0,
+        "previous_tickets_30d": 0
+    }, **overrides}
+
+class TestMinHasher:
+    """Tests für die MinHash-Signaturen"""
+
+    def test_similarity_estimate(self):
+        hasher = MinHasher(num_perm=256)
+        a, b, c = (hasher.signature(t) for t in (EMAIL_DOWN, EMAIL_DOWN_VARIANT, PRINTER))
+        assert (a == b).mean() > 0.6
+        assert (a == c).mean() < 0.1
+
+    def test_empty_text(self):
+        assert MinHasher().signature("") is None
+
+class TestNearDuplicateIndex:
+    """Tests für Clustering, Scopes und Zeitfenster"""
+
+    def test_near_duplicates_share_cluster(self):
+        index = NearDuplicateIndex(threshold=0.5)
+        cluster, _, is_new = index.assign(index.signature(EMAIL_DOWN), PREDICTION, scope="email")
+        assert is_new
+
+        match = index.query(index.signature(EMAIL_DOWN_VARIANT), scope="email")
+        assert match is not None
+        assert match[0].cluster_id == cluster.cluster_id
+        assert match[0].prediction == PREDICTION
+        assert match[0].size == 2
+
+    def test_different_tickets_not_clustered(self):
+        index = NearDuplicateIndex(threshold=0.5)
+        index.assign(index.signature(EMAIL_DOWN), PREDICTION, scope="email")
+        assert index.query(index.signature(PRINTER), scope="email") is None
+
+    def test_scope_separation(self):
+        index = NearDuplicateIndex()
+        index.assign(index.signature(EMAIL_DOWN), PREDICTION, scope="email")
+        assert index.query(index.signature(EMAIL_DOWN), scope="workstation") is None
+
+    def test_window_expiry(self):
+        index = NearDuplicateIndex(window_seconds=0.05)
+        index.assign(index.signature(EMAIL_DOWN), PREDICTION, scope="email")
+        time.sleep(0.1)
+        assert index.query(index.signature(EMAIL_DOWN), scope="email") is None
+        assert index.stats()["active_clusters"] == 0
+
+    def test_max_clusters(self):
+        index = NearDuplicateIndex(max_clusters=2)
+        for i in range(5):
+            index.assign(index.signature(f"ticket number {i} unique text {i * 7}"), PREDICTION)
+        assert index.stats()["active_clusters"] == 2
+
+class TestPredictWithDuplicates:
+    """Tests für die Wiederverwendung von Cluster-Vorhersagen"""
+
+    def test_duplicates_skip_model(self, make_classifier):
+        classifier = make_classifier(prediction=PREDICTION)
+        index = NearDuplicateIndex(threshold=0.5)
+
+        first = predict_payloads(classifier, [make_ticket(EMAIL_DOWN)], index)
+        storm = predict_payloads(classifier, [make_ticket(EMAIL_DOWN)] * 20 + [make_ticket(PRINTER)], index)
+
+        assert classifier.rows == 2
+        assert first[0]["cluster"]["is_duplicate"] is False
+        assert all(p["cluster"]["is_duplicate"] for p in storm[:20])
+        assert {p["cluster"]["cluster_id"] for p in storm[:20]} == {first[0]["cluster"]["cluster_id"]}
+        assert storm[0]["prediction"]["category"] == "Email"
+        assert storm[20]["cluster"]["cluster_id"] != first[0]["cluster"]["cluster_id"]
+
+        clusters = index.clusters()
+        assert clusters[0]["size"] == 21
+
+    def test_priority_inputs_separate_clusters(self, make_classifier):
+        """Gleicher Text, aber andere Rolle oder Einreichungszeit: Modell entscheidet neu"""
+        classifier = make_classifier(prediction=PREDICTION)
+        index = NearDuplicateIndex(threshold=0.5)
+        tickets = [
+            make_ticket(EMAIL_DOWN),
+            make_ticket(EMAIL_DOWN, user_role="admin"),
+            make_ticket(EMAIL_DOWN, hour_submitted=23),
+            make_ticket(EMAIL_DOWN, is_weekend=1),
+            make_ticket(EMAIL_DOWN, hour_submitted=15)
+        ]
+
+        payloads = [predict_payloads(classifier, [ticket], index)[0] for ticket in tickets]
+
+        assert classifier.rows == 3
+        assert [p["cluster"]["is_duplicate"] for p in payloads] == [False, False, False, True, True]
+        assert duplicate_scope(tickets[2]) == duplicate_scope(tickets[3]) == "email|end_user|offhours"
+        assert duplicate_scope(tickets[4]) == "email|end_user|office"
+
+    def test_without_index(self, make_classifier):
+        payloads = predict_payloads(make_classifier(prediction=PREDICTION), [make_ticket(EMAIL_DOWN)])
+        assert "cluster" not in payloads[0]
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Tests für Feedback-Store und inkrementelles Online-Learning
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import sys
+import os
+import json
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+
+from api.feedback import FeedbackStore
+from models.online_learning import CompanionModel, OnlineLearner
+from utils.routing import get_confidence_thresholds
+
+TEXTS = [
+    "outlook mail not syncing exchange",
+    "vpn connection drops home office",
+    "printer paper jam third floor",
+    "suspicious login attempts unknown ip",
+]
+
+# Wahre Labels der Texte (Replay-Stichprobe aus den Trainingsdaten)
+LABELS = [("Software", "Medium"), ("Network", "High"), ("Hardware", "Medium"), ("Security", "Critical")]
+
+def ticket(text):
+    return {"title": text.split()[0], "description": text}
+
+def replay_sample(n=50):
+    rows = [dict(ticket(text), category=category, priority=priority)
+            for text, (category, priority) in zip(TEXTS, LABELS)]
+    return pd.DataFrame(rows * n)
+
+@pytest.fixture
+def store():
+    store = FeedbackStore(":memory:")
+    yield store
+    store.close()
+
+class TestFeedbackStore:
+    """Tests für den Feedback-Store"""
+
+    def test_add_and_pending(self, store):
+        first = store.add(ticket(TEXTS[3]), "Security", "High", predicted_category="Software")
+        store.add(ticket(TEXTS[0]), "Software", "Medium", predicted_category="Software")
+
+        pending = store.pending(10)
+        assert [item["id"] for item in pending] == [first, first + 1]
+        assert pending[0]["ticket"]["description"] == TEXTS[3]
+        assert store.counts() == {"total": 2, "pending": 2, "holdout": 0, "category_corrections": 1}
+
+        store.mark_trained([first], 1)
+        assert store.counts()["pending"] == 1
+
+class TestOnlineLearner:
+    """Tests für Companion-Modell, Versionierung und Korrekturen"""
+
+    def test_incremental_versions(self, store, tmp_path, make_classifier):
+        classifier = make_classifier(TEXTS)
+        learner = OnlineLearner(store, lambda: classifier, model_dir=str(tmp_path), batch_size=4, keep_versions=2,
+                                holdout_fraction=0.0)
+
+        for _ in range(3):
+            for text in TEXTS:
+                store.add(ticket(text), "Security", "High")
+        assert learner.run_once() == 12
+        assert learner.model.version == 3
+        assert learner.model.samples_seen == 12
+        assert store.counts()["pending"] == 0
+
+        with open(tmp_path / "latest.json", encoding="utf-8") as f:
+            assert json.load(f)["version"] == 3
+        assert len([f for f in os.listdir(tmp_path) if f.startswith("companion_v")]) == 2
+
+        reloaded = OnlineLearner(store, lambda: classifier, model_dir=str(tmp_path))
+        assert reloaded.load_latest().version == 3
+
+    def test_replay_is_mixed_in(self, store, tmp_path, make_classifier):
+        classifier = make_classifier(TEXTS)
+        replay = pd.DataFrame({
+            'title': ['vpn'] * 8, 'description': [TEXTS[1]] * 8,
+            'category': ['Network'] * 8, 'priority': ['High'] * 8
+        })
+        learner = OnlineLearner(store, lambda: classifier, model_dir=str(tmp_path), replay=replay, holdout_fraction=0.0)
+        store.add(ticket(TEXTS[3]), "Security", "Critical")
+        store.add(ticket(TEXTS[2]), "Hardware", "Medium")
+
+        assert learner.run_once() == 2
+        assert learner.model.samples_seen == 4
+        assert learner.model.feedback_seen == 2
+
+    def test_companion_overrides_after_feedback(self, store, tmp_path, make_classifier):
+        classifier = make_classifier(TEXTS)
+        learner = OnlineLearner(store, lambda: classifier, model_dir=str(tmp_path), batch_size=64, replay=replay_sample())
+        for _ in range(150):
+            store.add(ticket(TEXTS[3]), "Security", "Critical")
+            store.add(ticket(TEXTS[2]), "Hardware", "Medium")
+        assert learner.run_once() == 240
+        assert learner.model.is_active
+        assert store.counts()["holdout"] == 60
+        assert learner.stats()["holdout"]["rows"] == 60
+        assert learner.stats()["holdout"]["passed"]
+
+        records = [ticket(TEXTS[3]), ticket(TEXTS[2])]
+        prediction = learner.model.apply(classifier, records, classifier.predict(pd.DataFrame(records)))
+        assert prediction['category'].tolist() == ["Security", "Hardware"]
+        assert prediction.loc[0, 'priority'] == "Critical"
+        # Overrides sind nie automatisch zuweisbar
+        assert prediction.loc[0, 'overall_confidence'] == get_confidence_thresholds()["review_recommended"]
+
+    def test_few_corrections_do_not_override(self, store, tmp_path, make_classifier):
+        classifier = make_classifier(TEXTS)
+        learner = OnlineLearner(store, lambda: classifier, model_dir=str(tmp_path), replay=replay_sample())
+        for _ in range(10):
+            store.add(ticket(TEXTS[3]), "Security", "Critical")
+        learner.run_once()
+        assert not learner.model.is_active
+
+    def test_newer_feedback_fails_holdout(self, store, tmp_path, make_classifier):
+        """Der Holdout sind die neuesten Korrekturen: widersprechen sie den älteren, bleibt der Companion aus"""
+        classifier = make_classifier(TEXTS)
+        learner = OnlineLearner(store, lambda: classifier, model_dir=str(tmp_path), batch_size=300,
+                                replay=replay_sample(), replay_ratio=0.1)
+        for _ in range(250):
+            store.add(ticket(TEXTS[0]), "Security", "Critical")
+        for _ in range(50):
+            store.add(ticket(TEXTS[0]), "Software", "Medium")
+        learner.run_once()
+        assert learner.model.feedback_seen == 240
+        assert not learner.model.is_active
+        assert not learner.stats()["holdout"]["passed"]
+
+    def test_no_holdout_keeps_companion_inactive(self, store, tmp_path, make_classifier):
+        classifier = make_classifier(TEXTS)
+        learner = OnlineLearner(store, lambda: classifier, model_dir=str(tmp_path), batch_size=64,
+                                holdout_fraction=0.0)
+        for _ in range(100):
+            store.add(ticket(TEXTS[3]), "Security", "Critical")
+            store.add(ticket(TEXTS[2]), "Hardware", "Medium")
+        learner.run_once()
+        assert not learner.model.is_active
+
+    def test_confident_base_prediction_is_kept(self, store, tmp_path, make_classifier):
+        classifier = make_classifier(TEXTS, prediction=("Software", "Medium", 0.95, 0.95, 0.95))
+        learner = OnlineLearner(store, lambda: classifier, model_dir=str(tmp_path), batch_size=64, replay=replay_sample())
+        for _ in range(300):
+            store.add(ticket(TEXTS[3]), "Security", "Critical")
+        learner.run_once()
+        assert learner.model.is_active
+
+        records = [ticket(TEXTS[3])]
+        prediction = learner.model.apply(classifier, records, classifier.predict(pd.DataFrame(records)))
+        assert prediction.loc[0, 'category'] == "Software"
+
+    def test_other_vectorizer_disables_companion(self, store, tmp_path, make_classifier):
+        classifier = make_classifier(TEXTS)
+        learner = OnlineLearner(store, lambda: classifier, model_dir=str(tmp_path), batch_size=64, replay=replay_sample())
+        for _ in range(300):
+            store.add(ticket(TEXTS[3]), "Security", "Critical")
+        learner.run_once()
+        assert learner.model.is_active
+
+        # Neu trainiertes Basis-Modell mit gleicher Feature-Anzahl, aber anderem Vokabular
+        retrained = make_classifier([text.replace("vpn", "wifi") for text in TEXTS])
+        assert len(retrained.text_vectorizer.vocabulary_) == len(classifier.text_vectorizer.vocabulary_)
+        records = [ticket(TEXTS[3])]
+        prediction = learner.model.apply(retrained, records, retrained.predict(pd.DataFrame(records)))
+        assert prediction.loc[0, 'category'] == "Software"
+        assert not learner.model.is_active
+
+        assert OnlineLearner(store, lambda: retrained, model_dir=str(tmp_path)).load_latest() is None
+        assert OnlineLearner(store, lambda: classifier, model_dir=str(tmp_path)).load_latest() is not None
+
+    def test_inactive_companion_keeps_prediction(self, make_classifier):
+        classifier = make_classifier(TEXTS)
+        companion = CompanionModel(min_feedback=5)
+        records = [ticket(TEXTS[3])]
+        prediction = companion.apply(classifier, records, classifier.predict(pd.DataFrame(records)))
+        assert prediction.loc[0, 'category'] == "Software"
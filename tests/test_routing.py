@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests für die Routing-Policy (indizierter Lookup, Batch-Auflösung, Hot Reload)
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import sys
+import os
+import json
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.routing import (
+    DEFAULT_TEAM, SLA_MAPPING, TEAM_MAPPING, PolicyLoader, RoutingPolicy
+)
+
+CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', 'config')
+
+RULES = [
+    {"id": "security_critical_review", "when": {"category": "Security", "priority": "Critical", "confidence_band": "high"},
+     "recommendation": "review_recommended"},
+    {"id": "erp_finance", "when": {"category": "Software", "department": "Finance", "affected_system": "erp"},
+     "suggested_team": "ERP Competence Center"},
+    {"id": "erp_any", "when": {"category": "Software", "affected_system": "erp"}, "suggested_team": "ERP Team"},
+    {"id": "crm", "when": {"department": ["Sales", "Marketing"], "affected_system": "crm"},
+     "suggested_team": "CRM Team", "sla_target": "8 hours"},
+    {"id": "finance_first", "when": {"department": "Finance"}, "sla_target": "2 hours"},
+    {"id": "printer_second", "when": {"affected_system": "printer"}, "sla_target": "48 hours"},
+]
+
+class TestRoutingPolicy:
+    """Tests für die kompilierte Policy"""
+
+    def test_base_layer_matches_mappings(self):
+        policy = RoutingPolicy()
+        for category, team in TEAM_MAPPING.items():
+            for priority, sla in SLA_MAPPING.items():
+                route = policy.resolve(category, priority, "IT", "email", "medium")
+                assert route.routing == {"suggested_team": team, "sla_target": sla}
+                assert route.recommendation == "review_recommended"
+        assert policy.resolve("Unknown", "Unknown").routing == {"suggested_team": DEFAULT_TEAM, "sla_target": "24 hours"}
+
+    def test_most_specific_rule_wins(self):
+        policy = RoutingPolicy(RULES)
+        assert policy.resolve("Software", "Low", "Finance", "erp", "high").routing["suggested_team"] == "ERP Competence Center"
+        assert policy.resolve("Software", "Low", "HR", "erp", "high").routing["suggested_team"] == "ERP Team"
+        assert policy.resolve("Software", "Low", "HR", "email", "high").routing["suggested_team"] == "Software Support Team"
+
+    def test_outputs_resolve_independently(self):
+        route = RoutingPolicy(RULES).resolve("Software", "Low", "Finance", "erp", "high")
+        assert route.routing == {"suggested_team": "ERP Competence Center", "sla_target": "2 hours"}
+        assert route.recommendation == "automatic_assignment"
+
+    def test_equal_specificity_prefers_earlier_rule(self):
+        route = RoutingPolicy(RULES).resolve("Hardware", "Low", "Finance", "printer", "low")
+        assert route.routing["sla_target"] == "2 hours"
+
+    def test_list_shorthand_and_confidence_band(self):
+        policy = RoutingPolicy(RULES)
+        assert policy.resolve("Software", "High", "Marketing", "crm", "high").routing["sla_target"] == "8 hours"
+        assert policy.resolve("Security", "Critical", "IT", "email", "high").recommendation == "review_recommended"
+        assert policy.resolve("Security", "High", "IT", "email", "high").recommendation == "automatic_assignment"
+
+    def test_routing_dicts_are_shared(self):
+        policy = RoutingPolicy(RULES)
+        first = policy.resolve("Network", "Low", "IT", "network", "low")
+        second = policy.resolve("Network", "Low", "HR", "email", "high")
+        assert first.routing is second.routing
+
+    def test_resolve_many(self):
+        policy = RoutingPolicy(RULES)
+        keys = [("Software", "Low", "Finance", "erp", "high"), ("Hardware", "High", "IT", "printer", "low")] * 50
+        routes = policy.resolve_many(keys)
+        assert len(routes) == 100
+        assert routes[0] == policy.resolve(*keys[0])
+        assert len(policy._cache) == 2
+
+    def test_invalid_rules(self):
+        with pytest.raises(ValueError):
+            RoutingPolicy([{"id": "x", "when": {"user_role": "admin"}, "suggested_team": "Admins"}])
+        with pytest.raises(ValueError):
+            RoutingPolicy([{"id": "x", "when": {"category": "Hardware"}}])
+        with pytest.raises(ValueError):
+            RoutingPolicy([{"id": "x", "when": {}, "recommendation": "escalate"}])
+        with pytest.raises(ValueError):
+            RoutingPolicy([{"id": "x", "when": ["category", "Hardware"], "suggested_team": "HW"}])
+        with pytest.raises(ValueError):
+            RoutingPolicy([{"id": "x", "when": {"confidence_band": "hihg"}, "recommendation": "review_recommended"}])
+        with pytest.raises(ValueError):
+            RoutingPolicy([{"id": "x", "when": {"confidence_band": ["high", "certain"]}, "sla_target": "1 hour"}])
+        assert RoutingPolicy([{"id": "x", "when": {"confidence_band": "*"}, "sla_target": "1 hour"}])
+
+class TestPolicyLoader:
+    """Tests für den Hot Reload"""
+
+    def test_hot_reload(self, tmp_path):
+        path = tmp_path / "routing_policy.json"
+        path.write_text(json.dumps({"version": "1", "rules": RULES}))
+        loader = PolicyLoader(str(path), check_interval=0)
+        assert loader.get().version == "1"
+
+        rules = RULES + [{"id": "vip", "when": {"department": "Legal"}, "suggested_team": "VIP Desk"}]
+        path.write_text(json.dumps({"version": "2", "rules": rules}))
+        os.utime(path, (os.path.getmtime(path) + 5,) * 2)
+        policy = loader.get()
+        assert policy.version == "2"
+        assert policy.resolve("Hardware", "Low", "Legal", "email", "low").routing["suggested_team"] == "VIP Desk"
+
+    def test_invalid_file_keeps_previous_policy(self, tmp_path):
+        path = tmp_path / "routing_policy.json"
+        path.write_text(json.dumps({"version": "1", "rules": RULES}))
+        loader = PolicyLoader(str(path), check_interval=0)
+        loader.get()
+
+        path.write_text("{ invalid")
+        os.utime(path, (os.path.getmtime(path) + 5,) * 2)
+        assert loader.get().version == "1"
+        assert loader.stats()["errors"] == 1
+
+    def test_missing_file_uses_base_layer(self, tmp_path):
+        loader = PolicyLoader(str(tmp_path / "missing.json"), check_interval=0)
+        assert loader.get().resolve("Network", "Critical").routing["sla_target"] == "1 hour"
+
+    def test_shipped_policy_matches_base_layer(self):
+        shipped = PolicyLoader(os.path.join(CONFIG_DIR, "routing_policy.json"), check_interval=0).get()
+        base = RoutingPolicy()
+        for category in TEAM_MAPPING:
+            for priority in SLA_MAPPING:
+                assert shipped.resolve(category, priority, "Finance", "erp", "high") == base.resolve(
+                    category, priority, "Finance", "erp", "high")
+        example = PolicyLoader(os.path.join(CONFIG_DIR, "routing_policy.example.json"), check_interval=0)
+        assert len(example.get().rules) > 0 and example.stats()["errors"] == 0
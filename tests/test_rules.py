@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Tests für die Regel-Stufe vor den ML-Modellen
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import sys
+import os
+import json
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.rules import SAVE_INTERVAL, RuleEngine, load_rule_engine
+
+CONFIG = {
+    "min_precision": 0.9,
+    "min_samples": 10,
+    "shadow_sample_rate": 0.0,
+    "rules": [
+        {"id": "phishing", "keywords": ["phishing", "suspicious email"], "category": "Security", "priority": "High"},
+        {
+            "id": "printer",
+            "keywords": ["printer"],
+            "exclude": ["network printer"],
+            "when": {"affected_system": ["printer"]},
+            "category": "Hardware",
+            "priority": "Medium",
+            "trusted": True
+        }
+    ]
+}
+
+def ticket(title, description="", system="workstation", hour=10):
+    return {"title": title, "description": description, "affected_system": system, "hour_submitted": hour}
+
+class TestRuleMatching:
+    """Tests für den Multi-Pattern Matcher"""
+
+    @pytest.fixture
+    def engine(self):
+        return RuleEngine.from_config(CONFIG, seed=1)
+
+    def test_keyword_match(self, engine):
+        assert engine.match(ticket("Got a PHISHING mail")).rule_id == "phishing"
+        assert engine.match(ticket("Suspicious\n email from bank")).rule_id == "phishing"
+        assert engine.match(ticket("Laptop black screen")) is None
+
+    def test_word_boundaries(self, engine):
+        assert engine.match(ticket("antiphishingtool update")) is None
+
+    def test_field_condition(self, engine):
+        assert engine.match(ticket("Printer offline", system="printer")).rule_id == "printer"
+        assert engine.match(ticket("Printer offline", system="workstation")) is None
+
+    def test_exclude(self, engine):
+        assert engine.match(ticket("Network printer not found", system="printer")) is None
+
+    def test_offhours_condition(self):
+        config = {"rules": [{"id": "jam", "keywords": ["paper jam"], "when": {"offhours": [False]},
+                             "category": "Hardware", "priority": "Medium"}]}
+        engine = RuleEngine.from_config(config)
+        assert engine.match(ticket("paper jam", hour=10)).rule_id == "jam"
+        assert engine.match(ticket("paper jam", hour=22)) is None
+        assert engine.match(dict(ticket("paper jam"), is_weekend=1)) is None
+
+    def test_invalid_conditions(self):
+        rule = {"id": "r", "keywords": ["x"], "category": "Hardware", "priority": "Low"}
+        with pytest.raises(ValueError):
+            RuleEngine.from_config({"rules": [dict(rule, when=["printer"])]})
+        with pytest.raises(ValueError):
+            RuleEngine.from_config({"rules": [dict(rule, when={"affected_system": "printer"})]})
+
+    def test_shipped_config(self):
+        engine = load_rule_engine(os.path.join(os.path.dirname(__file__), '..', 'config', 'classification_rules.json'))
+        assert engine is not None
+        assert engine.match(ticket("Suspicious phishing email received")).category == "Security"
+
+class TestRulePrecision:
+    """Tests für Shadow-Modus und Aktivierung über die gemessene Precision"""
+
+    def test_shadow_until_precise(self):
+        engine = RuleEngine.from_config(CONFIG, seed=1)
+        rule, early_exit = engine.route(ticket("phishing attempt"))
+        assert rule.rule_id == "phishing" and not early_exit
+
+        for _ in range(10):
+            engine.record_model(rule, "Security", "High")
+        assert engine.route(ticket("phishing attempt")) == (rule, True)
+
+    def test_priority_precision_required(self):
+        engine = RuleEngine.from_config(CONFIG, seed=1)
+        rule = engine.match(ticket("phishing attempt"))
+        for priority in ["High"] * 8 + ["Critical"] * 2:
+            engine.record_model(rule, "Security", priority)
+        assert rule.precision == 1.0 and not rule.active
+        assert not engine.route(ticket("phishing attempt"))[1]
+
+    def test_confidence_is_measured_agreement(self):
+        engine = RuleEngine.from_config(CONFIG, seed=1)
+        rule = engine.match(ticket("phishing attempt"))
+        assert rule.prediction[2:] == (0.95, 0.95, 0.95)
+        for priority in ["High"] * 19 + ["Medium"]:
+            engine.record_model(rule, "Security", priority)
+        assert rule.prediction == ("Security", "High", 1.0, 0.95, 0.95)
+
+    def test_deactivated_on_low_precision(self):
+        engine = RuleEngine.from_config(CONFIG, seed=1)
+        rule = engine.match(ticket("Printer jam", system="printer"))
+        assert engine.route(ticket("Printer jam", system="printer"))[1]
+
+        for category in ["Hardware"] * 5 + ["Network"] * 5:
+            engine.record_model(rule, category, "Medium")
+        assert not rule.active
+        assert not engine.route(ticket("Printer jam", system="printer"))[1]
+
+    def test_stats(self):
+        engine = RuleEngine.from_config(CONFIG, seed=1)
+        engine.route(ticket("phishing"))
+        engine.route(ticket("laptop"))
+        stats = engine.stats()
+        assert stats["evaluated"] == 2
+        assert stats["rules"][0]["hit_rate"] == 0.5
+        assert stats["rules"][0]["precision"] is None
+
+class TestRuleStatsPersistence:
+    """Tests für das Speichern der Shadow-Statistik über Neustarts"""
+
+    def test_stats_survive_restart(self, tmp_path):
+        stats_path = str(tmp_path / "rules" / "rule_stats.json")
+        engine = RuleEngine.from_config(CONFIG, seed=1, stats_path=stats_path)
+        rule = engine.match(ticket("phishing attempt"))
+        for _ in range(10):
+            engine.record_model(rule, "Security", "High")
+        engine.save_stats()
+
+        restarted = RuleEngine.from_config(CONFIG, seed=1, stats_path=stats_path)
+        assert restarted.load_stats() == 2
+        rule = restarted.match(ticket("phishing attempt"))
+        assert rule.compared == 10 and rule.active
+        assert restarted.route(ticket("phishing attempt")) == (rule, True)
+
+    def test_changed_rule_starts_fresh(self, tmp_path):
+        stats_path = str(tmp_path / "rule_stats.json")
+        engine = RuleEngine.from_config(CONFIG, seed=1, stats_path=stats_path)
+        for _ in range(10):
+            engine.record_model(engine.rules[0], "Security", "High")
+        engine.save_stats()
+
+        changed = dict(CONFIG, rules=[dict(CONFIG["rules"][0], priority="Critical"), CONFIG["rules"][1]])
+        restarted = RuleEngine.from_config(changed, stats_path=stats_path)
+        assert restarted.load_stats() == 1
+        assert restarted.rules[0].compared == 0 and not restarted.rules[0].active
+
+    def test_load_rule_engine_restores_stats(self, tmp_path):
+        rules_path = tmp_path / "rules.json"
+        rules_path.write_text(json.dumps(CONFIG))
+        stats_path = str(tmp_path / "rule_stats.json")
+        engine = load_rule_engine(str(rules_path), stats_path=stats_path)
+        for _ in range(SAVE_INTERVAL):
+            engine.record_model(engine.rules[0], "Security", "High")
+        assert os.path.exists(stats_path)
+
+        assert load_rule_engine(str(rules_path), stats_path=stats_path).rules[0].compared == SAVE_INTERVAL
+
+class TestPredictWithRules:
+    """Tests für den Early Exit im Inferenz-Pfad"""
+
+    def test_rules_skip_model(self, make_classifier):
+        pytest.importorskip("pandas")
+        from api.inference import predict_payloads
+
+        classifier = make_classifier(prediction=("Security", "High", 0.9, 0.9, 0.9))
+        engine = RuleEngine.from_config(CONFIG, seed=1)
+        records = [ticket("phishing attempt")] * 10 + [ticket("laptop broken")]
+        first = predict_payloads(classifier, records, rule_engine=engine)
+        assert classifier.rows == 11
+        assert "rule" not in first[0]
+
+        second = predict_payloads(classifier, records, rule_engine=engine)
+        assert classifier.rows == 12
+        assert second[0]["rule"] == "phishing"
+        assert second[0]["confidence_source"] == "rule"
+        assert second[0]["prediction"]["overall_confidence"] == 1.0
+        assert second[0]["prediction"]["category"] == "Security"
+        assert "rule" not in second[10]
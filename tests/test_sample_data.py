@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Tests für den Beispieldaten-Generator (disjunkte Splits)
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pd = pytest.importorskip("pandas")
+
+from data.generate_sample_data import DATASETS, generate_realistic_tickets
+
+SPLITS = ['data/raw/training_data.csv', 'data/raw/validation_data.csv', 'data/raw/test_data.csv']
+
+def test_splits_share_no_rows():
+    """Training, Validierung und Test teilen weder Ticket-IDs noch Zeilen"""
+    frames = {}
+    for path in SPLITS:
+        size, seed, start_id = DATASETS[path]
+        frames[path] = generate_realistic_tickets(size, seed=seed, start_id=start_id)
+
+    ids = [set(df['ticket_id']) for df in frames.values()]
+    assert sum(len(s) for s in ids) == len(set().union(*ids)) == sum(DATASETS[path][0] for path in SPLITS)
+
+    # Gleicher Inhalt ohne ID (mit gleichem Seed wäre jede Validierungszeile auch eine Trainingszeile)
+    columns = [c for c in frames[SPLITS[0]].columns if c != 'ticket_id']
+    rows = [set(df[columns].astype(str).itertuples(index=False, name=None)) for df in frames.values()]
+    assert not rows[0] & rows[1]
+    assert not rows[0] & rows[2]
+    assert not rows[1] & rows[2]
+
+def test_seed_is_reproducible():
+    first = generate_realistic_tickets(50, seed=7)
+    second = generate_realistic_tickets(50, seed=7)
+    columns = ['title', 'category', 'priority', 'user_role', 'hour_submitted']
+    pd.testing.assert_frame_equal(first[columns], second[columns])
+    assert not first[columns].equals(generate_realistic_tickets(50, seed=8)[columns])
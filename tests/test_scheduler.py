@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests für den Inferenz-Scheduler (Admission Control)
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import asyncio
+import sys
+import os
+import threading
+import time
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api.scheduler import BACKGROUND, BATCH, INTERACTIVE, InferenceScheduler, QueueOverloaded
+
+@pytest.fixture
+def scheduler():
+    scheduler = InferenceScheduler(workers=2)
+    yield scheduler
+    scheduler.shutdown()
+
+class TestScheduler:
+    """Test Suite für api.scheduler"""
+    
+    def test_submit_and_run(self, scheduler):
+        """Test Ergebnis wird über Future und async run() geliefert"""
+        assert scheduler.submit(INTERACTIVE, lambda x: x * 2, 21).result(timeout=5) == 42
+        assert asyncio.run(scheduler.run(BATCH, sum, [1, 2, 3])) == 6
+    
+    def test_exception_is_propagated(self, scheduler):
+        """Test Fehler im Task landen beim Aufrufer"""
+        def broken():
+            raise ValueError("boom")
+        
+        with pytest.raises(ValueError, match="boom"):
+            scheduler.submit(INTERACTIVE, broken).result(timeout=5)
+    
+    def test_interactive_not_blocked_by_bulk(self, scheduler):
+        """Test ein Worker bleibt für interactive reserviert"""
+        release = threading.Event()
+        scheduler.submit(BATCH, release.wait, 5)
+        scheduler.submit(BATCH, release.wait, 5)
+        scheduler.submit(BACKGROUND, release.wait, 5)
+        
+        start = time.perf_counter()
+        assert scheduler.submit(INTERACTIVE, lambda: "ok").result(timeout=2) == "ok"
+        assert time.perf_counter() - start < 1.0
+        
+        stats = scheduler.stats()["classes"]
+        assert stats[BATCH]["running"] == 1
+        assert stats[BATCH]["queue_depth"] + stats[BACKGROUND]["queue_depth"] == 2
+        release.set()
+    
+    def test_weighted_fair_dequeuing(self):
+        """Test höher gewichtete Klassen werden häufiger bedient, niedrige nicht ausgehungert"""
+        scheduler = InferenceScheduler(workers=1, weights={BATCH: 3, BACKGROUND: 1})
+        order = []
+        gate = threading.Event()
+        scheduler.submit(INTERACTIVE, gate.wait, 5)
+        
+        futures = []
+        for _ in range(8):
+            futures.append(scheduler.submit(BATCH, order.append, BATCH))
+            futures.append(scheduler.submit(BACKGROUND, order.append, BACKGROUND))
+        gate.set()
+        for future in futures:
+            future.result(timeout=5)
+        scheduler.shutdown()
+        
+        first = order[:8]
+        assert first.count(BATCH) == 6
+        assert first.count(BACKGROUND) == 2
+    
+    def test_lowest_class_is_shed_first(self):
+        """Test bei Rückstau wird background vor batch und interactive abgewiesen"""
+        scheduler = InferenceScheduler(
+            workers=1,
+            max_queue_depth={INTERACTIVE: 4, BATCH: 4, BACKGROUND: 4}
+        )
+        gate = threading.Event()
+        scheduler.submit(INTERACTIVE, gate.wait, 5)
+        time.sleep(0.05)
+        
+        for _ in range(3):
+            scheduler.submit(BATCH, lambda: None)
+        
+        # Rückstau 3 >= 0.25 * 12: background wird abgewiesen, batch noch nicht
+        with pytest.raises(QueueOverloaded) as excinfo:
+            scheduler.submit(BACKGROUND, lambda: None)
+        assert excinfo.value.retry_after >= 1
+        scheduler.submit(BATCH, lambda: None)
+        scheduler.submit(INTERACTIVE, lambda: None)
+        
+        stats = scheduler.stats()["classes"]
+        assert stats[BACKGROUND]["rejected"] == 1
+        assert stats[BATCH]["rejected"] == 0
+        gate.set()
+        scheduler.shutdown()
+    
+    def test_restart_after_shutdown(self, scheduler):
+        """Test der Scheduler nimmt nach shutdown() wieder Arbeit an (Lifespan-Neustart)"""
+        assert scheduler.submit(INTERACTIVE, lambda: 1).result(timeout=5) == 1
+        scheduler.shutdown()
+        assert scheduler.submit(INTERACTIVE, lambda: 2).result(timeout=5) == 2
+    
+    def test_call_blocking_stops_on_shutdown(self):
+        """Test call_blocking wartet bei Überlast nicht über shutdown() hinaus"""
+        scheduler = InferenceScheduler(workers=1, max_queue_depth={BACKGROUND: 1})
+        gate = threading.Event()
+        scheduler.submit(INTERACTIVE, gate.wait, 5)
+        scheduler.submit(BACKGROUND, lambda: None)
+        
+        errors = []
+        def background():
+            try:
+                scheduler.call_blocking(BACKGROUND, lambda: None)
+            except RuntimeError as e:
+                errors.append(e)
+        thread = threading.Thread(target=background)
+        thread.start()
+        time.sleep(0.1)
+        threading.Timer(0.2, gate.set).start()
+        scheduler.shutdown()
+        thread.join(timeout=2)
+        assert not thread.is_alive()
+        assert len(errors) == 1
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests für die schnelle Response-Serialisierung
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import json
+import sys
+import os
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+import api.serialization as serialization
+from api.serialization import (
+    KEY_FACTORS, build_batch_payloads, build_metadata, build_prediction_payload, dumps
+)
+
+class TestSerialization:
+    """Test Suite für api.serialization"""
+    
+    def test_payload_structure(self):
+        """Test Payload hat das Format von TicketPrediction"""
+        payload = build_prediction_payload("Hardware", "High", 0.94, 0.87, 0.91, build_metadata(12.345))
+        
+        assert payload["prediction"]["category"] == "Hardware"
+        assert payload["routing"] == {"suggested_team": "Hardware Support Team", "sla_target": "4 hours"}
+        assert payload["explanation"]["confidence_level"] == "high"
+        assert payload["explanation"]["recommendation"] == "automatic_assignment"
+        assert payload["metadata"]["processing_time_ms"] == 12.35
+        
+        data = json.loads(dumps(payload))
+        assert data["explanation"]["key_factors"] == list(KEY_FACTORS)
+    
+    def test_constant_sub_objects_are_shared(self):
+        """Test Routing- und Erklärungs-Dicts werden wiederverwendet"""
+        metadata = build_metadata(1.0)
+        first = build_prediction_payload("Network", "Low", 0.7, 0.7, 0.7, metadata)
+        second = build_prediction_payload("Network", "Low", 0.6, 0.6, 0.6, metadata)
+        
+        assert first["routing"] is second["routing"]
+        assert first["explanation"] is second["explanation"]
+    
+    def test_batch_payloads(self):
+        """Test Batch-Payloads aus einem Prediction-DataFrame"""
+        predictions = pd.DataFrame({
+            'category': ['Hardware', 'Security'],
+            'priority': ['High', 'Critical'],
+            'category_confidence': np.array([0.95, 0.85]),
+            'priority_confidence': np.array([0.9, 0.8]),
+            'overall_confidence': np.array([0.925, 0.825])
+        })
+        payloads = build_batch_payloads(predictions, build_metadata(1.0))
+        
+        assert len(payloads) == 2
+        assert payloads[1]["routing"]["suggested_team"] == "Security Incident Response Team"
+        assert payloads[1]["explanation"]["recommendation"] == "review_recommended"
+        assert isinstance(payloads[0]["prediction"]["overall_confidence"], float)
+        
+        data = json.loads(dumps({"predictions": payloads}))
+        assert data["predictions"][0]["prediction"]["category_confidence"] == 0.95
+    
+    def test_batch_routing_resolved_once_per_key(self, monkeypatch):
+        """Test Batch-Routing: ein resolve_many, jeder eindeutige Schlüssel nur einmal aufgelöst"""
+        from utils.routing import RoutingPolicy
+        
+        policy = RoutingPolicy([{"id": "erp", "when": {"affected_system": "erp"}, "suggested_team": "ERP Team"}])
+        resolved = []
+        resolve = policy.resolve
+        monkeypatch.setattr(policy, "resolve", lambda *key: resolved.append(key) or resolve(*key))
+        monkeypatch.setattr(serialization, "get_routing_policy", lambda: policy)
+        
+        predictions = pd.DataFrame({
+            'category': ['Software'] * 100,
+            'priority': ['Medium'] * 100,
+            'category_confidence': np.full(100, 0.9),
+            'priority_confidence': np.full(100, 0.9),
+            'overall_confidence': np.array([0.95, 0.5] * 50)
+        })
+        records = [{"department": "IT", "affected_system": system} for system in ["erp", "email"] * 50]
+        payloads = build_batch_payloads(predictions, build_metadata(1.0), records)
+        
+        assert len(resolved) == 2
+        assert payloads[0]["routing"]["suggested_team"] == "ERP Team"
+        assert payloads[1]["routing"]["suggested_team"] == "Software Support Team"
+        assert payloads[1]["explanation"]["recommendation"] == "manual_classification_required"
+    
+    def test_dumps_numpy_values(self):
+        """Test numpy Skalare werden serialisiert"""
+        data = json.loads(dumps({"value": np.float64(0.5), "count": np.int64(3)}))
+        assert data == {"value": 0.5, "count": 3}
+
+    @pytest.mark.parametrize("backend", ["orjson", "json"])
+    def test_non_finite_floats_are_null(self, backend, monkeypatch):
+        """Test NaN/Infinity werden mit beiden Backends als null geschrieben"""
+        if backend == "json":
+            monkeypatch.setattr(serialization, "orjson", None)
+        elif serialization.orjson is None:
+            pytest.skip("orjson nicht installiert")
+        content = {"a": float("nan"), "b": [np.float32("inf"), 1.5], "c": np.array([np.nan, 2.0])}
+        assert json.loads(dumps(content)) == {"a": None, "b": [None, 1.5], "c": [None, 2.0]}
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests für den Index ähnlicher historischer Tickets
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import sys
+import os
+import time
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+
+from models.similar_tickets import SimilarTicketIndex
+
+HISTORY = [
+    ("TICK-1", "Outlook cannot connect", "outlook disconnected from exchange server mail not syncing", "Software", "Resolved", 2.5),
+    ("TICK-2", "VPN drops", "vpn connection drops every few minutes from home office", "Network", "Resolved", 4.0),
+    ("TICK-3", "Printer jam", "printer on third floor paper jam cannot print", "Hardware", "Resolved", None),
+    ("TICK-4", "Outlook offline", "outlook shows offline exchange server mail not syncing", "Software", "Open", None),
+    ("TICK-5", "Laptop black screen", "laptop black screen after pressing power button", "Hardware", "Resolved", 8.0),
+]
+
+def history_frame(rows=HISTORY):
+    return pd.DataFrame(rows, columns=['ticket_id', 'title', 'description', 'category', 'status', 'resolution_time_hours'])
+
+@pytest.fixture
+def classifier(make_classifier):
+    return make_classifier([f"{title} {description}" for _, title, description, *_ in HISTORY])
+
+@pytest.fixture
+def index(classifier):
+    return SimilarTicketIndex.build(classifier, history_frame(), dim=32, tables=4, bits=4)
+
+class TestSimilarTicketIndex:
+    """Tests für Aufbau, Suche und inkrementelle Aktualisierung"""
+
+    def test_query_returns_most_similar(self, index, classifier):
+        results = index.query(classifier, "Outlook not syncing", "exchange server mail not syncing", k=2)
+        assert results[0]["ticket_id"] == "TICK-1"
+        assert results[0]["resolution_time_hours"] == 2.5
+        assert results[0]["similarity"] >= results[1]["similarity"]
+        assert len(results) == 2
+
+    def test_resolved_only(self, index, classifier):
+        resolved = index.query(classifier, "Outlook offline", "outlook shows offline", k=5)
+        assert "TICK-4" not in {r["ticket_id"] for r in resolved}
+
+        everything = index.query(classifier, "Outlook offline", "outlook shows offline", k=5, resolved_only=False)
+        assert everything[0]["ticket_id"] == "TICK-4"
+        assert everything[0]["resolution_time_hours"] is None
+
+    def test_save_and_load_mmap(self, index, classifier, tmp_path):
+        directory = str(tmp_path / "similar")
+        index.save(directory)
+
+        loaded = SimilarTicketIndex.load(directory)
+        assert isinstance(loaded.embeddings, np.memmap)
+        assert len(loaded) == len(HISTORY)
+        assert loaded.query(classifier, "VPN", "vpn drops from home", k=1)[0]["ticket_id"] == "TICK-2"
+
+    def test_incremental_add_and_refresh(self, index, classifier, tmp_path):
+        directory = str(tmp_path / "similar")
+        index.save(directory)
+        serving = SimilarTicketIndex.load(directory)
+
+        new = history_frame([("TICK-6", "VPN timeout", "vpn timeout from home office every evening", "Network", "Resolved", 1.0)])
+        assert index.add(classifier, new) == 1
+        assert index.add(classifier, new) == 0
+        assert index.query(classifier, "VPN timeout", "vpn timeout every evening", k=1)[0]["ticket_id"] == "TICK-6"
+
+        time.sleep(0.01)
+        index.save(directory)
+        assert serving.refresh()
+        assert len(serving) == len(HISTORY) + 1
+        assert not serving.refresh()
+
+    def test_vocabulary_mismatch(self, index, make_classifier):
+        other = make_classifier(["completely different vocabulary"])
+        with pytest.raises(ValueError):
+            index.query(other, "printer", "paper jam")
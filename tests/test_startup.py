@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Cold-Start Tests für die API: Import-Zeit Budget und Lazy-Loading
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+# Budget für "import api.main" (ms), per Umgebungsvariable anpassbar
+IMPORT_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "1500"))
+
+# Diese Libraries dürfen erst im Hintergrund-Warm-up geladen werden
+HEAVY_PACKAGES = ["pandas", "numpy", "sklearn", "xgboost", "nltk", "scipy", "pyarrow"]
+
+pytest.importorskip("fastapi")
+
+def measure_imports(module: str = "api.main"):
+    """
+    Importiert module in einem frischen Interpreter mit -X importtime.
+    Gibt (Gesamtzeit in ms, Eigenzeit in ms pro Top-Level-Package, alle geladenen Packages) zurück.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True
+    )
+    
+    total_ms = 0.0
+    per_package = defaultdict(float)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        package = name.split(".")[0]
+        modules.add(package)
+        per_package[package] += int(self_us) / 1000
+        if name == module:
+            total_ms = int(cumulative_us) / 1000
+    return total_ms, dict(per_package), modules
+
+def format_report(per_package, top: int = 10) -> str:
+    """Aggregierter Import-Zeit Report (langsamste Packages zuerst)"""
+    rows = sorted(per_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return "\n".join(f"{name:<30} {ms:>8.1f} ms" for name, ms in rows)
+
+class TestStartup:
+    """Test Suite für den Cold Start der API"""
+    
+    def test_import_time_budget(self):
+        """Test import api.main bleibt unter dem Budget und lädt keine schweren Libraries"""
+        total_ms, per_package, modules = measure_imports()
+        report = format_report(per_package)
+        print(f"\nimport api.main: {total_ms:.1f} ms\n{report}")
+        
+        loaded_heavy = [name for name in HEAVY_PACKAGES if name in modules]
+        assert not loaded_heavy, f"Schwere Libraries beim Import geladen: {loaded_heavy}\n{report}"
+        assert total_ms < IMPORT_BUDGET_MS, f"Cold Start {total_ms:.0f} ms > Budget {IMPORT_BUDGET_MS:.0f} ms\n{report}"
+    
+    def test_health_available_during_startup(self, monkeypatch):
+        """Test /health antwortet sofort, auch bevor das Modell geladen ist"""
+        sys.path.append(SRC_DIR)
+        from fastapi.testclient import TestClient
+        import api.main as main
+        
+        monkeypatch.setattr(main, "load_classifier", lambda: None)
+        monkeypatch.setattr(main, "model_state", "starting")
+        monkeypatch.setattr(main, "classifier", None)
+        
+        with TestClient(main.app) as client:
+            response = client.get("/health")
+            assert response.status_code == 200
+            assert response.json()["status"] == "starting"
+            
+            response = client.get("/ready")
+            assert response.status_code == 503
+            assert response.headers["retry-after"] == "5"
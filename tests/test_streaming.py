@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests für die Streaming NDJSON Bulk-Klassifikation
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import asyncio
+import json
+import sys
+import os
+
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pytest.importorskip("starlette")
+
+from starlette.requests import ClientDisconnect
+
+from api.streaming import NDJSONClassificationResponse, iter_body_lines
+
+def make_receive(chunks, disconnect=False):
+    """Erstellt einen ASGI receive-Kanal, der chunks als Body liefert"""
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1 or disconnect}
+        for i, chunk in enumerate(chunks)
+    ]
+    if disconnect:
+        messages.append({"type": "http.disconnect"})
+    
+    async def receive():
+        return messages.pop(0)
+    return receive
+
+async def fake_predict(records):
+    """Ersetzt classifier.predict + Serialisierung"""
+    return [{"prediction": {"category": "Hardware", "title": record["title"]}} for record in records]
+
+async def collect_lines(receive, max_line_bytes=1024):
+    return [item async for item in iter_body_lines(receive, max_line_bytes)]
+
+async def run_response(response, receive):
+    sent = []
+    
+    async def send(message):
+        sent.append(message)
+    
+    await response(None, receive, send)
+    return sent
+
+class TestStreaming:
+    """Test Suite für api.streaming"""
+    
+    def test_lines_split_across_chunks(self):
+        """Test Zeilen über Chunk-Grenzen hinweg"""
+        receive = make_receive([b'{"a": 1}\n{"b"', b': 2}\n', b'{"c": 3}'])
+        lines = asyncio.run(collect_lines(receive))
+        assert lines == [(1, b'{"a": 1}'), (2, b'{"b": 2}'), (3, b'{"c": 3}')]
+    
+    def test_overlong_line_is_skipped(self):
+        """Test zu lange Zeilen werden verworfen statt gepuffert"""
+        receive = make_receive([b"x" * 30, b"x" * 30 + b"\n", b'{"ok": 1}\n'])
+        lines = asyncio.run(collect_lines(receive, max_line_bytes=40))
+        assert lines == [(1, None), (2, b'{"ok": 1}')]
+    
+    def test_disconnect_while_reading(self):
+        """Test Client-Disconnect während des Uploads"""
+        receive = make_receive([b'{"a": 1}\n'], disconnect=True)
+        with pytest.raises(ClientDisconnect):
+            asyncio.run(collect_lines(receive))
+    
+    def test_response_streams_batches_in_order(self):
+        """Test Ergebnisse und Fehler kommen in Eingabe-Reihenfolge zurück"""
+        body = b"\n".join([
+            json.dumps({"title": "one", "ticket_id": "T1"}).encode(),
+            b"{broken",
+            json.dumps({"title": "two"}).encode(),
+            json.dumps({"title": "three"}).encode()
+        ])
+        response = NDJSONClassificationResponse(fake_predict, lambda record: record, batch_size=2)
+        sent = asyncio.run(run_response(response, make_receive([body])))
+        
+        chunks = [m["body"] for m in sent if m["type"] == "http.response.body" and m["body"]]
+        assert len(chunks) == 2  # zwei Batches
+        
+        records = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+        assert [r["line"] for r in records] == [1, 2, 3, 4]
+        assert records[0]["ticket_id"] == "T1"
+        assert "error" in records[1]
+        assert records[3]["prediction"]["title"] == "three"
+        assert sent[-1]["more_body"] is False
+    
+    def test_response_stops_on_disconnect(self):
+        """Test Verarbeitung endet sauber wenn der Client trennt"""
+        body = b"".join(json.dumps({"title": str(i)}).encode() + b"\n" for i in range(3))
+        response = NDJSONClassificationResponse(fake_predict, lambda record: record, batch_size=2)
+        sent = asyncio.run(run_response(response, make_receive([body], disconnect=True)))
+        
+        assert response.stats["tickets"] == 2
+        assert not any(m.get("more_body") is False for m in sent)
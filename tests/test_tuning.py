@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests für die Hyperparameter-Suche mit gecachten Feature-Matrizen
+
+ATL - HF Wirtschaftsinformatik
+Autor: Benjamin Peter
+Datum: 08.06.2025
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+pytest.importorskip("xgboost")
+
+from models.tuning import FEATURE_CONFIG, FoldCache, expand_grid, load_fold, tune
+
+TEMPLATES = {
+    "Hardware": ("laptop screen black power button", "High"),
+    "Software": ("excel file corrupted cannot open", "Medium"),
+    "Network": ("vpn connection drops wifi slow", "Medium"),
+    "Security": ("phishing email suspicious login", "Critical"),
+}
+
+def make_training_csv(path, n=80):
+    rng = np.random.RandomState(0)
+    rows = []
+    for i in range(n):
+        category = list(TEMPLATES)[i % 4]
+        text, priority = TEMPLATES[category]
+        rows.append({
+            'title': text.split()[0], 'description': text, 'category': category, 'priority': priority,
+            'user_role': rng.choice(['end_user', 'admin']), 'department': 'IT',
+            'affected_system': rng.choice(['email', 'network']), 'hour_submitted': 10,
+            'is_weekend': 0, 'previous_tickets_30d': 1
+        })
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+GRIDS = {
+    "xgboost": {"max_depth": [2, 3], "learning_rate": [0.3], "n_estimators": [20]},
+    "random_forest": {"max_depth": [None], "min_samples_leaf": [1], "max_features": ["sqrt"], "n_estimators": [100]},
+}
+
+class TestTuning:
+    """Tests für Fold-Cache und parallele Suche"""
+
+    def test_expand_grid(self):
+        assert len(expand_grid({"a": [1, 2], "b": [3, 4, 5]})) == 6
+
+    def test_tune_uses_cache(self, tmp_path, make_classifier):
+        data_path = str(tmp_path / "train.csv")
+        make_training_csv(data_path)
+        config = {**FEATURE_CONFIG, "folds": 3, "tfidf_min_df": 1}
+        classifier = make_classifier()
+
+        report = tune(data_path, grids=GRIDS, config=config, cache_dir=str(tmp_path / "cache"),
+                      n_jobs=1, classifier=classifier, feature_cache_dir=str(tmp_path / "features"))
+        assert not report["cache_hit"]
+        assert report["candidates"] == 3
+        assert report["best"]["xgboost"]["target"] == "category"
+        assert report["best"]["xgboost"]["accuracy"] == 1.0
+        assert report["best"]["random_forest"]["target"] == "priority"
+        assert classifier.feature_calls == 1
+
+        X_train, X_valid, labels = load_fold(FoldCache(str(tmp_path / "cache"), report["cache_key"]).fold_path(0))
+        assert X_train.shape[0] + X_valid.shape[0] == 80
+        assert len(labels["category_train"]) == X_train.shape[0]
+
+        again = tune(data_path, grids=GRIDS, config=config, cache_dir=str(tmp_path / "cache"),
+                     n_jobs=1, classifier=classifier, feature_cache_dir=str(tmp_path / "features"))
+        assert again["cache_hit"]
+        assert again["cache_key"] == report["cache_key"]
+        assert classifier.feature_calls == 1
+
+    def test_cache_key_changes_with_config(self):
+        key = FoldCache.make_key("data", "prep", FEATURE_CONFIG)
+        assert key != FoldCache.make_key("data", "prep", {**FEATURE_CONFIG, "folds": 3})
+        assert key != FoldCache.make_key("other", "prep", FEATURE_CONFIG)